@@ -1554,6 +1554,17 @@ int main(int argc, char **argv)
 
   u8 ret_new_bits = 0;
 
+  // the time slot of every trace file: "slot:trace file name" lines
+  FILE *trace_slots = NULL;
+  if (!skip_individual && !entries_only)
+  {
+    u8 *trace_slots_file = alloc_printf("%s/trace_slots.txt", out_dir);
+    trace_slots = fopen(trace_slots_file, "w");
+    if (!trace_slots)
+      PFATAL("Unable to create '%s'", trace_slots_file);
+    ck_free(trace_slots_file);
+  }
+
   // the main working loop
   while (queue_cur != NULL)
   {
@@ -1594,6 +1605,7 @@ int main(int argc, char **argv)
 
         // write the trace
         write_results();
+        fprintf(trace_slots, "%10lld:%s.txt\n", (s64)queue_cur->sec_slot, pure_fname + 1);
 
         ck_free(trace_file);
       }
@@ -1640,6 +1652,9 @@ int main(int argc, char **argv)
     current_no++;
   }
 
+  if (trace_slots)
+    fclose(trace_slots);
+
   if (!entries_only)
   {
 
@@ -0,0 +1,193 @@
+import numpy as np
+
+
+# normalize the parsed (slot, value) change points of one showmaps file
+# keeps the semantics of the original line-by-line aligner:
+# an implicit 0 at slot 0, parsing stops at the first slot beyond max_slot,
+# and the empty / single-line files get a second point at slot 1
+def normalize_change_points(slots, vals, max_slot):
+    slots = np.asarray(slots, dtype=np.int64)
+    vals = np.asarray(vals, dtype=np.int64)
+
+    if len(slots) > 0:
+        over = np.flatnonzero(slots > max_slot)
+        # the first line is always checked before the truncation
+        if slots[0] != 0:
+            slots = np.concatenate(([0], slots))
+            vals = np.concatenate(([0], vals))
+            over = over + 1
+        if len(over) > 0:
+            slots = slots[:over[0]]
+            vals = vals[:over[0]]
+
+    # handle the case when the txt file is empty
+    if len(slots) == 0:
+        slots = np.array([0, 1], dtype=np.int64)
+        vals = np.array([0, 0], dtype=np.int64)
+    elif len(slots) == 1:
+        slots = np.array([slots[0], 1], dtype=np.int64)
+        vals = np.array([vals[0], vals[0]], dtype=np.int64)
+
+    return slots, vals
+
+
+# the slot from which every change point takes effect in the aligned series
+# the k-th point becomes visible one slot after its own slot, but never before
+# the (k-1)-th point plus one, i.e. t_k = max(slots[k] + 1, t_(k-1) + 1)
+def effective_slots(slots):
+    n = len(slots)
+    ks = np.arange(n, dtype=np.int64)
+    offsets = slots + 1 - ks
+    offsets[0] = 0
+    return ks + np.maximum.accumulate(offsets)
+
+
+# the run-length form of the aligned series of one run: the value of every
+# change point and the number of slots it lasts (the lengths sum to max_slot)
+def run_lengths(slots, vals, max_slot):
+    slots, vals = normalize_change_points(slots, vals, max_slot)
+    starts = np.minimum(effective_slots(slots), max_slot)
+    ends = np.append(starts[1:], max_slot)
+    return vals, ends - starts
+
+
+# an aligned series kept as change points: a step function over the slots [0, length)
+# vals[i] holds from starts[i] (inclusive) until starts[i+1] (exclusive); starts[0] is always 0
+# only the change points are stored, so a week-long run costs a few KB instead of 600K integers
+class StepSeries:
+
+    def __init__(self, starts, vals, length):
+        self.starts = starts
+        self.vals = vals
+        self.length = length
+
+    # drop the zero-length steps (clipped at max_slot) and merge the steps with equal values
+    @classmethod
+    def from_run_lengths(cls, vals, lens, length):
+        vals = np.asarray(vals)
+        lens = np.asarray(lens, dtype=np.int64)
+        keep = lens > 0
+        vals = vals[keep]
+        starts = (np.cumsum(lens) - lens)[keep]
+        changed = np.ones(len(vals), dtype=bool)
+        changed[1:] = vals[1:] != vals[:-1]
+        return cls(starts[changed], vals[changed], length)
+
+    @classmethod
+    def from_dense(cls, dense):
+        dense = np.asarray(dense)
+        changed = np.ones(len(dense), dtype=bool)
+        changed[1:] = dense[1:] != dense[:-1]
+        starts = np.flatnonzero(changed).astype(np.int64)
+        return cls(starts, dense[starts], len(dense))
+
+    # the value at every slot of slots (each must be in [0, length))
+    def values_at(self, slots):
+        return self.vals[np.searchsorted(self.starts, slots, side='right') - 1]
+
+    # the values at the slots 0, step, 2 * step, ... (the same as to_dense()[0::step])
+    def resample(self, step):
+        return self.values_at(np.arange(0, self.length, step))
+
+    def final_value(self):
+        return self.vals[-1]
+
+    # the part of the series in the slots [begin, end): a step function whose first change point is begin
+    # (instead of 0), so that the statistics can be computed one time window after the other
+    # only the change points of the window are read (and copied) from a memory-mapped store
+    def window(self, begin, end):
+        if begin == 0 and end == self.length:
+            return self
+        first = np.searchsorted(self.starts, begin, side='right') - 1
+        last = np.searchsorted(self.starts, end, side='left')
+        starts = np.array(self.starts[first:last])
+        starts[0] = begin
+        return StepSeries(starts, np.array(self.vals[first:last]), end)
+
+    # only for the consumers that really need one value per slot
+    def to_dense(self):
+        lens = np.diff(np.append(self.starts, self.length))
+        return np.repeat(self.vals, lens)
+
+
+# the slots at which any of the series changes; every series is constant between two of them
+def union_starts(series_list):
+    return np.unique(np.concatenate([series.starts for series in series_list]))
+
+
+# the runs x len(slots) matrix of the values of every series at the slots
+def sample_runs(series_list, slots):
+    return np.stack([series.values_at(slots) for series in series_list])
+
+
+# the type of the run sums of integer series: int64 while n * sum(x^2) and sum(x)^2 (see
+# stat_plot.series_confidence_intervals) fit in it, Python ints (exact, but slower) for larger values, e.g. the
+# total_execs of long runs
+def sums_dtype(series_list):
+    if series_list[0].vals.dtype.kind not in 'iu':
+        return np.float64
+    largest = max(max(abs(int(series.vals.max())), abs(int(series.vals.min()))) for series in series_list)
+    if (len(series_list) * largest) ** 2 < np.iinfo(np.int64).max:
+        return np.int64
+    return object
+
+
+# the sum and the sum of squares of the series, as step functions on union_starts(series_list)
+# they are accumulated from the change points only, with exact integer arithmetic for integer series (see sums_dtype)
+def run_sums(series_list):
+    grid = union_starts(series_list)
+    dtype = sums_dtype(series_list)
+    sums = np.zeros(len(grid), dtype=dtype)
+    sum_squares = np.zeros(len(grid), dtype=dtype)
+    for series in series_list:
+        # each series adds the difference to its previous value at each of its change points
+        idx = np.searchsorted(grid, series.starts)
+        vals = np.asarray(series.vals).astype(dtype, copy=False)
+        deltas = np.diff(vals, prepend=0)
+        delta_squares = np.diff(vals * vals, prepend=0)
+        sums[idx] += deltas
+        sum_squares[idx] += delta_squares
+    return grid, np.cumsum(sums), np.cumsum(sum_squares)
+
+
+# the same as run_sums, from the run_sums of an earlier version of the series that only differ from begin on
+# (e.g. growing runs): the sums before begin are kept, only the change points from begin on are summed again
+def update_run_sums(previous, series_list, begin):
+    grid, sums, sum_squares = previous
+    keep = np.searchsorted(grid, begin)
+    tail_grid, tail_sums, tail_squares = run_sums([series.window(begin, series.length) for series in series_list])
+    return (np.concatenate((grid[:keep], tail_grid)), np.concatenate((sums[:keep], tail_sums)),
+            np.concatenate((sum_squares[:keep], tail_squares)))
+
+
+# a rough estimate of the bytes used to compute the statistics of the series on their whole union grid at once:
+# the concatenated and sorted change points, the per-grid-point sums and bounds, and the per-slot text export
+def aggregation_footprint(series_list):
+    n_points = sum(len(series.starts) for series in series_list)
+    length = series_list[0].length
+    return 8 * (2 * n_points + 10 * min(n_points, length) + 3 * length)
+
+
+# the time windows [begin, end) that split [0, length) so that the statistics of each one fit in memory_limit bytes
+# the boundaries split both the slots and the change points of every run (on average over the runs) evenly, since
+# the coverage mostly grows early on; a single window when everything fits
+def time_windows(series_list, memory_limit):
+    length = series_list[0].length
+    n_windows = int(-(-aggregation_footprint(series_list) // memory_limit))
+    if n_windows <= 1:
+        return [(0, length)]
+
+    fractions = np.linspace(0, 1, n_windows + 1)[1:-1]
+    # the starts are sorted: their quantiles are read directly, without loading the whole run
+    point_bounds = np.mean([series.starts[(fractions * (len(series.starts) - 1)).astype(np.int64)]
+                            for series in series_list], axis=0)
+    slot_bounds = fractions * length
+    bounds = np.unique(np.concatenate(([0, length], point_bounds, slot_bounds)).astype(np.int64))
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def write_aligned_file(path, aligned_vals):
+    with open(path, "w") as out_file:
+        if len(aligned_vals) > 0:
+            out_file.write('\n'.join(map(str, aligned_vals.tolist())))
+            out_file.write('\n')
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# the cache keeps the run-length form (see align.run_lengths) of every parsed data file:
+#   <out_dir>/cache/manifest.json    input path -> key of the input and the cached file
+#   <out_dir>/cache/runs/<id>.npz    vals and lens of the run
+# an entry is only reused when the key of the input (size + mtime, or the content hash)
+# and max_slot are unchanged
+CACHE_VERSION = 1
+
+
+def cache_dir(out_dir):
+    return os.path.join(out_dir, 'cache')
+
+
+def cache_manifest_path(out_dir):
+    return os.path.join(cache_dir(out_dir), 'manifest.json')
+
+
+def load_cache_manifest(out_dir):
+    path = cache_manifest_path(out_dir)
+    if os.path.exists(path):
+        try:
+            with open(path) as handle:
+                manifest = json.load(handle)
+            if manifest.get('version') == CACHE_VERSION:
+                return manifest
+        except ValueError:
+            print("[!] ignoring corrupted cache manifest: {}".format(path))
+    return {'version': CACHE_VERSION, 'entries': {}}
+
+
+def save_cache_manifest(out_dir, manifest):
+    path = cache_manifest_path(out_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# the key of an input file; None if it does not exist (missing files are not cached)
+# column: the plot_data column read from the file (None for showmaps files)
+def input_key(data_file, use_hash, column=None):
+    if not os.path.exists(data_file):
+        return None
+    if use_hash:
+        key = 'sha1:' + file_digest(data_file)
+    else:
+        stat = os.stat(data_file)
+        key = 'stat:{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+    if column is not None:
+        key += ':plot_data:' + column
+    return key
+
+
+def lookup(manifest, out_dir, data_file, key, max_slot):
+    if key is None:
+        return None
+    entry = manifest['entries'].get(os.path.abspath(data_file))
+    if entry is None or entry['key'] != key or entry['max_slot'] != max_slot:
+        return None
+    cached_file = os.path.join(cache_dir(out_dir), entry['file'])
+    if not os.path.exists(cached_file):
+        return None
+    with np.load(cached_file) as cached:
+        return cached['vals'], cached['lens']
+
+
+def store(manifest, out_dir, data_file, key, max_slot, encoded):
+    if key is None:
+        return
+    abs_path = os.path.abspath(data_file)
+    file_name = 'runs/' + hashlib.sha1(abs_path.encode()).hexdigest()[:16] + '.npz'
+    cached_file = os.path.join(cache_dir(out_dir), file_name)
+    if not os.path.exists(os.path.dirname(cached_file)):
+        os.makedirs(os.path.dirname(cached_file))
+    vals, lens = encoded
+    np.savez(cached_file, vals=vals, lens=lens)
+    manifest['entries'][abs_path] = {
+        'key': key,
+        'max_slot': max_slot,
+        'file': file_name
+    }
+
+
+# the signature of everything the aligned store and the detailed plot of a fuzzer depend on
+def fuzzer_signature(keys, misc_dict, max_slot):
+    parts = [keys, max_slot, misc_dict['aligned_text'], misc_dict['bucket'],
+             misc_dict['ylabel'], misc_dict['project'], misc_dict['file_postfix']]
+    if any(key is None for key in keys):
+        return None
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
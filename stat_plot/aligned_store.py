@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+
+from align import StepSeries, write_aligned_file
+
+# layout of the aligned store for one fuzzer:
+#   aligned/<fuzzer>/starts.npy      the change points of all the runs, concatenated
+#   aligned/<fuzzer>/vals.npy        the value of every change point
+#   aligned/<fuzzer>/offsets.npy     run j owns the change points [offsets[j], offsets[j+1])
+#   aligned/<fuzzer>/manifest.json   number of runs, max_slot and the original data files
+#   aligned/<fuzzer>/<j>.txt         optional text export (one value per line)
+# see align.StepSeries for the meaning of the change points
+STARTS_FILENAME = 'starts.npy'
+VALS_FILENAME = 'vals.npy'
+OFFSETS_FILENAME = 'offsets.npy'
+MANIFEST_FILENAME = 'manifest.json'
+# written by older versions: runs x slots matrix
+DENSE_FILENAME = 'runs.npy'
+
+
+def store_path(aligned_dir):
+    return os.path.join(aligned_dir, OFFSETS_FILENAME)
+
+
+def manifest_path(aligned_dir):
+    return os.path.join(aligned_dir, MANIFEST_FILENAME)
+
+
+# the aligned file of the j-th run: its text export, or the store itself (the reports give the run index)
+def run_ref(aligned_dir, j, text_export):
+    if text_export:
+        return os.path.join(aligned_dir, str(j) + '.txt')
+    return os.path.normpath(aligned_dir)
+
+
+# text_runs: the indexes of the runs whose text export is written again (all of them if None), the other ones did
+# not change since the last write
+def write_aligned_store(aligned_dir, series_list, data_files, max_slot, text_export=False, signature=None,
+                        text_runs=None):
+    if not os.path.exists(aligned_dir):
+        os.makedirs(aligned_dir)
+
+    offsets = np.cumsum([0] + [len(series.starts) for series in series_list]).astype(np.int64)
+    if len(series_list) > 0:
+        starts = np.concatenate([series.starts for series in series_list])
+        vals = np.concatenate([series.vals for series in series_list])
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+        vals = np.zeros(0, dtype=np.int64)
+    np.save(os.path.join(aligned_dir, STARTS_FILENAME), starts)
+    np.save(os.path.join(aligned_dir, VALS_FILENAME), vals)
+    # the offsets are written last, they mark the store as complete
+    np.save(store_path(aligned_dir), offsets)
+
+    manifest = {
+        'runs': len(series_list),
+        'change_points': len(starts),
+        'dtype': str(vals.dtype),
+        'max_slot': max_slot,
+        'text_export': text_export,
+        'data_files': list(data_files),
+        'signature': signature
+    }
+    with open(manifest_path(aligned_dir), 'w') as handle:
+        json.dump(manifest, handle, indent=2)
+
+    dense_file = os.path.join(aligned_dir, DENSE_FILENAME)
+    if os.path.exists(dense_file):
+        os.remove(dense_file)
+
+    if text_export:
+        for j in (range(len(series_list)) if text_runs is None else text_runs):
+            write_aligned_file(run_ref(aligned_dir, j, True), series_list[j].to_dense())
+    return [run_ref(aligned_dir, j, text_export) for j in range(len(series_list))]
+
+
+def read_manifest(aligned_dir):
+    with open(manifest_path(aligned_dir)) as handle:
+        return json.load(handle)
+
+
+# the refs of the runs written by write_aligned_store, if the store was written with the given signature
+def reusable_run_refs(aligned_dir, signature):
+    if signature is None or not os.path.exists(manifest_path(aligned_dir)) or not has_aligned_store(aligned_dir):
+        return None
+    manifest = read_manifest(aligned_dir)
+    if manifest.get('signature') != signature:
+        return None
+    return [run_ref(aligned_dir, j, manifest.get('text_export')) for j in range(manifest['runs'])]
+
+
+def has_aligned_store(aligned_dir):
+    return os.path.exists(store_path(aligned_dir)) and os.path.exists(manifest_path(aligned_dir))
+
+
+# load the runs of a fuzzer as a list of StepSeries; the arrays are memory-mapped, not copied
+# aligned dirs written by older versions only have a dense runs.npy or the <j>.txt files
+def load_aligned_store(aligned_dir):
+    if has_aligned_store(aligned_dir):
+        max_slot = read_manifest(aligned_dir)['max_slot']
+        starts = np.load(os.path.join(aligned_dir, STARTS_FILENAME), mmap_mode='r')
+        vals = np.load(os.path.join(aligned_dir, VALS_FILENAME), mmap_mode='r')
+        offsets = np.load(store_path(aligned_dir))
+        return [StepSeries(starts[offsets[j]:offsets[j + 1]], vals[offsets[j]:offsets[j + 1]], max_slot)
+                for j in range(len(offsets) - 1)]
+
+    dense_file = os.path.join(aligned_dir, DENSE_FILENAME)
+    if os.path.exists(dense_file):
+        return [StepSeries.from_dense(row) for row in np.load(dense_file, mmap_mode='r')]
+
+    text_files = [f for f in os.listdir(aligned_dir) if f.endswith('.txt')]
+    text_files.sort(key=lambda f: int(f[:-len('.txt')]))
+    return [StepSeries.from_dense(np.loadtxt(os.path.join(aligned_dir, f), dtype=np.int64, ndmin=1))
+            for f in text_files]
@@ -0,0 +1,153 @@
+###################
+# run many plot configs (e.g. the ones generated by confgen.py) in one process
+###################
+
+import argparse
+import os
+import time
+import traceback
+
+import matplotlib.pyplot as plt
+import toml
+
+from conf import parse_config
+from confgen import generate_configs
+import profiler
+from main import run_config
+from render import Renderer, wait_futures
+from stat_plot import plan_alignment, encode_data_files, finish_alignment, get_max_slot
+
+
+# the plot configs to run: all the .toml files of a directory, a single plot config,
+# or the configs generated from a confgen config
+def collect_configs(config_path, inputs, output, verbose):
+    if os.path.isdir(config_path):
+        return sorted(os.path.join(config_path, f) for f in os.listdir(config_path) if f.endswith('.toml'))
+
+    with open(config_path) as config_file:
+        conf_dict = toml.load(config_file)
+
+    if 'target_names' not in conf_dict:
+        return [config_path]
+
+    if not inputs or not output:
+        print("[!] --inputs and --output are required for the confgen config: {}".format(config_path))
+        exit(1)
+    print("[*] generating plot configs from {}".format(config_path))
+    return generate_configs(conf_dict, inputs, output, verbose)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", "-c", required=True, type=str,
+                        help="a directory of plot configs, a plot config or a confgen config")
+    parser.add_argument("--inputs", "-i", action='append', required=False,
+                        help="only for a confgen config, the same as confgen.py --inputs")
+    parser.add_argument("--output", "-o", required=False, type=str,
+                        help="only for a confgen config, the same as confgen.py --output")
+    parser.add_argument("--jobs", "-j", required=False, type=int, default=1,
+                        help="number of worker processes shared by all the configs")
+    parser.add_argument("--render-jobs", required=False, type=int, default=1,
+                        help="number of render worker processes shared by all the configs")
+    parser.add_argument("--profile", required=False, type=str,
+                        help="write the time, io and memory used by every stage of all the configs to this json file")
+    parser.add_argument("--profile-stage", required=False, type=str,
+                        help="with --profile, also dump the cProfile stats of this stage (e.g. parse, ci, render)")
+    parser.add_argument("--verbose", "-v", required=False, action="store_true")
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        print("[!] invalid --jobs: {}".format(args.jobs))
+        exit(1)
+    if args.render_jobs < 1:
+        print("[!] invalid --render-jobs: {}".format(args.render_jobs))
+        exit(1)
+
+    if args.profile is not None:
+        profiler.enable(args.profile, args.profile_stage)
+
+    start = time.time()
+    config_paths = collect_configs(os.path.abspath(args.config), args.inputs, args.output, args.verbose)
+    print("[*] {} configs to run".format(len(config_paths)))
+
+    configs = []
+    failed = []
+    for config_path in config_paths:
+        config_valid, fuzzers_dict, misc_dict = parse_config(config_path)
+        if not config_valid:
+            print("[!] config: {} is not valid, skip".format(config_path))
+            failed.append(config_path)
+            continue
+        misc_dict['jobs'] = args.jobs
+        misc_dict['render_jobs'] = args.render_jobs
+        configs.append((config_path, fuzzers_dict, misc_dict))
+
+    # plan the alignment of all the 'overall' configs first, so that every data file
+    # missing from the caches is parsed only once, even if several configs use it
+    plans = {}
+    shared_inputs = {}
+    n_refs = 0
+    for (i, (config_path, fuzzers_dict, misc_dict)) in enumerate(configs):
+        if misc_dict['stat_type'] != 'overall':
+            continue
+        with profiler.stage('plan'):
+            plan = plan_alignment(fuzzers_dict, misc_dict)
+        plans[i] = plan
+        max_slot = get_max_slot(misc_dict)
+        for (_, _, data_file, column, _) in plan['tasks']:
+            shared_inputs[(os.path.abspath(data_file), max_slot, column)] = None
+            n_refs += 1
+
+    print("[*] parsing {} data files ({} references)".format(len(shared_inputs), n_refs))
+    for max_slot in sorted(set(key[1] for key in shared_inputs)):
+        inputs = [key for key in shared_inputs if key[1] == max_slot]
+        data_files = [data_file for (data_file, _, _) in inputs]
+        columns = [column for (_, _, column) in inputs]
+        for (key, encoded_run) in zip(inputs, encode_data_files(data_files, max_slot, args.jobs, columns)):
+            shared_inputs[key] = encoded_run
+
+    # the figures of all the configs are drawn by the same render workers
+    renderer = Renderer(args.render_jobs)
+    pending_renders = []
+    for (i, (config_path, fuzzers_dict, misc_dict)) in enumerate(configs):
+        print("[*] [{}/{}] {}".format(i + 1, len(configs), config_path))
+        try:
+            if i in plans:
+                max_slot = get_max_slot(misc_dict)
+                results = [shared_inputs[(os.path.abspath(data_file), max_slot, column)]
+                           for (_, _, data_file, column, _) in plans[i]['tasks']]
+                finish_alignment(fuzzers_dict, misc_dict, plans[i], results)
+                run_config(fuzzers_dict, misc_dict, aligned=True, renderer=renderer)
+            else:
+                run_config(fuzzers_dict, misc_dict, renderer=renderer)
+            pending_renders.append((config_path, renderer.detach()))
+        except Exception:
+            traceback.print_exc()
+            print("[!] config: {} failed".format(config_path))
+            failed.append(config_path)
+        finally:
+            # the figures are numbered per config, do not let them leak into the next one
+            plt.close('all')
+
+    for (config_path, futures) in pending_renders:
+        try:
+            with profiler.stage('render'):
+                wait_futures(futures)
+        except Exception:
+            traceback.print_exc()
+            print("[!] rendering config: {} failed".format(config_path))
+            failed.append(config_path)
+    renderer.close()
+    profiler.finish()
+
+    print("[*] {} configs done, {} failed, {:.1f}s".format(
+        len(config_paths) - len(failed), len(failed), time.time() - start))
+    for config_path in failed:
+        print("[!] failed: {}".format(config_path))
+
+    if len(failed) > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
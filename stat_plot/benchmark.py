@@ -0,0 +1,352 @@
+###################
+# time every stat_type (and confgen.py / draw_boxplot.py) on synthetic data at several scales
+# the results are appended to a JSON history, and compared with the previous entry
+###################
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import toml
+
+import datagen
+from data_parser import parse_throughput
+
+BENCHMARKS = ['parse', 'overall', 'stest', 'boxplot', 'scatterplot', 'histogram', 'overlap', 'confgen',
+              'draw_boxplot', 'validate']
+# the main.py subcommand of every stat_type
+STAT_TYPE_MODES = {'overall': 'plot', 'stest': 'stest', 'boxplot': 'boxplot', 'scatterplot': 'scatter',
+                   'histogram': 'histogram', 'overlap': 'overlap'}
+# the modules imported by the main.py modes, their import time is recorded under 'startup'
+IMPORT_MODULES = ['conf', 'stest', 'dist_plots', 'stat_plot', 'overlap']
+
+# fuzzers, runs per fuzzer, hours, change points per hour of a run, points of scatter / histogram, seeds of a run
+# (overlap)
+SCALES = {
+    'small': {'fuzzers': 3, 'runs': 5, 'hours': 4, 'density': 100, 'points': 1000, 'seeds': 100},
+    'medium': {'fuzzers': 3, 'runs': 10, 'hours': 24, 'density': 200, 'points': 20000, 'seeds': 500},
+    'large': {'fuzzers': 5, 'runs': 20, 'hours': 72, 'density': 500, 'points': 200000, 'seeds': 1000}
+}
+
+# a run slower than the previous entry by this factor is reported as a regression
+REGRESSION_RATIO = 1.2
+
+# the version of the generated data, kept in the ready marker of a scale dir; a scale dir of another version is
+# generated again, so bump it whenever prepare_scale or datagen.py generate different data
+DATA_VERSION = 2
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def overall_misc(out_dir, scale):
+    return {
+        'out_dir': out_dir,
+        'ylabel': 'edges',
+        'file_postfix': '-edge-time',
+        'project': 'bench',
+        'max_time': scale['hours'],
+        'bucket': 'min' if scale['hours'] > 24 else 's',
+        'stat_type': 'overall'
+    }
+
+
+def write_plot_config(config_path, data_files, misc_dict):
+    fuzzers_dict = {fuzzer: {'data_files': data_files[fuzzer]} for fuzzer in data_files}
+    with open(config_path, 'w') as handle:
+        toml.dump({'fuzzers': fuzzers_dict, 'misc': misc_dict}, handle)
+
+
+def confgen_config(scale, targets, fuzzers):
+    return {
+        'bucket': 'min',
+        'confidence_lvl': 0.95,
+        'max_time': scale['hours'],
+        'stat_type': 'overall',
+        'large_font': False,
+        'no_legend': False,
+        'y_start_0': True,
+        'x_log_scale': False,
+        'y_log_scale': False,
+        'fuzzer_sigs': ['/{}\\d+/'.format(fuzzer) for fuzzer in fuzzers],
+        'fuzzer_names': fuzzers,
+        'fuzzer_line_styles': ['solid'] * len(fuzzers),
+        'fuzzer_line_colors': ['C{}'.format(f) for f in range(len(fuzzers))],
+        'target_sigs': targets,
+        'target_names': targets,
+        'objective_filenames': ['edge_fuzz_time.txt', 'crash_fuzz_time.txt'],
+        'objectives': ['edge', 'crash'],
+        'objective_y_labels': ['edge N.O.', 'crash N.O.'],
+        'file_postfixes': ['-edge-time', '-crash-time'],
+        # for draw_boxplot.py
+        'config_sigs': ['.*-edge.toml'],
+        'data_points': [int(scale['hours'] * 3600 / 4), int(scale['hours'] * 3600)],
+        'color_palette': 'YlGnBu',
+        'width': 0.8
+    }
+
+
+# the version of the data in scale_dir, None if it is not complete (or written before the version was kept)
+def data_version(scale_dir):
+    try:
+        with open(os.path.join(scale_dir, 'ready')) as handle:
+            return int(handle.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+# generate the inputs of every benchmark of a scale once; they are reused by later runs with the same seed
+# returns benchmark -> (command, paths (glob patterns) removed before every run, setup or None), and the showmaps
+# files of the 'overall' config (timed in this process by the 'parse' benchmark)
+# a setup is (command, dir it creates), it is only run when the dir does not exist
+def prepare_scale(work_dir, name, scale, seed):
+    scale_dir = os.path.join(work_dir, '{}-{}'.format(name, seed))
+    data_dir = os.path.join(scale_dir, 'data')
+    out_dir = os.path.join(scale_dir, 'out')
+    rng = np.random.default_rng(seed)
+
+    if data_version(scale_dir) != DATA_VERSION:
+        print("[*] generating the {} data in {}".format(name, scale_dir))
+        if os.path.exists(scale_dir):
+            shutil.rmtree(scale_dir)
+        os.makedirs(scale_dir)
+
+        n_fuzzers = scale['fuzzers']
+        overall_files = datagen.generate_overall(data_dir + '/overall', n_fuzzers, scale['runs'], scale['hours'],
+                                                 scale['density'], rng)
+        write_plot_config(scale_dir + '/overall.toml', overall_files, overall_misc(out_dir + '/overall', scale))
+
+        final_files = datagen.generate_final_values(data_dir + '/final', n_fuzzers, scale['runs'], scale['hours'], rng)
+        write_plot_config(scale_dir + '/stest.toml', final_files, {
+            'out_dir': out_dir + '/stest', 'project': 'bench', 'file_postfix': '-stest', 'stat_type': 'stest'})
+        write_plot_config(scale_dir + '/boxplot.toml', final_files, {
+            'out_dir': out_dir + '/boxplot', 'project': 'bench', 'file_postfix': '-boxplot', 'stat_type': 'boxplot',
+            'notch': False, 'plot_title': 'bench'})
+
+        scatter_files = datagen.generate_scatter(data_dir + '/scatter', n_fuzzers, scale['points'], rng)
+        write_plot_config(scale_dir + '/scatterplot.toml', scatter_files, {
+            'out_dir': out_dir + '/scatterplot', 'project': 'bench', 'file_postfix': '-scatter',
+            'stat_type': 'scatterplot', 'plot_title': 'bench', 'xlabel': 'x', 'ylabel': 'y', 'large_font': False})
+
+        histogram_files = datagen.generate_histogram(data_dir + '/histogram', n_fuzzers, scale['points'], rng)
+        write_plot_config(scale_dir + '/histogram.toml', histogram_files, {
+            'out_dir': out_dir + '/histogram', 'project': 'bench', 'file_postfix': '-histo',
+            'stat_type': 'histogram', 'plot_title': 'bench', 'xlabel': 'x', 'ylabel': 'y', 'large_font': False,
+            'n_bins': 20})
+
+        trace_dirs = datagen.generate_traces(data_dir + '/traces', n_fuzzers, scale['runs'], scale['hours'],
+                                             scale['seeds'], rng)
+        write_plot_config(scale_dir + '/overlap.toml', trace_dirs, {
+            'out_dir': out_dir + '/overlap', 'project': 'bench', 'file_postfix': '-overlap', 'stat_type': 'overlap',
+            'plot_title': 'bench'})
+
+        targets, fuzzers = datagen.generate_confgen(data_dir + '/confgen', n_fuzzers, scale['runs'], scale['hours'],
+                                                    scale['density'], rng)
+        with open(scale_dir + '/confgen.toml', 'w') as handle:
+            toml.dump(confgen_config(scale, targets, fuzzers), handle)
+
+        with open(os.path.join(scale_dir, 'ready'), 'w') as handle:
+            handle.write(str(DATA_VERSION))
+
+    python = sys.executable
+    commands = {}
+    for stat_type in STAT_TYPE_MODES:
+        config_path = scale_dir + '/' + stat_type + '.toml'
+        commands[stat_type] = ([python, 'main.py', STAT_TYPE_MODES[stat_type], '-c', config_path],
+                               [out_dir + '/' + stat_type], None)
+    commands['validate'] = ([python, 'main.py', 'validate', '-c', scale_dir + '/overall.toml'], [], None)
+    commands['confgen'] = ([python, 'confgen.py', '-c', scale_dir + '/confgen.toml', '-i', data_dir + '/confgen',
+                            '-o', out_dir + '/confgen'], [out_dir + '/confgen'], None)
+    # draw_boxplot.py works on the output of the generated configs, which is produced once by the setup command;
+    # its own output (the section dirs) and its data point caches are removed before every run
+    commands['draw_boxplot'] = ([python, 'draw_boxplot.py', '-c', scale_dir + '/confgen.toml',
+                                 '-i', out_dir + '/plots'],
+                                [out_dir + '/plots/section-*', out_dir + '/plots/*/data_points.json'],
+                                ([python, 'batch.py', '-c', scale_dir + '/confgen.toml', '-i', data_dir + '/confgen',
+                                  '-o', out_dir + '/plots'], out_dir + '/plots'))
+
+    overall_fuzzers = toml.load(scale_dir + '/overall.toml')['fuzzers']
+    parse_files = [data_file for fuzzer in sorted(overall_fuzzers)
+                   for data_file in overall_fuzzers[fuzzer]['data_files']]
+    return commands, parse_files
+
+
+def run_command(command, verbose):
+    output = None if verbose else subprocess.DEVNULL
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=SCRIPT_DIR, stdout=output, stderr=output)
+    return time.perf_counter() - start, completed.returncode == 0
+
+
+def remove_paths(patterns):
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+
+# the fastest of repeat runs, every one starting without the outputs and the caches of the previous runs
+def run_benchmark(command, clean_patterns, setup, repeat, verbose):
+    if setup is not None and not os.path.exists(setup[1]):
+        _, ok = run_command(setup[0], verbose)
+        if not ok:
+            return {'ok': False, 'wall': None}
+
+    times = []
+    for _ in range(repeat):
+        remove_paths(clean_patterns)
+        elapsed, ok = run_command(command, verbose)
+        if not ok:
+            return {'ok': False, 'wall': None}
+        times.append(elapsed)
+    return {'ok': True, 'wall': min(times), 'runs': times}
+
+
+# the parse throughput of the showmaps files, the fastest of repeat runs
+def parse_benchmark(data_files, repeat):
+    times = []
+    for _ in range(repeat):
+        total_bytes, total_lines, elapsed = parse_throughput(data_files)
+        times.append(elapsed)
+    wall = min(times)
+    return {'ok': True, 'wall': wall, 'runs': times, 'mb': total_bytes / 1e6,
+            'mb_per_s': total_bytes / 1e6 / max(wall, 1e-9), 'lines_per_s': total_lines / max(wall, 1e-9)}
+
+
+# the time to import every module in a fresh interpreter, the fastest of repeat runs
+def import_times(repeat):
+    results = {}
+    for module in IMPORT_MODULES:
+        code = 'import time; start = time.perf_counter(); import {}; print(time.perf_counter() - start)'.format(module)
+        times = []
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, '-c', code], cwd=SCRIPT_DIR, stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL)
+            if completed.returncode != 0:
+                break
+            times.append(float(completed.stdout.decode().strip().splitlines()[-1]))
+        if len(times) < repeat:
+            results['import_' + module] = {'ok': False, 'wall': None}
+        else:
+            results['import_' + module] = {'ok': True, 'wall': min(times), 'runs': times}
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=SCRIPT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(history_path):
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path) as handle:
+        return json.load(handle)
+
+
+# compare with the last entry that has the same benchmark, at the same scale
+def compare(history, results):
+    regressions = []
+    for scale in results:
+        for benchmark in results[scale]:
+            current = results[scale][benchmark]
+            previous = None
+            for entry in reversed(history):
+                previous = entry['results'].get(scale, {}).get(benchmark)
+                if previous is not None and previous['ok']:
+                    break
+                previous = None
+            if previous is None or not current['ok']:
+                continue
+            ratio = current['wall'] / previous['wall']
+            current['previous_wall'] = previous['wall']
+            current['ratio'] = ratio
+            if ratio > REGRESSION_RATIO:
+                regressions.append((scale, benchmark, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", "-s", required=False, type=str, default='small,medium',
+                        help="comma separated, any of: {}".format(', '.join(SCALES)))
+    parser.add_argument("--benchmarks", "-b", required=False, type=str, default=','.join(BENCHMARKS),
+                        help="comma separated, any of: {}".format(', '.join(BENCHMARKS)))
+    parser.add_argument("--work-dir", "-w", required=False, type=str, default='bench',
+                        help="where the generated data and the outputs are kept")
+    parser.add_argument("--history", required=False, type=str, default='bench_history.json',
+                        help="the JSON history the results are appended to")
+    parser.add_argument("--repeat", "-r", required=False, type=int, default=1)
+    parser.add_argument("--seed", required=False, type=int, default=0)
+    parser.add_argument("--verbose", "-v", required=False, action="store_true")
+    args = parser.parse_args()
+
+    scales = args.scales.split(',')
+    benchmarks = args.benchmarks.split(',')
+    for name in scales:
+        if name not in SCALES:
+            print("[!] invalid scale: {}".format(name))
+            exit(1)
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            print("[!] invalid benchmark: {}".format(benchmark))
+            exit(1)
+
+    work_dir = os.path.abspath(args.work_dir)
+    results = {'startup': import_times(args.repeat)}
+    for name in results['startup']:
+        if results['startup'][name]['ok']:
+            print("[*] {:<7} {:<17} {:8.2f}s".format('startup', name, results['startup'][name]['wall']))
+        else:
+            print("[!] {:<7} {:<17} failed".format('startup', name))
+    for name in scales:
+        commands, parse_files = prepare_scale(work_dir, name, SCALES[name], args.seed)
+        results[name] = {}
+        for benchmark in benchmarks:
+            if benchmark == 'parse':
+                result = parse_benchmark(parse_files, args.repeat)
+            else:
+                command, clean_patterns, setup = commands[benchmark]
+                result = run_benchmark(command, clean_patterns, setup, args.repeat, args.verbose)
+            results[name][benchmark] = result
+            if benchmark == 'parse':
+                print("[*] {:<7} {:<17} {:8.2f}s {:8.1f} MB/s".format(name, benchmark, result['wall'],
+                                                                     result['mb_per_s']))
+            elif result['ok']:
+                print("[*] {:<7} {:<17} {:8.2f}s".format(name, benchmark, result['wall']))
+            else:
+                print("[!] {:<7} {:<17} failed".format(name, benchmark))
+
+    history = load_history(args.history)
+    regressions = compare(history, results)
+    for (name, benchmark, ratio) in regressions:
+        print("[!] regression: {} {} is {:.2f}x slower than the previous run".format(name, benchmark, ratio))
+
+    history.append({
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'scales': {name: SCALES[name] for name in scales},
+        'results': results
+    })
+    with open(args.history, 'w') as handle:
+        json.dump(history, handle, indent=2)
+    print("[*] results appended to {}".format(args.history))
+
+
+if __name__ == "__main__":
+    main()
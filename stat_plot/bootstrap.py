@@ -0,0 +1,111 @@
+import numpy as np
+import scipy.special
+
+# the columns (time steps) resampled at once: the resampled statistics are resamples x columns
+CHUNK_COLUMNS = 4096
+# the order statistics of the median counted at once (columns x resamples), bounds the memory used
+CHUNK_ELEMENTS = 1 << 22
+
+
+# the statistic of every column of a runs x columns matrix
+def column_statistic(data, statistic):
+    if statistic == 'median':
+        return np.median(data, axis=0)
+    return np.mean(data, axis=0)
+
+
+# the statistic of every column for every resample: resamples x columns
+# resample_idx: resamples x runs, the runs drawn by every resample (the same for all the columns)
+def resampled_statistic(data, resample_idx, statistic):
+    n_resamples, n = resample_idx.shape
+    # a resample only depends on how many times every run is drawn
+    counts = np.zeros((n_resamples, n), dtype=np.int16 if n < (1 << 15) else np.int64)
+    np.add.at(counts, (np.arange(n_resamples)[:, None], resample_idx), 1)
+    if statistic == 'mean':
+        return counts @ data / n
+
+    # the median is the average of the order statistics (n - 1) // 2 and n // 2 of the resample;
+    # the j-th order statistic is the value of the first run (in the order of the column) at which
+    # the running count of draws exceeds j
+    order = np.argsort(data, axis=0, kind='stable')
+    sorted_data = np.take_along_axis(data, order, axis=0)
+    n_columns = max(1, CHUNK_ELEMENTS // n_resamples)
+    stats = np.empty((n_resamples, data.shape[1]))
+    for begin in range(0, data.shape[1], n_columns):
+        columns = np.arange(begin, min(begin + n_columns, data.shape[1]))
+        # columns x resamples
+        drawn = np.zeros((len(columns), n_resamples), dtype=counts.dtype)
+        low = np.zeros((len(columns), n_resamples), dtype=np.int64)
+        high = np.zeros((len(columns), n_resamples), dtype=np.int64)
+        for rank in range(n):
+            drawn += counts.T[order[rank, columns]]
+            low += drawn <= (n - 1) // 2
+            high += drawn <= n // 2
+        stats[:, columns] = ((sorted_data[low, columns[:, None]] + sorted_data[high, columns[:, None]]) / 2.0).T
+    return stats
+
+
+# the leave-one-out statistics of every column: runs x columns
+def jackknife_statistic(data, statistic):
+    n = data.shape[0]
+    if statistic == 'mean':
+        return (data.sum(axis=0) - data) / (n - 1)
+    return np.stack([column_statistic(np.delete(data, i, axis=0), statistic) for i in range(n)])
+
+
+# the q-quantile of every column, q can differ per column (same as np.quantile, linear interpolation)
+def column_quantiles(sorted_stats, q):
+    positions = q * (sorted_stats.shape[0] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, sorted_stats.shape[0] - 1)
+    weights = positions - lower
+    low_vals = np.take_along_axis(sorted_stats, lower[None, :], axis=0)[0]
+    up_vals = np.take_along_axis(sorted_stats, upper[None, :], axis=0)[0]
+    return low_vals + weights * (up_vals - low_vals)
+
+
+# bootstrap confidence interval of the mean or the median of every column of a runs x columns matrix
+# the same resamples of the runs are used for all the columns, so they are computed as array operations
+# method: 'percentile' or 'bca' (bias-corrected and accelerated)
+def bootstrap_intervals(data, confidence, statistic='mean', method='percentile', resamples=1000, seed=None):
+    data = np.asarray(data, dtype=np.float64)
+    n = data.shape[0]
+    center = column_statistic(data, statistic)
+    if n < 2:
+        return center, center.copy(), center.copy()
+
+    rng = np.random.default_rng(seed)
+    resample_idx = rng.integers(0, n, size=(resamples, n))
+    stats = np.sort(resampled_statistic(data, resample_idx, statistic), axis=0)
+
+    alpha = (1 - confidence) / 2.0
+    q_low = np.full(data.shape[1], alpha)
+    q_high = np.full(data.shape[1], 1 - alpha)
+
+    if method == 'bca':
+        # bias correction: where the statistic lies among its resamples (ties count as half)
+        below = ((stats < center).sum(axis=0) + (stats <= center).sum(axis=0)) / (2.0 * resamples)
+        below = np.clip(below, 0.5 / resamples, 1 - 0.5 / resamples)
+        z0 = scipy.special.ndtri(below)
+
+        # acceleration from the jackknife
+        jackknife = jackknife_statistic(data, statistic)
+        diffs = jackknife.mean(axis=0) - jackknife
+        num = (diffs ** 3).sum(axis=0)
+        den = 6.0 * (diffs ** 2).sum(axis=0) ** 1.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            accel = np.where(den > 0, num / den, 0.0)
+
+        z_low = scipy.special.ndtri(alpha)
+        z_high = -z_low
+        q_low = scipy.special.ndtr(z0 + (z0 + z_low) / (1 - accel * (z0 + z_low)))
+        q_high = scipy.special.ndtr(z0 + (z0 + z_high) / (1 - accel * (z0 + z_high)))
+
+    lo = column_quantiles(stats, q_low)
+    hi = column_quantiles(stats, q_high)
+
+    # no variation among the runs: the interval is the value itself
+    constant = stats[0] == stats[-1]
+    lo[constant] = center[constant]
+    hi[constant] = center[constant]
+    return center, lo, hi
@@ -1,5 +1,8 @@
 import toml
 
+from options import BOOTSTRAP_METHODS, CI_STATISTICS, DATA_FORMATS, DOWNSAMPLE_METHODS, \
+    MAX_OVERLAP_FUZZERS, PAIRWISE_TESTS, PLOT_DATA_ALIASES, PLOT_DATA_COLUMNS, P_ADJUST_METHODS
+
 
 def check_bucket(bucket):
     valid_buckets = ["sec", "s", "min", "m", "hour", "h"]
@@ -23,6 +26,10 @@ def parse_config(config_path):
 
         misc_dict = conf_dict['misc']
 
+        # the plot_data column of the fuzzers that do not choose one
+        if 'plot_data_column' not in misc_dict:
+            misc_dict['plot_data_column'] = 'paths_total'
+
         # sanitize the config
         for fuzzer_name in fuzzers_dict:
             fuzzer = fuzzers_dict[fuzzer_name]
@@ -35,16 +42,60 @@ def parse_config(config_path):
             if len(fuzzer["data_files"]) == 0:
                 print("[!] {} has no data file!".format(fuzzer_name))
                 config_valid = False
+            # the data files are showmaps files ("slot:value" lines) or the plot_data files of AFL / AFL++
+            if 'data_format' not in fuzzer:
+                fuzzer['data_format'] = 'showmaps'
+            elif fuzzer['data_format'] not in DATA_FORMATS:
+                print("[!] invalid data_format: {} of {}! (one of {})".format(
+                    fuzzer['data_format'], fuzzer_name, ', '.join(DATA_FORMATS)))
+                config_valid = False
+            if 'plot_data_column' not in fuzzer:
+                fuzzer['plot_data_column'] = misc_dict['plot_data_column']
+            fuzzer['plot_data_column'] = PLOT_DATA_ALIASES.get(fuzzer['plot_data_column'], fuzzer['plot_data_column'])
+            if fuzzer['plot_data_column'] not in PLOT_DATA_COLUMNS:
+                print("[!] invalid plot_data_column: {} of {}! (one of {})".format(
+                    fuzzer['plot_data_column'], fuzzer_name, ', '.join(PLOT_DATA_COLUMNS)))
+                config_valid = False
 
         if 'stat_type' not in misc_dict:
             print("[!] [misc] table misses 'stat_type'!")
             config_valid = False
 
-        valid_stat_types = ['overall', 'stest', 'boxplot', 'scatterplot', 'histogram']
+        valid_stat_types = ['overall', 'stest', 'boxplot', 'scatterplot', 'histogram', 'overlap']
         if misc_dict['stat_type'] not in valid_stat_types:
             print("[!] invalid stat_type: {}".format(misc_dict['stat_type']))
             config_valid = False
 
+        # number of worker processes used for parsing and aligning the data files
+        if 'jobs' not in misc_dict:
+            misc_dict['jobs'] = 1
+        elif not isinstance(misc_dict['jobs'], int) or misc_dict['jobs'] < 1:
+            print("[!] invalid jobs: {} in [misc]!".format(misc_dict['jobs']))
+            config_valid = False
+
+        # number of worker processes used for drawing the figures
+        if 'render_jobs' not in misc_dict:
+            misc_dict['render_jobs'] = 1
+        elif not isinstance(misc_dict['render_jobs'], int) or misc_dict['render_jobs'] < 1:
+            print("[!] invalid render_jobs: {} in [misc]!".format(misc_dict['render_jobs']))
+            config_valid = False
+
+        # the pairwise tests of the 'overall' and 'stest' reports
+        if 'stat_tests' not in misc_dict:
+            misc_dict['stat_tests'] = list(PAIRWISE_TESTS)
+        elif not isinstance(misc_dict['stat_tests'], list) or \
+                any(test not in PAIRWISE_TESTS for test in misc_dict['stat_tests']):
+            print("[!] invalid stat_tests: {} in [misc]! (any of {})".format(
+                misc_dict['stat_tests'], ', '.join(PAIRWISE_TESTS)))
+            config_valid = False
+        # correction of the p-values for the number of pairs compared
+        if 'p_adjust' not in misc_dict:
+            misc_dict['p_adjust'] = 'none'
+        elif misc_dict['p_adjust'] not in P_ADJUST_METHODS:
+            print("[!] invalid p_adjust: {} in [misc]! (one of {})".format(
+                misc_dict['p_adjust'], ', '.join(P_ADJUST_METHODS)))
+            config_valid = False
+
         if misc_dict['stat_type'] == 'overall':
 
             if "bucket" not in misc_dict:
@@ -65,6 +116,73 @@ def parse_config(config_path):
                     print("[!] {} (required) is missing is [misc]!".format(r_key))
                     config_valid = False
 
+            # the confidence intervals: "t" (Student's t interval of the mean) or "bootstrap"
+            if 'ci_method' not in misc_dict:
+                misc_dict['ci_method'] = 't'
+            elif misc_dict['ci_method'] not in ['t', 'bootstrap']:
+                print("[!] invalid ci_method: {} in [misc]! (t or bootstrap)".format(misc_dict['ci_method']))
+                config_valid = False
+            if 'ci_statistic' not in misc_dict:
+                misc_dict['ci_statistic'] = 'mean'
+            elif misc_dict['ci_statistic'] not in CI_STATISTICS:
+                print("[!] invalid ci_statistic: {} in [misc]! (one of {})".format(
+                    misc_dict['ci_statistic'], ', '.join(CI_STATISTICS)))
+                config_valid = False
+            elif misc_dict['ci_statistic'] != 'mean' and misc_dict['ci_method'] != 'bootstrap':
+                print("[!] ci_statistic: {} in [misc] needs ci_method = \"bootstrap\"!".format(
+                    misc_dict['ci_statistic']))
+                config_valid = False
+            if 'bootstrap_method' not in misc_dict:
+                misc_dict['bootstrap_method'] = 'percentile'
+            elif misc_dict['bootstrap_method'] not in BOOTSTRAP_METHODS:
+                print("[!] invalid bootstrap_method: {} in [misc]! (one of {})".format(
+                    misc_dict['bootstrap_method'], ', '.join(BOOTSTRAP_METHODS)))
+                config_valid = False
+            if 'bootstrap_resamples' not in misc_dict:
+                misc_dict['bootstrap_resamples'] = 1000
+            elif not isinstance(misc_dict['bootstrap_resamples'], int) or misc_dict['bootstrap_resamples'] < 1:
+                print("[!] invalid bootstrap_resamples: {} in [misc]!".format(misc_dict['bootstrap_resamples']))
+                config_valid = False
+            # a fixed seed makes the bootstrap bands reproducible
+            if 'bootstrap_seed' not in misc_dict:
+                misc_dict['bootstrap_seed'] = None
+
+            # also export the aligned data as text files (one value per line)
+            if 'aligned_text' not in misc_dict:
+                misc_dict['aligned_text'] = False
+
+            # reuse the parsed data files and aligned data of unchanged inputs
+            if 'align_cache' not in misc_dict:
+                misc_dict['align_cache'] = True
+            # key the inputs by a content hash instead of size + mtime
+            if 'cache_hash' not in misc_dict:
+                misc_dict['cache_hash'] = False
+
+            # at most this many points per curve in the overall plots (0 plots every bucket)
+            if 'plot_points' not in misc_dict:
+                misc_dict['plot_points'] = 0
+            elif not isinstance(misc_dict['plot_points'], int) or misc_dict['plot_points'] < 0:
+                print("[!] invalid plot_points: {} in [misc]!".format(misc_dict['plot_points']))
+                config_valid = False
+            if 'downsample' not in misc_dict:
+                misc_dict['downsample'] = 'minmax'
+            elif misc_dict['downsample'] not in DOWNSAMPLE_METHODS:
+                print("[!] invalid downsample: {} in [misc]! (one of {})".format(
+                    misc_dict['downsample'], ', '.join(DOWNSAMPLE_METHODS)))
+                config_valid = False
+
+            # MWU p-values and A12 of every pair of fuzzers at every bucket, not only at the end
+            if 'stats_over_time' not in misc_dict:
+                misc_dict['stats_over_time'] = False
+
+            # memory ceiling (in MB) of the statistics of a fuzzer (or a pair of fuzzers); above it they are
+            # computed one time window after the other, with the same results
+            if 'memory_limit' not in misc_dict:
+                misc_dict['memory_limit'] = 1024
+            elif not isinstance(misc_dict['memory_limit'], (int, float)) or misc_dict['memory_limit'] <= 0:
+                print("[!] invalid memory_limit: {} in [misc]!".format(misc_dict['memory_limit']))
+                config_valid = False
+
             if 'x_log_scale' not in misc_dict:
                 misc_dict['x_log_scale'] = False
             if 'y_log_scale' not in misc_dict:
@@ -112,4 +230,41 @@ def parse_config(config_path):
                     print("[!] {} (required) is missing is [misc]!".format(r_key))
                     config_valid = False
 
+        elif misc_dict['stat_type'] == 'overlap':
+
+            # the data files of a fuzzer are the showmaps output dirs of its runs (with the per-seed traces)
+            required_keys = ["out_dir", "project", "file_postfix"]
+
+            for r_key in required_keys:
+                if r_key not in misc_dict:
+                    print("[!] {} (required) is missing is [misc]!".format(r_key))
+                    config_valid = False
+
+            # the membership of an edge has one bit per fuzzer
+            if len(fuzzers_dict) > MAX_OVERLAP_FUZZERS:
+                print("[!] overlap supports at most {} fuzzers, not {}!".format(MAX_OVERLAP_FUZZERS, len(fuzzers_dict)))
+                config_valid = False
+            # only the seeds found in the first max_time hours, if given
+            if 'max_time' in misc_dict and (not isinstance(misc_dict['max_time'], (int, float))
+                                            or misc_dict['max_time'] <= 0):
+                print("[!] invalid max_time: {} in [misc]!".format(misc_dict['max_time']))
+                config_valid = False
+            # keep the bitsets of the seed traces under out_dir/cache/traces/ for the next runs
+            if 'trace_cache' not in misc_dict:
+                misc_dict['trace_cache'] = True
+            # the number of combinations of fuzzers in the UpSet plot (the largest ones)
+            if 'upset_combinations' not in misc_dict:
+                misc_dict['upset_combinations'] = 30
+            elif not isinstance(misc_dict['upset_combinations'], int) or misc_dict['upset_combinations'] < 1:
+                print("[!] invalid upset_combinations: {} in [misc]!".format(misc_dict['upset_combinations']))
+                config_valid = False
+
+        # plot_data only has time series (overall) and final values (stest, boxplot)
+        if misc_dict['stat_type'] in ['scatterplot', 'histogram', 'overlap']:
+            for fuzzer_name in fuzzers_dict:
+                if fuzzers_dict[fuzzer_name]['data_format'] != 'showmaps':
+                    print("[!] data_format: {} of {} is not supported by {}!".format(
+                        fuzzers_dict[fuzzer_name]['data_format'], fuzzer_name, misc_dict['stat_type']))
+                    config_valid = False
+
         return config_valid, fuzzers_dict, misc_dict
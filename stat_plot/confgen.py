@@ -1,52 +1,105 @@
 import toml
 import argparse
+import json
 import os
 import re
 from pathlib import Path
 import fnmatch
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", "-c", required=True, type=str)
-    parser.add_argument("--verbose", "-v", required=False, action="store_true")
-    parser.add_argument("--output", "-o", required=True, type=str)
-    parser.add_argument("--inputs", "-i", action='append', required=True)
-    args = parser.parse_args()
+INDEX_VERSION = 1
 
-    config_path = os.path.abspath(args.config)
-    verbose = args.verbose
 
-    #print('inputs is %s' % (args.inputs))
-    #print('output is %s' % (args.output))
-    #exit(1)
-    print("[*] config file is {}".format(config_path))
+# walk every input dir once and keep the files whose name matches an objective filename
+# returns a list of (path, abs_path, objective indexes); path is relative to the input dir as given
+def scan_inputs(inputs, objective_filenames, verbose=False):
+    patterns = [re.compile(fnmatch.translate(fname)) for fname in objective_filenames]
+    found = []
+    for base_dir in inputs:
+        for (root, _, filenames) in os.walk(base_dir):
+            for filename in filenames:
+                objs = [o for (o, pattern) in enumerate(patterns) if pattern.match(filename)]
+                if len(objs) == 0:
+                    continue
+                path = str(Path(root) / filename)
+                if verbose:
+                    print(os.path.abspath(path))
+                found.append((path, os.path.abspath(path), objs))
+    return found
+
+
+# the scan result is only reused for the same input dirs and objective filenames
+def index_key(inputs, objective_filenames):
+    return {
+        "version": INDEX_VERSION,
+        "inputs": [[base_dir, os.path.abspath(base_dir)] for base_dir in inputs],
+        "objective_filenames": list(objective_filenames)
+    }
+
+
+def load_index(index_path, inputs, objective_filenames):
+    if index_path is None or not os.path.exists(index_path):
+        return None
+    with open(index_path) as handle:
+        index = json.load(handle)
+    if index.get("key") != index_key(inputs, objective_filenames):
+        print("[*] index {} was built for other inputs, rescanning".format(index_path))
+        return None
+    return [tuple(entry) for entry in index["files"]]
+
+
+def save_index(index_path, inputs, objective_filenames, found):
+    with open(index_path, 'w') as handle:
+        json.dump({"key": index_key(inputs, objective_filenames), "files": found}, handle)
+
+
+# classify the found files into a (target, objective, fuzzer) -> [abs_path] index
+# the signatures are matched against the path as found under the input dir
+def classify_files(found, fuzzer_sigs, target_sigs):
+    fuzzer_res = [re.compile(sig) for sig in fuzzer_sigs]
+    target_res = [re.compile(sig) for sig in target_sigs]
+    index = {}
+    for (path, abs_path, objs) in found:
+        fs = [f for (f, fuzzer_re) in enumerate(fuzzer_res) if fuzzer_re.search(path)]
+        if len(fs) == 0:
+            continue
+        ts = [t for (t, target_re) in enumerate(target_res) if target_re.search(path)]
+        for t in ts:
+            for o in objs:
+                for f in fs:
+                    index.setdefault((t, o, f), set()).add(abs_path)
+    return index
 
-    conf_dict = {}
-    with open(config_path) as config_file:
-        conf_dict = toml.load(config_file)
-        # TODO check config validity
 
-    if not os.path.exists(args.output):
-        os.makedirs(args.output)
+# generate one plot config for every target * objective; returns the paths of the configs
+# index_path: where the scan of the input dirs is persisted; it is reused unless rescan is set
+def generate_configs(conf_dict, inputs, output, verbose=False, index_path=None, rescan=False):
+    if not os.path.exists(output):
+        os.makedirs(output)
 
     # find all the data files
-    all_data_files = []
-    for fname in conf_dict['objective_filenames']:
-        for base_dir in args.inputs:
-            for fpath in Path(base_dir).rglob(fname):
-                if verbose:
-                    print(os.path.abspath(str(fpath)))
-                all_data_files.append(fpath)
+    objective_filenames = conf_dict['objective_filenames']
+    found = None
+    if not rescan:
+        found = load_index(index_path, inputs, objective_filenames)
+    if found is None:
+        found = scan_inputs(inputs, objective_filenames, verbose)
+        if index_path is not None:
+            save_index(index_path, inputs, objective_filenames, found)
+    else:
+        print("[*] reusing the index {} ({} files)".format(index_path, len(found)))
+
+    file_index = classify_files(found, conf_dict['fuzzer_sigs'], conf_dict['target_sigs'])
 
     # create one config for every target * obj
+    config_paths = []
     for t, target_name in enumerate(conf_dict['target_names']):
         for o, objective in enumerate(conf_dict['objectives']):
 
             misc_dict = {
                 "bucket": conf_dict["bucket"],
                 "confidence_lvl": conf_dict["confidence_lvl"],
-                "out_dir": args.output + "/" + "plot-"+target_name+"-"+objective+"-out/",
+                "out_dir": output + "/" + "plot-"+target_name+"-"+objective+"-out/",
                 "ylabel": conf_dict["objective_y_labels"][o],
                 "file_postfix": conf_dict["file_postfixes"][o],
                 "project": conf_dict["target_names"][t],
@@ -61,10 +114,7 @@ def main():
 
             fuzzer_dict = {}
             for f, fuzzer_name in enumerate(conf_dict["fuzzer_names"]):
-                data_files = [os.path.abspath(str(data_file)) for data_file in all_data_files
-                              if re.search(conf_dict['fuzzer_sigs'][f], str(data_file)) and
-                              re.search(conf_dict['target_sigs'][t], str(data_file)) and
-                              fnmatch.fnmatch(data_file.name, conf_dict['objective_filenames'][o])]
+                data_files = file_index.get((t, o, f), [])
                 if len(data_files) > 0:
                     fuzzer_dict[fuzzer_name] = {
                         "data_files": sorted(data_files),
@@ -78,10 +128,41 @@ def main():
             }
 
             plot_config_name = "plot-"+target_name+"-"+objective+".toml"
-            plot_config_path = args.output + "/" + plot_config_name
+            plot_config_path = output + "/" + plot_config_name
 
             with open(plot_config_path, 'w') as handle:
                 toml.dump(out_dict, handle)
+            config_paths.append(plot_config_path)
+
+    return config_paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", "-c", required=True, type=str)
+    parser.add_argument("--verbose", "-v", required=False, action="store_true")
+    parser.add_argument("--output", "-o", required=True, type=str)
+    parser.add_argument("--inputs", "-i", action='append', required=True)
+    parser.add_argument("--index", required=False, type=str,
+                        help="persist the scan of the input dirs to this file and reuse it in later runs")
+    parser.add_argument("--rescan", required=False, action="store_true",
+                        help="scan the input dirs even if the index exists")
+    args = parser.parse_args()
+
+    config_path = os.path.abspath(args.config)
+    verbose = args.verbose
+
+    #print('inputs is %s' % (args.inputs))
+    #print('output is %s' % (args.output))
+    #exit(1)
+    print("[*] config file is {}".format(config_path))
+
+    conf_dict = {}
+    with open(config_path) as config_file:
+        conf_dict = toml.load(config_file)
+        # TODO check config validity
+
+    generate_configs(conf_dict, args.inputs, args.output, verbose, args.index, args.rescan)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+# bulk parser for the "slot:value" files generated by showmaps ("%10lld:%d" per line)
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+NEWLINE = ord('\n')
+COLON = ord(':')
+
+
+# parse the content of a showmaps file into two int64 arrays (slots, vals)
+# like the line-by-line readers, a line is skipped unless it has exactly one ':'
+def parse_slot_values(data):
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if len(buf) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    line_ends = np.flatnonzero(buf == NEWLINE)
+    if len(line_ends) == 0 or line_ends[-1] != len(buf) - 1:
+        # the last line has no trailing newline
+        line_ends = np.append(line_ends, len(buf))
+    colons = np.flatnonzero(buf == COLON)
+    colon_counts = np.bincount(np.searchsorted(line_ends, colons), minlength=len(line_ends))
+    valid = colon_counts == 1
+
+    if not valid.all():
+        # keep only the bytes of the valid lines
+        line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+        line_lens = np.minimum(line_ends + 1, len(buf)) - line_starts
+        data = buf[np.repeat(valid, line_lens)].tobytes()
+
+    n_lines = int(valid.sum())
+    if n_lines == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    numbers = np.fromstring(data.replace(b':', b' ').decode(), dtype=np.int64, sep=' ')
+    if len(numbers) != 2 * n_lines:
+        raise ValueError("invalid slot:value line in showmaps data")
+
+    numbers = numbers.reshape(n_lines, 2)
+    return numbers[:, 0].copy(), numbers[:, 1].copy()
+
+
+# read a showmaps file as a whole; a missing file has no data
+def read_slot_file(data_file):
+    if not os.path.exists(data_file):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    with open(data_file, 'rb') as handle:
+        return parse_slot_values(handle.read())
+
+
+# parse a set of showmaps files, returns (bytes, lines, seconds)
+def parse_throughput(data_files):
+    total_bytes = 0
+    total_lines = 0
+    start = time.perf_counter()
+    for data_file in data_files:
+        slots, _ = read_slot_file(data_file)
+        total_bytes += os.path.getsize(data_file)
+        total_lines += len(slots)
+    return total_bytes, total_lines, time.perf_counter() - start
+
+
+# report the parse throughput for a set of showmaps files
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs='+', type=str)
+    args = parser.parse_args()
+
+    total_bytes, total_lines, elapsed = parse_throughput(args.files)
+
+    print("[*] parsed {} files, {} lines, {:.1f} MB in {:.3f}s".format(
+        len(args.files), total_lines, total_bytes / 1e6, elapsed))
+    print("[*] parse throughput: {:.1f} MB/s, {:.0f} lines/s".format(
+        total_bytes / 1e6 / max(elapsed, 1e-9), total_lines / max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
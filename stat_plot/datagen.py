@@ -0,0 +1,219 @@
+###################
+# generate synthetic input data for every stat_type (see benchmark.py and test/test_generator.py)
+###################
+
+import argparse
+import os
+
+import numpy as np
+
+DATA_KINDS = ['overall', 'plot_data', 'traces', 'stest', 'boxplot', 'scatterplot', 'histogram', 'confgen']
+PLOT_DATA_HEADER = ('# unix_time, cycles_done, cur_path, paths_total, pending_total, pending_favs, map_size, '
+                    'unique_crashes, unique_hangs, max_depth, execs_per_sec, total_execs, edges_found\n')
+DEFAULT_FUZZERS = ['cerebro', 'afl', 'aflfast']
+
+
+def fuzzer_names(n_fuzzers):
+    if n_fuzzers <= len(DEFAULT_FUZZERS):
+        return DEFAULT_FUZZERS[:n_fuzzers]
+    return DEFAULT_FUZZERS + ['fuzzer{}'.format(f) for f in range(len(DEFAULT_FUZZERS), n_fuzzers)]
+
+
+# a monotone coverage curve like the ones written by showmaps: (slots, values)
+# the new coverage is found at a decaying rate (most of it early), so the change points are denser
+# at the beginning; density is the average number of change points per hour, strength scales the
+# final coverage (e.g. a better fuzzer)
+def coverage_curve(rng, hours, density, strength=1.0):
+    max_slot = int(hours * 3600)
+    n_points = max(2, min(max_slot, int(rng.poisson(density * hours))))
+
+    # the discovery times are spread over the whole campaign, more of them early on
+    times = (max_slot * rng.uniform(0, 1, size=n_points) ** 2.5).astype(np.int64)
+    slots = np.unique(np.concatenate(([0], times)))
+
+    # every change point adds a few edges, fewer as the campaign saturates
+    gains = rng.geometric(1.0 / (1.0 + 4.0 * strength), size=len(slots))
+    values = 5 + np.cumsum(gains) - gains[0]
+    return slots, values
+
+
+def write_slot_file(file_name, slots, values):
+    with open(file_name, 'w') as out_file:
+        out_file.write(''.join('{:>10}:{}\n'.format(slot, value) for (slot, value) in zip(slots.tolist(),
+                                                                                            values.tolist())))
+
+
+def write_value_file(file_name, values, fmt='{}'):
+    with open(file_name, 'w') as out_file:
+        out_file.write(''.join((fmt + '\n').format(value) for value in values))
+
+
+# an AFL plot_data file with one row per change point of the curve: paths_total and edges_found follow the values,
+# the other columns are filled in roughly
+def write_plot_data(file_name, slots, values, t0=1600000000):
+    rows = []
+    for (slot, value) in zip(slots.tolist(), values.tolist()):
+        rows.append('{}, {}, {}, {}, {}, {}, {:.2f}%, {}, {}, {}, {:.2f}, {}, {}\n'.format(
+            t0 + slot, slot // 3600, value // 2, value, value // 3, value // 10, value / 655.36, value // 500, 0,
+            1 + value // 100, 1000.0, 1000 * slot, value))
+    with open(file_name, 'w') as out_file:
+        out_file.write(PLOT_DATA_HEADER + ''.join(rows))
+
+
+def makedirs(path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+# the showmaps files of every run of every fuzzer: <out>/<fuzzer>/out-<i>.txt
+# returns fuzzer -> [data files]
+def generate_overall(out_dir, n_fuzzers, runs, hours, density, rng):
+    data_files = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        makedirs(out_dir + '/' + fuzzer)
+        data_files[fuzzer] = []
+        for i in range(runs):
+            file_name = out_dir + '/' + fuzzer + '/out-' + str(i) + '.txt'
+            slots, values = coverage_curve(rng, hours, density, strength=1.0 - 0.1 * f)
+            write_slot_file(file_name, slots, values)
+            data_files[fuzzer].append(file_name)
+    return data_files
+
+
+# the plot_data files of every run of every fuzzer, as in the AFL output dirs: <out>/<fuzzer>/<i>/plot_data
+# returns fuzzer -> [data files]
+def generate_plot_data(out_dir, n_fuzzers, runs, hours, density, rng):
+    data_files = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        data_files[fuzzer] = []
+        for i in range(runs):
+            makedirs(out_dir + '/' + fuzzer + '/' + str(i))
+            file_name = out_dir + '/' + fuzzer + '/' + str(i) + '/plot_data'
+            slots, values = coverage_curve(rng, hours, density, strength=1.0 - 0.1 * f)
+            write_plot_data(file_name, slots, values)
+            data_files[fuzzer].append(file_name)
+    return data_files
+
+
+# the showmaps output dirs (without -s) of every run of every fuzzer: <out>/<fuzzer>/<fuzzer><i>/traces/<seed>.txt
+# plus trace_slots.txt; the fuzzers share most edges, and every fuzzer also has a region of edges that only it
+# reaches (more of it in the early fuzzers)
+# returns fuzzer -> [showmaps output dirs]
+def generate_traces(out_dir, n_fuzzers, runs, hours, seeds, rng, edges_per_seed=200):
+    max_slot = int(hours * 3600)
+    shared_edges = 20000
+    own_edges = 2000
+    run_dirs = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        run_dirs[fuzzer] = []
+        own_begin = shared_edges + f * own_edges
+        for i in range(runs):
+            run_dir = out_dir + '/' + fuzzer + '/' + fuzzer + str(i)
+            makedirs(run_dir + '/traces')
+            slots = np.sort((max_slot * rng.uniform(0, 1, size=seeds) ** 2.5).astype(np.int64))
+            slot_lines = []
+            for k in range(seeds):
+                # the later seeds go deeper into the shared edges
+                depth = int(1000 + (shared_edges - 1000) * (k + 1) / seeds)
+                edges = np.concatenate((np.arange(50), rng.integers(0, depth, size=edges_per_seed),
+                                        own_begin + rng.integers(0, int(own_edges / (1 + f)), size=5)))
+                name = 'id:{:06d}.txt'.format(k)
+                with open(run_dir + '/traces/' + name, 'w') as trace_file:
+                    trace_file.write(''.join('{:06d}:1\n'.format(edge) for edge in np.unique(edges).tolist()))
+                slot_lines.append('{:>10}:{}\n'.format(int(slots[k]), name))
+            with open(run_dir + '/trace_slots.txt', 'w') as slots_file:
+                slots_file.write(''.join(slot_lines))
+            run_dirs[fuzzer].append(run_dir)
+    return run_dirs
+
+
+# one value per run (e.g. the time-to-exposure or the final coverage): <out>/out_<fuzzer>.txt
+# used by both the 'stest' and the 'boxplot' stat_types
+def generate_final_values(out_dir, n_fuzzers, runs, hours, rng):
+    makedirs(out_dir)
+    data_files = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        file_name = out_dir + '/out_' + fuzzer + '.txt'
+        values = rng.gamma(4.0, hours / (8.0 + f), size=runs)
+        write_value_file(file_name, np.round(values, 1).tolist())
+        data_files[fuzzer] = [file_name]
+    return data_files
+
+
+# x:y pairs of every seed of a fuzzer (e.g. stack length : queue position): <out>/test_<fuzzer>.txt
+def generate_scatter(out_dir, n_fuzzers, points, rng):
+    makedirs(out_dir)
+    data_files = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        file_name = out_dir + '/test_' + fuzzer + '.txt'
+        xs = np.sort(rng.integers(1, 10 * points, size=points))
+        ys = rng.lognormal(5 + f * 0.3, 1.0, size=points).astype(np.int64) + 1
+        write_slot_file(file_name, xs, ys)
+        data_files[fuzzer] = [file_name]
+    return data_files
+
+
+# one integer per seed (e.g. a stack length): <out>/test_<fuzzer>.txt
+def generate_histogram(out_dir, n_fuzzers, points, rng):
+    makedirs(out_dir)
+    data_files = {}
+    for (f, fuzzer) in enumerate(fuzzer_names(n_fuzzers)):
+        file_name = out_dir + '/test_' + fuzzer + '.txt'
+        write_value_file(file_name, (rng.poisson(10 + 5 * f, size=points) + 1).tolist())
+        data_files[fuzzer] = [file_name]
+    return data_files
+
+
+# the result dirs searched by confgen.py: <out>/<target>/<fuzzer><i>/<objective file>
+# returns the names of the targets and the fuzzers
+def generate_confgen(out_dir, n_fuzzers, runs, hours, density, rng, n_targets=2,
+                     objective_filenames=('edge_fuzz_time.txt', 'crash_fuzz_time.txt')):
+    targets = ['target{}-1.0'.format(t) for t in range(n_targets)]
+    fuzzers = fuzzer_names(n_fuzzers)
+    for target in targets:
+        for (f, fuzzer) in enumerate(fuzzers):
+            for i in range(runs):
+                run_dir = out_dir + '/' + target + '/' + fuzzer + str(i)
+                makedirs(run_dir)
+                for (o, objective_filename) in enumerate(objective_filenames):
+                    # the crashes are much rarer than the edges
+                    slots, values = coverage_curve(rng, hours, density / (1 + 20 * o), strength=1.0 - 0.1 * f)
+                    write_slot_file(run_dir + '/' + objective_filename, slots, values)
+    return targets, fuzzers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", "-o", required=True, type=str)
+    parser.add_argument("--kind", "-k", required=False, type=str, default='overall', choices=DATA_KINDS)
+    parser.add_argument("--fuzzers", required=False, type=int, default=3)
+    parser.add_argument("--runs", required=False, type=int, default=10)
+    parser.add_argument("--hours", required=False, type=float, default=24)
+    parser.add_argument("--density", required=False, type=float, default=40,
+                        help="average number of change points per hour of a run")
+    parser.add_argument("--points", required=False, type=int, default=1000,
+                        help="number of seeds of a fuzzer (scatterplot and histogram)")
+    parser.add_argument("--seeds", required=False, type=int, default=500,
+                        help="number of seeds of a run (traces)")
+    parser.add_argument("--seed", required=False, type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.kind == 'overall':
+        generate_overall(args.output, args.fuzzers, args.runs, args.hours, args.density, rng)
+    elif args.kind == 'plot_data':
+        generate_plot_data(args.output, args.fuzzers, args.runs, args.hours, args.density, rng)
+    elif args.kind == 'traces':
+        generate_traces(args.output, args.fuzzers, args.runs, args.hours, args.seeds, rng)
+    elif args.kind in ['stest', 'boxplot']:
+        generate_final_values(args.output, args.fuzzers, args.runs, args.hours, rng)
+    elif args.kind == 'scatterplot':
+        generate_scatter(args.output, args.fuzzers, args.points, rng)
+    elif args.kind == 'histogram':
+        generate_histogram(args.output, args.fuzzers, args.points, rng)
+    elif args.kind == 'confgen':
+        generate_confgen(args.output, args.fuzzers, args.runs, args.hours, args.density, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from data_parser import read_slot_file
+from plot_data import final_values
+from plot_utils import mkdirs
+from profiler import stage
+from render import Renderer
+
+
+# renderer: draws the figure (see render.Renderer); a new one is used if not given
+def generate_box_plots(fuzzers_dict, misc_dict, renderer=None):
+    # fill in the raw data
+    # the data for the box plot
+    box_data = []
+    box_colors = []
+    line_styles = []
+    # marker = []
+    fuzzer_names = list(fuzzers_dict.keys())
+    fuzzer_names.sort()
+    for fuzzer_name in fuzzer_names:
+        fuzzer = fuzzers_dict[fuzzer_name]
+        # use only the first data file
+        data_file = fuzzer['data_files'][0]
+
+        box_colors.append(fuzzer['box_color'])
+
+        line_styles.append(fuzzer['line_style'])
+
+        # marker.append(fuzzer['marker'])
+
+        if fuzzer['data_format'] == 'plot_data':
+            # the last row of the plot_data of every run
+            with stage('parse', fuzzer_name):
+                fuzzer['final_vals'] = final_values(fuzzer['data_files'], fuzzer['plot_data_column'])
+            box_data.append(fuzzer['final_vals'])
+            continue
+
+        if not os.path.exists(data_file):
+            fuzzer['final_vals'] = []
+            box_data.append(fuzzer['final_vals'])
+            continue
+
+        with stage('parse', fuzzer_name), open(data_file) as df:
+            lines = df.readlines()
+            fuzzer['final_vals'] = [float(x) for x in lines]
+            box_data.append(fuzzer['final_vals'])
+
+    out_dir = misc_dict['out_dir'] + '/'
+    mkdirs(out_dir)
+    base_filename = out_dir + misc_dict["project"] + misc_dict["file_postfix"]
+    filename_pdf = base_filename + '.pdf'
+    filename_png = base_filename + '.png'
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = Renderer(misc_dict['render_jobs'])
+    renderer.submit(render_box_plot, box_data, fuzzer_names, box_colors, misc_dict, [filename_pdf, filename_png])
+    if own_renderer:
+        renderer.close()
+
+
+def render_box_plot(box_data, fuzzer_names, box_colors, misc_dict, filenames):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    # notch may look weird
+    # https://stackoverflow.com/questions/26291082/weird-behavior-of-matplotlibs-boxplot-when-using-the-notch-shape
+    bp = ax.boxplot(box_data, labels=fuzzer_names, sym='k+',
+                    notch=misc_dict['notch'], patch_artist=False, widths=0.5, showfliers=False)
+
+    # this might be buggy as the order of bp['boxes'] may not follow the specified order
+    # this is to set the color for the boxes
+    # for box, color, line_style in zip(bp['boxes'], box_colors, line_styles):
+    #     box.set(facecolor=color)
+    # box.set(linestyle=line_style)
+
+    # this is buggy
+    # ['whiskers', 'fliers', 'means', 'medians', 'caps']
+    # for whisker, median, cap, line_style in zip(bp['whiskers'], bp['medians'], bp['caps'], line_styles):
+    #     whisker.set(linestyle=line_style)
+    #     median.set(linestyle=line_style)
+    #     cap.set(linestyle=line_style)
+    #     print("haha")
+    #     print(cap.get_linestyle())
+
+    # this works, but it's for all boxes
+    # for element in ['whiskers', 'means', 'medians', 'caps']:
+    #     plt.setp(bp[element], color='red', linestyle="dashed")
+
+    for median in bp['medians']:
+        median.set(color='k', linewidth=1.5)
+        x, y = median.get_data()
+        xn = (x-(x.sum()/2.))*0.5 + (x.sum()/2.)
+        ax.plot(xn, y, color="k", linewidth=5, solid_capstyle="butt", zorder=4)
+
+    # plot the dots (scatter)
+    for (i, y) in enumerate(box_data):
+        x = np.random.normal(1+i, 0.1, size=len(y))
+        ax.scatter(x, y, c=box_colors[i], alpha=0.8, s=100)
+
+    if 'ylim' in misc_dict:
+        ax.set_ylim(misc_dict['ylim'])
+
+    # ax.grid(which='major', axis='both', linestyle='--')
+    ax.grid(False)
+    if 'plot_title' in misc_dict:
+        ax.set(title=misc_dict['plot_title'])
+
+    for item in ([ax.title, ax.xaxis.label] +
+                 ax.get_xticklabels()):
+        item.set_fontsize(30)
+
+    for item in (ax.get_yticklabels()):
+        item.set_fontsize(20)
+
+    for filename in filenames:
+        fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+
+
+def generate_scatter_plots(fuzzers_dict, misc_dict):
+    fig = plt.figure(len(fuzzers_dict))
+    ax = fig.add_subplot(111)
+
+    fuzzer_names = list(fuzzers_dict.keys())
+    fuzzer_names.sort()
+    for fuzzer_name in fuzzer_names:
+        fuzzer = fuzzers_dict[fuzzer_name]
+
+        # use only the first data file
+        data_file = fuzzer['data_files'][0]
+        with stage('parse', fuzzer_name):
+            xs, ys = read_slot_file(data_file)
+
+        fuzzer['final_xs'] = xs.tolist()
+        fuzzer['final_ys'] = ys.tolist()
+
+        set_line_color = 'line_color' in fuzzer
+
+        if set_line_color:
+            ax.scatter(xs, ys, c=fuzzer['line_color'],
+                       alpha=1, s=20, label=fuzzer_name)
+        else:
+            ax.scatter(xs, ys, alpha=1, s=20, label=fuzzer_name)
+
+    # ax.set_xscale('log')
+    ax.set_yscale('log')
+    if 'plot_title' in misc_dict:
+        ax.set(title=misc_dict['plot_title'])
+    ax.set(xlabel=misc_dict['xlabel'], ylabel=misc_dict['ylabel'])
+
+    large_font = misc_dict['large_font']
+
+    if large_font:
+        ax.legend(fontsize=15)
+    else:
+        ax.legend()
+
+    if large_font:
+        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label] + ax.get_xticklabels()):
+            item.set_fontsize(15)
+
+        for tick in ax.get_xticklabels():
+            tick.set_rotation(45)
+
+        for item in (ax.get_yticklabels()):
+            item.set_fontsize(15)
+
+    out_dir = misc_dict['out_dir'] + '/'
+    mkdirs(out_dir)
+    base_filename = out_dir + misc_dict["project"] + misc_dict["file_postfix"]
+    filename_pdf = base_filename + '.pdf'
+    filename_png = base_filename + '.png'
+
+    with stage('render'):
+        fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
+        fig.savefig(filename_png, bbox_inches='tight', dpi=100)
+
+
+def draw_histograms(histtype, figure_no, xss, colors, fuzzer_names, misc_dict):
+    fig = plt.figure(figure_no)
+    ax = fig.add_subplot(111)
+    n_bins = misc_dict['n_bins']
+    ax.hist(x=xss, bins=n_bins, histtype=histtype,
+            color=colors, label=fuzzer_names)
+
+    # ax.set_xscale('log')
+    ax.set_yscale('log')
+    if 'plot_title' in misc_dict:
+        ax.set(title=misc_dict['plot_title'])
+    ax.set(xlabel=misc_dict['xlabel'], ylabel=misc_dict['ylabel'])
+    # scientific notation for x axis labels
+    # ax.ticklabel_format(style='sci', axis='x', scilimits=(1, 4))
+
+    large_font = misc_dict['large_font']
+
+    if large_font:
+        ax.legend(fontsize=15)
+    else:
+        ax.legend()
+
+    if large_font:
+        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label] + ax.get_xticklabels()):
+            item.set_fontsize(15)
+
+        for tick in ax.get_xticklabels():
+            tick.set_rotation(45)
+
+        for item in (ax.get_yticklabels()):
+            item.set_fontsize(15)
+
+    out_dir = misc_dict['out_dir'] + '/'
+    mkdirs(out_dir)
+    base_filename = out_dir + \
+        misc_dict["project"] + misc_dict["file_postfix"] + '-' + histtype
+    filename_pdf = base_filename + '.pdf'
+    filename_png = base_filename + '.png'
+
+    fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
+    fig.savefig(filename_png, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+
+
+# renderer: draws the figures (see render.Renderer); a new one is used if not given
+def generate_histograms(fuzzers_dict, misc_dict, renderer=None):
+
+    fuzzer_names = list(fuzzers_dict.keys())
+    fuzzer_names.sort()
+    xss = []
+    colors = []
+    for fuzzer_name in fuzzer_names:
+        fuzzer = fuzzers_dict[fuzzer_name]
+
+        # use only the first data file
+        data_file = fuzzer['data_files'][0]
+        with stage('parse', fuzzer_name), open(data_file) as df:
+            lines = df.readlines()
+            xs = []
+            for line in lines:
+                if len(line.strip()) > 0:
+                    xs.append(int(line))
+
+            fuzzer['final_xs'] = xs
+            xss.append(xs)
+
+        set_line_color = 'line_color' in fuzzer
+
+        if set_line_color:
+            colors.append(fuzzer['line_color'])
+        else:
+            colors.append('xkcd:slate grey')
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = Renderer(misc_dict['render_jobs'])
+    renderer.submit(draw_histograms, 'bar', 1, xss, colors, fuzzer_names, misc_dict)
+    renderer.submit(draw_histograms, 'barstacked', 2, xss, colors, fuzzer_names, misc_dict)
+    renderer.submit(draw_histograms, 'step', 3, xss, colors, fuzzer_names, misc_dict)
+    renderer.submit(draw_histograms, 'stepfilled', 4, xss, colors, fuzzer_names, misc_dict)
+    if own_renderer:
+        renderer.close()
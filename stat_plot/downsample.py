@@ -0,0 +1,72 @@
+import numpy as np
+
+
+# the points needed to draw the step-like curves ys (sampled at the same x) without any change:
+# the first and last point, and both ends of every step edge of any of the curves
+def step_corners(ys):
+    n = len(ys[0])
+    changed = np.zeros(n, dtype=bool)
+    for y in ys:
+        changed[1:] |= y[1:] != y[:-1]
+    keep = changed.copy()
+    # the last point before the edge
+    keep[:-1] |= changed[1:]
+    keep[0] = True
+    keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+# per-bucket envelope: in every bucket of points keep the first and last point and the points where
+# the curves reach their minimum and maximum, so peaks and the band extremes survive the decimation
+def minmax_indices(idx, ys, n_buckets):
+    buckets = np.array_split(idx, n_buckets)
+    kept = []
+    for bucket in buckets:
+        if len(bucket) == 0:
+            continue
+        kept.append(bucket[[0, -1]])
+        for y in ys:
+            values = y[bucket]
+            kept.append(bucket[[np.argmin(values), np.argmax(values)]])
+    return np.unique(np.concatenate(kept))
+
+
+# largest-triangle-three-buckets on the first curve; the other curves are taken at the same points
+def lttb_indices(idx, x, y, n_out):
+    if n_out >= len(idx) or n_out < 3:
+        return idx
+
+    kept = [idx[0]]
+    buckets = np.array_split(idx[1:-1], n_out - 2)
+    for (b, bucket) in enumerate(buckets):
+        if b + 1 < len(buckets):
+            next_bucket = buckets[b + 1]
+        else:
+            next_bucket = idx[-1:]
+        avg_x = x[next_bucket].mean()
+        avg_y = y[next_bucket].mean()
+        prev = kept[-1]
+        # twice the area of the triangle (prev, candidate, average of the next bucket)
+        areas = np.abs((x[prev] - avg_x) * (y[bucket] - y[prev]) - (x[prev] - x[bucket]) * (avg_y - y[prev]))
+        kept.append(bucket[np.argmax(areas)])
+    kept.append(idx[-1])
+    return np.array(kept)
+
+
+# the indexes of the points to plot for the curves ys (the mean, lower and upper bound) at x
+# at most about max_points are kept; the step edges are kept as long as they fit in the budget,
+# and the first and final values are always kept
+def downsample_indices(x, ys, max_points, method='minmax'):
+    x = np.asarray(x, dtype=np.float64)
+    ys = [np.asarray(y, dtype=np.float64) for y in ys]
+
+    idx = step_corners(ys)
+    if len(idx) <= max_points:
+        return idx
+
+    if method == 'lttb':
+        return lttb_indices(idx, x, ys[0], max_points)
+
+    # up to 2 + 2 * len(ys) points per bucket
+    n_buckets = max(1, max_points // (2 + 2 * len(ys)))
+    return minmax_indices(idx, ys, n_buckets)
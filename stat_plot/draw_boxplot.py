@@ -4,6 +4,7 @@
 
 import toml
 import argparse
+import json
 import os
 import re
 from pathlib import Path
@@ -15,12 +16,145 @@ import pandas as pd
 import numpy as np
 from matplotlib.figure import figaspect
 
+from aligned_store import load_aligned_store
+from render import Renderer
+
+# the points of every run drawn over the boxes and violins: 'swarm' (no overlap, but its layout is O(n^2)),
+# 'strip' (random jitter), 'none', or 'auto' (swarm up to SWARM_MAX_RUNS runs per fuzzer, strip above)
+OVERLAYS = ['swarm', 'strip', 'none', 'auto']
+SWARM_MAX_RUNS = 100
+
+# the values of every run at the data points, next to the aligned dir of a plot config
+DATA_POINTS_CACHE = 'data_points.json'
+
+
+# the files of the aligned store of every fuzzer (name, size and mtime); they are rewritten whenever the data changes
+def aligned_stores_key(plot_aligned_dir, fuzzers):
+    key = {}
+    for fuzzer in fuzzers:
+        aligned_dir = plot_aligned_dir + '/' + fuzzer
+        key[fuzzer] = []
+        for filename in sorted(os.listdir(aligned_dir)):
+            stat = os.stat(aligned_dir + '/' + filename)
+            key[fuzzer].append([filename, stat.st_size, stat.st_mtime_ns])
+    return key
+
+
+# fuzzer -> runs x data_points, the value of every run at every data point (in seconds)
+# every aligned store is loaded once (memory-mapped) for all the data points
+# a data point past the end of a run takes the last value of the run
+def extract_data_points(plot_aligned_dir, fuzzers, data_points):
+    points = np.asarray(data_points, dtype=np.int64)
+    values = {}
+    for fuzzer in fuzzers:
+        series_list = load_aligned_store(plot_aligned_dir + '/' + fuzzer)
+        values[fuzzer] = [series.values_at(np.minimum(points, series.length) - 1).tolist() for series in series_list]
+    return values
+
+
+# the same as extract_data_points, reused from the cache of the plot config when neither the aligned stores nor the
+# data points changed (e.g. when only the style of the plots changed)
+def load_data_points(plot_out_path, plot_aligned_dir, fuzzers, data_points, verbose):
+    cache_file = plot_out_path + '/' + DATA_POINTS_CACHE
+    key = {'data_points': list(data_points), 'stores': aligned_stores_key(plot_aligned_dir, fuzzers)}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file) as handle:
+                cached = json.load(handle)
+            if cached.get('key') == key:
+                if verbose:
+                    print(f"reusing the data points in {cache_file}")
+                return cached['values']
+        except ValueError:
+            print(f"[!] ignoring corrupted data point cache: {cache_file}")
+
+    values = extract_data_points(plot_aligned_dir, fuzzers, data_points)
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as handle:
+        json.dump({'key': key, 'values': values}, handle)
+    os.replace(tmp_file, cache_file)
+    return values
+
+
+# draw the points of every run over the boxes or the violins
+def draw_overlay(ax, data, overlay):
+    if overlay == 'auto':
+        overlay = 'swarm' if len(data.index) <= SWARM_MAX_RUNS else 'strip'
+    if overlay == 'swarm':
+        sns.swarmplot(ax=ax, orient="v", data=data, color=".25", size=8)
+    elif overlay == 'strip':
+        sns.stripplot(ax=ax, orient="v", data=data, color=".25", size=4, alpha=0.5, jitter=0.25)
+
+
+# the boxplot and the violinplot of one data point of a plot config
+# runs in a render worker when --render-jobs > 1 (see render.Renderer); a failed plot is only reported
+def render_section(fuzzer_data, conf_dict, overlay, out_dir_path, out_dir_name, data_point, plot_target, plot_postfix):
+    # data = np.array([fuzzer_data[fuzzer] for fuzzer in fuzzer_data]).T.tolist()
+    try:
+        data = pd.DataFrame(data=fuzzer_data)
+        # TODO move duplicate code into functions; make more things configurable
+        w, h = figaspect(0.618)  # golden ratio
+        fig, ax = plt.subplots(figsize=(w, h))
+        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label]):
+            item.set_fontsize(16)
+        for item in (ax.get_xticklabels()):
+            item.set_fontsize(16)
+            # item.set_rotation(45)
+        for item in (ax.get_yticklabels()):
+            item.set_fontsize(16)
+        # for tick in ax.get_xticklabels():
+        #     tick.set_rotation(45)
+        # palette: "Greys", "ch:.25",
+        if conf_dict['y_start_0']:
+            ax.set_ylim(ymin=0)
+        box = sns.boxplot(ax=ax, data=data, orient="v", width=conf_dict['width'], palette=conf_dict['color_palette'],
+                          fliersize=0, dodge=False)
+        draw_overlay(ax, data, overlay)
+
+        box.set_ylabel('# edges')
+
+        out_file_name_base = f'boxplot-{data_point}-{plot_target}-{plot_postfix}'
+
+        fig.savefig(out_dir_path+'/'+out_file_name_base+'.png')
+        fig.savefig(out_dir_path+'/'+out_file_name_base+'.pdf')
+        plt.close(fig)
+
+        w, h = figaspect(0.618)  # golden ratio
+        fig, ax = plt.subplots(figsize=(w, h))
+        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label]):
+            item.set_fontsize(16)
+        for item in (ax.get_yticklabels()):
+            item.set_fontsize(16)
+        # for tick in ax.get_xticklabels():
+        #     tick.set_rotation(45)
+        if conf_dict['y_start_0']:
+            ax.set_ylim(ymin=0)
+        violin = sns.violinplot(ax=ax, data=data, orient="v", width=conf_dict['width'],
+                                palette=conf_dict['color_palette'], dodge=False, scale='width')
+        draw_overlay(ax, data, overlay)
+
+        violin.set_ylabel('# edges')
+
+        out_file_name_base = f'violinplot-{data_point}-{plot_target}-{plot_postfix}'
+
+        fig.savefig(out_dir_path+'/'+out_file_name_base+'.png')
+        fig.savefig(out_dir_path+'/'+out_file_name_base+'.pdf')
+        plt.close(fig)
+    except Exception as e:
+        print(e)
+        print(f'skipping the plot for {out_dir_name}')
+        plt.close('all')
+
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", "-c", required=True, type=str)
     parser.add_argument("--verbose", "-v", required=False, action="store_true")
     parser.add_argument("--inputs", "-i", action='append', required=True)
+    parser.add_argument("--render-jobs", "-j", required=False, type=int,
+                        help="number of render worker processes (overrides 'render_jobs' in the config)")
+    parser.add_argument("--overlay", required=False, type=str, choices=OVERLAYS,
+                        help="how the runs are drawn over the plots (overrides 'overlay' in the config)")
     args = parser.parse_args()
 
     config_path = os.path.abspath(args.config)
@@ -33,6 +167,18 @@ def main():
         conf_dict = toml.load(config_file)
         # TODO check config validity
 
+    render_jobs = args.render_jobs if args.render_jobs is not None else conf_dict.get('render_jobs', 1)
+    if not isinstance(render_jobs, int) or render_jobs < 1:
+        print("[!] invalid render_jobs: {}".format(render_jobs))
+        exit(1)
+    overlay = args.overlay if args.overlay is not None else conf_dict.get('overlay', 'swarm')
+    if overlay not in OVERLAYS:
+        print("[!] invalid overlay: {}, valid values: {}".format(overlay, ', '.join(OVERLAYS)))
+        exit(1)
+
+    # the plots of all the configs and data points are drawn by the same render workers
+    renderer = Renderer(render_jobs)
+
     # draw a set of box plots for every folder
     for plot_dir in args.inputs:
         if not os.path.isdir(plot_dir):
@@ -59,9 +205,11 @@ def main():
             plot_postfix = plot_conf_dict['misc']['file_postfix']
 
             fuzzers = os.listdir(plot_aligned_dir)
+            fuzzer_values = load_data_points(plot_out_path, plot_aligned_dir, fuzzers, conf_dict['data_points'],
+                                             verbose)
 
             # draw an individual boxplot for every data point
-            for data_point in conf_dict['data_points']:
+            for (d, data_point) in enumerate(conf_dict['data_points']):
                 out_dir_name = f'section-{data_point}-{plot_target}-{plot_postfix}'
                 out_dir_path = os.path.abspath(plot_dir + '/' + out_dir_name)
                 if not os.path.exists(out_dir_path):
@@ -71,79 +219,19 @@ def main():
                 fuzzer_data = {}
                 min_item_no = -1
                 for fuzzer in fuzzers:
-                    fuzzer_data[fuzzer] = []
-                    fuzzer_data_dir = plot_aligned_dir + '/' + fuzzer
-                    fuzzer_data_files = os.listdir(fuzzer_data_dir)
-                    if min_item_no == -1 or len(fuzzer_data_files) < min_item_no:
-                        min_item_no = len(fuzzer_data_files)
-                    for fuzzer_data_file in fuzzer_data_files:
-                        with open(fuzzer_data_dir + '/' + fuzzer_data_file) as data_file:
-                            lines = data_file.readlines()
-                            data_point = min(data_point, len(lines))
-                            fuzzer_data[fuzzer].append(int(lines[data_point-1]))
+                    if min_item_no == -1 or len(fuzzer_values[fuzzer]) < min_item_no:
+                        min_item_no = len(fuzzer_values[fuzzer])
+                    fuzzer_data[fuzzer] = [run_values[d] for run_values in fuzzer_values[fuzzer]]
 
                 # trim the fuzzer_data so that all of them aligns for pandas DataFrame
                 # TODO this may not be a desired default behavior, make this configurable
                 for fuzzer in fuzzer_data:
                     fuzzer_data[fuzzer] = fuzzer_data[fuzzer][0:min_item_no]
 
-                # data = np.array([fuzzer_data[fuzzer] for fuzzer in fuzzer_data]).T.tolist()
-                try:
-                    data = pd.DataFrame(data=fuzzer_data)
-                    # TODO move duplicate code into functions; make more things configurable
-                    w, h = figaspect(0.618)  # golden ratio
-                    fig, ax = plt.subplots(figsize=(w, h))
-                    for item in ([ax.title, ax.xaxis.label, ax.yaxis.label]):
-                        item.set_fontsize(16)
-                    for item in (ax.get_xticklabels()):
-                        item.set_fontsize(16)
-                        # item.set_rotation(45)
-                    for item in (ax.get_yticklabels()):
-                        item.set_fontsize(16)
-                    # for tick in ax.get_xticklabels():
-                    #     tick.set_rotation(45)
-                    # palette: "Greys", "ch:.25",
-                    if conf_dict['y_start_0']:
-                        ax.set_ylim(ymin=0)
-                    box = sns.boxplot(ax=ax, data=data, orient="v", width=conf_dict['width'], palette=conf_dict['color_palette'], fliersize=0,
-                                      dodge=False)
-                    swarm = sns.swarmplot(ax=ax, orient="v", data=data, color=".25", size=8)
-
-                    box.set_ylabel('# edges')
-
-                    out_file_name_base = f'boxplot-{data_point}-{plot_target}-{plot_postfix}'
-
-                    plt.savefig(out_dir_path+'/'+out_file_name_base+'.png')
-                    plt.savefig(out_dir_path+'/'+out_file_name_base+'.pdf')
-                    plt.clf()
-                    plt.close(fig)
-
-                    w, h = figaspect(0.618)  # golden ratio
-                    fig, ax = plt.subplots(figsize=(w, h))
-                    for item in ([ax.title, ax.xaxis.label, ax.yaxis.label]):
-                        item.set_fontsize(16)
-                    for item in (ax.get_yticklabels()):
-                        item.set_fontsize(16)
-                    # for tick in ax.get_xticklabels():
-                    #     tick.set_rotation(45)
-                    if conf_dict['y_start_0']:
-                        ax.set_ylim(ymin=0)
-                    violin = sns.violinplot(ax=ax, data=data, orient="v", width=conf_dict['width'], palette=conf_dict['color_palette'], dodge=False,
-                                            scale='width')
-                    swarm = sns.swarmplot(ax=ax, orient="v", data=data, color=".25", size=8)
-
-                    violin.set_ylabel('# edges')
-
-                    out_file_name_base = f'violinplot-{data_point}-{plot_target}-{plot_postfix}'
-
-                    plt.savefig(out_dir_path+'/'+out_file_name_base+'.png')
-                    plt.savefig(out_dir_path+'/'+out_file_name_base+'.pdf')
-                    plt.clf()
-
-                    plt.close(fig)
-                except Exception as e:
-                    print(e)
-                    print(f'skipping the plot for {out_dir_name}')
+                renderer.submit(render_section, fuzzer_data, conf_dict, overlay, out_dir_path, out_dir_name,
+                                data_point, plot_target, plot_postfix)
+
+    renderer.close()
 
 
 if __name__ == "__main__":
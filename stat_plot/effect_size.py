@@ -0,0 +1,27 @@
+import numpy as np
+
+
+# Vargha-Delaney A12: the chance of f1s < f2s (ties count as 0.5)
+# sorts f2s once and counts, for every value of f1s, the values of f2s that are
+# greater or equal with a binary search, so it is O((m + n) log n) instead of O(m * n)
+def calculate_a12(f1s, f2s):
+    f1s = np.asarray(f1s, dtype=np.float64)
+    f2s = np.asarray(f2s, dtype=np.float64)
+    m = len(f1s)
+    n = len(f2s)
+
+    # nan (e.g. an empty csv cell) is neither smaller than nor equal to anything
+    f1s = f1s[~np.isnan(f1s)]
+    f2s = np.sort(f2s[~np.isnan(f2s)])
+
+    not_greater = np.searchsorted(f2s, f1s, side='right')
+    less = np.searchsorted(f2s, f1s, side='left')
+
+    # the counts are integers, so the numerator is exact
+    greater_count = int(len(f2s) * len(f1s) - not_greater.sum())
+    tie_count = int((not_greater - less).sum())
+
+    numerator = greater_count + 0.5 * tie_count
+    denominator = float(m * n)
+    a12 = numerator / denominator
+    return a12
@@ -1,14 +1,113 @@
 import argparse
 import os
+import sys
 
-from conf import *
-from stat_plot import *
+import profiler
+from conf import parse_config
 
+# the subcommands and the stat_type they run, 'validate' only checks the config and 'watch' keeps an 'overall'
+# config up to date while its data files grow
+# with only the options (main.py -c $CONFIG), the stat_type of the config is run
+MODES = {
+    'plot': 'overall',
+    'stest': 'stest',
+    'boxplot': 'boxplot',
+    'scatter': 'scatterplot',
+    'histogram': 'histogram',
+    'overlap': 'overlap'
+}
 
-def main():
-    parser = argparse.ArgumentParser()
+
+# aligned: only for 'overall', the data of the fuzzers is already aligned
+# renderer: draws the figures (see render.Renderer); a new one is used if not given
+# the module of a stat_type is only imported when it runs: matplotlib and scipy.stats take about a second to
+# import, which e.g. 'stest' or 'validate' do not need
+def run_config(fuzzers_dict, misc_dict, aligned=False, renderer=None):
+    if misc_dict['stat_type'] == 'overall':
+        from stat_plot import generate_plots
+        generate_plots(fuzzers_dict, misc_dict, aligned, renderer)
+    elif misc_dict['stat_type'] == 'stest':
+        from stest import generate_stat_data
+        generate_stat_data(fuzzers_dict, misc_dict)
+    elif misc_dict['stat_type'] == 'boxplot':
+        from dist_plots import generate_box_plots
+        generate_box_plots(fuzzers_dict, misc_dict, renderer)
+    elif misc_dict['stat_type'] == 'scatterplot':
+        from dist_plots import generate_scatter_plots
+        generate_scatter_plots(fuzzers_dict, misc_dict)
+    elif misc_dict['stat_type'] == 'histogram':
+        from dist_plots import generate_histograms
+        generate_histograms(fuzzers_dict, misc_dict, renderer)
+    elif misc_dict['stat_type'] == 'overlap':
+        from overlap import generate_overlap
+        generate_overlap(fuzzers_dict, misc_dict, renderer)
+
+
+# the data files of the config that do not exist
+def missing_data_files(fuzzers_dict):
+    missing = []
+    for fuzzer_name in fuzzers_dict:
+        for data_file in fuzzers_dict[fuzzer_name]['data_files']:
+            if not os.path.exists(data_file):
+                missing.append(data_file)
+    return missing
+
+
+def validate(config_path, fuzzers_dict, misc_dict):
+    missing = missing_data_files(fuzzers_dict)
+    for data_file in missing:
+        print("[!] data file: {} does not exist!".format(data_file))
+
+    n_files = sum(len(fuzzers_dict[fuzzer_name]['data_files']) for fuzzer_name in fuzzers_dict)
+    print("[*] config: {} is valid: stat_type {}, {} fuzzers, {} data files ({} missing), out_dir {}".format(
+        config_path, misc_dict['stat_type'], len(fuzzers_dict), n_files, len(missing), misc_dict.get('out_dir')))
+
+
+def add_run_arguments(parser):
     parser.add_argument("--config", "-c", required=True, type=str)
-    args = parser.parse_args()
+    parser.add_argument("--jobs", "-j", required=False, type=int,
+                        help="number of worker processes (overrides 'jobs' in [misc])")
+    parser.add_argument("--render-jobs", required=False, type=int,
+                        help="number of render worker processes (overrides 'render_jobs' in [misc])")
+    parser.add_argument("--profile", required=False, type=str,
+                        help="write the time, io and memory used by every stage to this json file")
+    parser.add_argument("--profile-stage", required=False, type=str,
+                        help="with --profile, also dump the cProfile stats of this stage (e.g. parse, ci, render)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+
+    # the old form: main.py -c $CONFIG, runs the stat_type of the config
+    if len(sys.argv) > 1 and sys.argv[1].startswith('-') and sys.argv[1] not in ['-h', '--help']:
+        add_run_arguments(parser)
+        parser.set_defaults(mode=None)
+        return parser.parse_args()
+
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+    for mode in MODES:
+        add_run_arguments(subparsers.add_parser(mode, help="run a '{}' config".format(MODES[mode])))
+    watch_parser = subparsers.add_parser('watch', help="follow the data files of an 'overall' config and refresh "
+                                                       "the plots and stats while they grow")
+    add_run_arguments(watch_parser)
+    watch_parser.add_argument("--interval", required=False, type=float, default=60,
+                              help="seconds between two refreshes")
+    watch_parser.add_argument("--refreshes", required=False, type=int,
+                              help="stop after this many refreshes (default: until interrupted)")
+    validate_parser = subparsers.add_parser('validate', help="only check the config and its data files")
+    validate_parser.add_argument("--config", "-c", required=True, type=str)
+    validate_parser.add_argument("--strict", required=False, action="store_true",
+                                 help="also fail if a data file does not exist")
+    return parser.parse_args()
+
+
+def main():
+    # add_subparsers(required=) and the numpy / scipy versions of requirements.txt
+    if sys.version_info < (3, 7):
+        print("[!] stat_plot needs Python >= 3.7, not {}.{}".format(*sys.version_info[:2]))
+        exit(1)
+
+    args = parse_args()
 
     config_path = os.path.abspath(args.config)
 
@@ -19,16 +118,42 @@ def main():
         print("[!] config: {} is not valid!".format(config_path))
         exit(1)
 
-    if misc_dict['stat_type'] == 'overall':
-        generate_plots(fuzzers_dict, misc_dict)
-    elif misc_dict['stat_type'] == 'stest':
-        generate_stat_data(fuzzers_dict, misc_dict)
-    elif misc_dict['stat_type'] == 'boxplot':
-        generate_box_plots(fuzzers_dict, misc_dict)
-    elif misc_dict['stat_type'] == 'scatterplot':
-        generate_scatter_plots(fuzzers_dict, misc_dict)
-    elif misc_dict['stat_type'] == 'histogram':
-        generate_histograms(fuzzers_dict, misc_dict)
+    if args.mode == 'validate':
+        validate(config_path, fuzzers_dict, misc_dict)
+        if args.strict and len(missing_data_files(fuzzers_dict)) > 0:
+            exit(1)
+        return
+
+    stat_type = 'overall' if args.mode == 'watch' else MODES.get(args.mode)
+    if stat_type is not None and stat_type != misc_dict['stat_type']:
+        print("[!] config: {} has stat_type {}, not {}!".format(config_path, misc_dict['stat_type'], stat_type))
+        exit(1)
+
+    if args.jobs is not None:
+        if args.jobs < 1:
+            print("[!] invalid --jobs: {}".format(args.jobs))
+            exit(1)
+        misc_dict['jobs'] = args.jobs
+
+    if args.render_jobs is not None:
+        if args.render_jobs < 1:
+            print("[!] invalid --render-jobs: {}".format(args.render_jobs))
+            exit(1)
+        misc_dict['render_jobs'] = args.render_jobs
+
+    if args.profile is not None:
+        profiler.enable(args.profile, args.profile_stage)
+
+    if args.mode == 'watch':
+        if args.interval < 0:
+            print("[!] invalid --interval: {}".format(args.interval))
+            exit(1)
+        from watch import watch
+        watch(fuzzers_dict, misc_dict, args.interval, args.refreshes)
+    else:
+        run_config(fuzzers_dict, misc_dict)
+
+    profiler.finish()
 
 
 if __name__ == "__main__":
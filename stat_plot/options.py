@@ -0,0 +1,28 @@
+# the accepted values of the [misc] options, checked by conf.py
+# kept apart from the modules that implement them, so that reading a config does not import numpy or scipy
+
+BOOTSTRAP_METHODS = ['percentile', 'bca']
+CI_STATISTICS = ['mean', 'median']
+
+DOWNSAMPLE_METHODS = ['minmax', 'lttb']
+
+# the tests computed for every pair of fuzzers
+PAIRWISE_TESTS = ['t_test', 'mwu', 'a12']
+# the tests with a p-value, i.e. the ones the correction applies to
+P_VALUE_TESTS = ['t_test', 'mwu']
+P_ADJUST_METHODS = ['none', 'holm', 'bonferroni']
+
+# the formats of the data files of a fuzzer: the "slot:value" files of showmaps, or the plot_data of AFL / AFL++
+DATA_FORMATS = ['showmaps', 'plot_data']
+# the integer columns of plot_data that can be plotted (see plot_data.py), and the AFL++ names of some of them
+PLOT_DATA_COLUMNS = ['cycles_done', 'cur_path', 'paths_total', 'pending_total', 'pending_favs', 'unique_crashes',
+                     'unique_hangs', 'max_depth', 'total_execs', 'edges_found']
+PLOT_DATA_ALIASES = {
+    'cur_item': 'cur_path',
+    'corpus_count': 'paths_total',
+    'saved_crashes': 'unique_crashes',
+    'saved_hangs': 'unique_hangs'
+}
+
+# the 'overlap' stat_type keeps one bit per fuzzer for every edge
+MAX_OVERLAP_FUZZERS = 64
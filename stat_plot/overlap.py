@@ -0,0 +1,232 @@
+###################
+# the 'overlap' stat_type: which edges every fuzzer reaches that the others never do
+# the data files of a fuzzer are the showmaps output dirs of its runs (run without -s, see trace_bits.py); the seeds
+# of every run are OR-ed into one union bitmap per fuzzer, and the set differences and intersections of the fuzzers
+# are computed on the bitmaps
+###################
+
+import csv
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from plot_utils import mkdirs
+from profiler import stage
+from render import Renderer
+from trace_bits import MAP_SIZE, MAP_WORDS, SeedTraces, popcount, union_bits
+
+
+# the union bitmap and the number of seeds of one run; runs in the worker processes when jobs > 1
+# only one run is loaded at a time (its bitsets are memory-mapped), so the memory does not grow with the runs
+# cache_dir: where the bitsets of the run are kept between invocations (never the input dir), None for no cache
+def run_union(run_dir, queue_dir, max_slot, cache_dir):
+    traces = SeedTraces.load(run_dir, queue_dir, cache_dir)
+    if max_slot is not None:
+        traces = traces.until(max_slot)
+    return union_bits(traces.bits), len(traces)
+
+
+# the trace bitset cache of the j-th run of a fuzzer, under out_dir so that the input dirs are only read
+def trace_cache_dir(misc_dict, fuzzer_name, j):
+    if not misc_dict['trace_cache']:
+        return None
+    return misc_dict['out_dir'] + '/cache/traces/' + fuzzer_name + '/' + str(j)
+
+
+# the union bitmap of every run of every fuzzer (in the order of fuzzer_names)
+def load_run_unions(fuzzers_dict, fuzzer_names, misc_dict):
+    max_slot = int(misc_dict['max_time'] * 3600) if 'max_time' in misc_dict else None
+    tasks = []
+    for fuzzer_name in fuzzer_names:
+        fuzzer = fuzzers_dict[fuzzer_name]
+        queue_dirs = fuzzer.get('queue_dirs', [])
+        queue_dirs = queue_dirs + [None] * (len(fuzzer['data_files']) - len(queue_dirs))
+        tasks += [(fuzzer_name, run_dir, queue_dir, trace_cache_dir(misc_dict, fuzzer_name, j))
+                  for (j, (run_dir, queue_dir)) in enumerate(zip(fuzzer['data_files'], queue_dirs))]
+
+    jobs = misc_dict['jobs']
+    with stage('parse'):
+        if jobs > 1 and len(tasks) > 1:
+            print("[*] loading {} runs with {} jobs".format(len(tasks), jobs))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(run_union, [task[1] for task in tasks], [task[2] for task in tasks],
+                                            [max_slot] * len(tasks), [task[3] for task in tasks]))
+        else:
+            results = [run_union(run_dir, queue_dir, max_slot, cache_dir)
+                       for (_, run_dir, queue_dir, cache_dir) in tasks]
+
+    run_unions = {fuzzer_name: [] for fuzzer_name in fuzzer_names}
+    for ((fuzzer_name, _, _, _), result) in zip(tasks, results):
+        run_unions[fuzzer_name].append(result)
+    return run_unions
+
+
+# the F x F matrices of a list of union bitmaps (F x MAP_WORDS):
+#   difference[a][b]    the edges of a that b never reaches (difference[a][a] = 0)
+#   intersection[a][b]  the edges reached by both (intersection[a][a] = the edges of a)
+def overlap_matrices(unions):
+    difference = popcount(unions[:, None, :] & ~unions[None, :, :])
+    intersection = popcount(unions[:, None, :] & unions[None, :, :])
+    return difference, intersection
+
+
+# the membership of every edge: bit f is set if fuzzer f reaches the edge (see options.MAX_OVERLAP_FUZZERS)
+def edge_memberships(unions):
+    edge_bits = (unions.view(np.uint8)[:, :, None] >> np.arange(8, dtype=np.uint8)) & 1
+    edge_bits = edge_bits.reshape(len(unions), MAP_SIZE).astype(np.uint64)
+    weights = np.left_shift(np.uint64(1), np.arange(len(unions), dtype=np.uint64))
+    return (edge_bits * weights[:, None]).sum(axis=0, dtype=np.uint64)
+
+
+# the UpSet data: the number of edges reached by exactly every combination of fuzzers, the largest first
+# returns [(indexes of the fuzzers, edges)]
+def combinations(memberships):
+    values, counts = np.unique(memberships[memberships != 0], return_counts=True)
+    order = np.lexsort((values, -counts))
+    return [([f for f in range(int(values[i]).bit_length()) if int(values[i]) >> f & 1], int(counts[i]))
+            for i in order]
+
+
+def write_text_report(filename, fuzzer_names, report):
+    width = max(len(name) for name in fuzzer_names + ['A \\ B']) + 2
+    with open(filename, 'w') as handle:
+        handle.write("### edges of A that B never reaches (A \\ B) ###\n")
+        handle.write('A \\ B'.ljust(width) + ''.join(name.rjust(width) for name in fuzzer_names) + '\n')
+        for (a, name) in enumerate(fuzzer_names):
+            handle.write(name.ljust(width) + ''.join(str(v).rjust(width) for v in report['difference'][a]) + '\n')
+        handle.write("------------------\n\n")
+
+        handle.write("### edges reached by both ###\n")
+        handle.write(''.ljust(width) + ''.join(name.rjust(width) for name in fuzzer_names) + '\n')
+        for (a, name) in enumerate(fuzzer_names):
+            handle.write(name.ljust(width) + ''.join(str(v).rjust(width) for v in report['intersection'][a]) + '\n')
+        handle.write("------------------\n\n")
+
+        handle.write("### edges per fuzzer ###\n")
+        for name in fuzzer_names:
+            handle.write("{}: {} edges, {} only reached by it, runs: {}\n".format(
+                name, report['edges'][name], len(report['unique_edges'][name]),
+                ', '.join(str(run['edges']) for run in report['runs'][name])))
+        handle.write("all: {} edges reached by any fuzzer, {} by every fuzzer\n".format(
+            report['union'], report['core']))
+        handle.write("------------------\n\n")
+
+
+def write_matrix_csv(filename, fuzzer_names, matrix):
+    with open(filename, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow([''] + fuzzer_names)
+        for (a, name) in enumerate(fuzzer_names):
+            writer.writerow([name] + list(matrix[a]))
+
+
+def write_upset_csv(filename, fuzzer_names, combos):
+    with open(filename, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(fuzzer_names + ['degree', 'edges'])
+        for (members, count) in combos:
+            writer.writerow([int(f in members) for f in range(len(fuzzer_names))] + [len(members), count])
+
+
+def generate_overlap(fuzzers_dict, misc_dict, renderer=None):
+    fuzzer_names = sorted(fuzzers_dict.keys())
+    run_unions = load_run_unions(fuzzers_dict, fuzzer_names, misc_dict)
+
+    with stage('stats'):
+        unions = np.zeros((len(fuzzer_names), MAP_WORDS), dtype=np.uint64)
+        for (f, fuzzer_name) in enumerate(fuzzer_names):
+            for (run_bits, _) in run_unions[fuzzer_name]:
+                unions[f] |= run_bits
+
+        difference, intersection = overlap_matrices(unions)
+        memberships = edge_memberships(unions)
+        combos = combinations(memberships)
+        all_fuzzers = np.uint64((1 << len(fuzzer_names)) - 1)
+
+        report = {
+            'fuzzers': fuzzer_names,
+            'edges': {name: int(intersection[f][f]) for (f, name) in enumerate(fuzzer_names)},
+            'runs': {name: [{'data_file': run_dir, 'seeds': n_seeds, 'edges': int(popcount(run_bits))}
+                            for (run_dir, (run_bits, n_seeds)) in zip(fuzzers_dict[name]['data_files'],
+                                                                      run_unions[name])]
+                     for name in fuzzer_names},
+            'union': int(np.count_nonzero(memberships)),
+            'core': int(np.count_nonzero(memberships == all_fuzzers)),
+            'difference': difference.tolist(),
+            'intersection': intersection.tolist(),
+            # the ids of the edges only reached by one fuzzer
+            'unique_edges': {name: np.flatnonzero(memberships == np.uint64(1 << f)).tolist()
+                             for (f, name) in enumerate(fuzzer_names)},
+            'combinations': [{'fuzzers': [fuzzer_names[f] for f in members], 'edges': count}
+                             for (members, count) in combos]
+        }
+
+    out_dir = misc_dict['out_dir'] + '/'
+    mkdirs(out_dir)
+    base_filename = out_dir + misc_dict['project'] + '_overlap' + misc_dict['file_postfix']
+    write_text_report(base_filename + '.txt', fuzzer_names, report)
+    with open(base_filename + '.json', 'w') as handle:
+        json.dump(report, handle, indent=2)
+    write_matrix_csv(base_filename + '-difference.csv', fuzzer_names, report['difference'])
+    write_matrix_csv(base_filename + '-intersection.csv', fuzzer_names, report['intersection'])
+    write_upset_csv(base_filename + '-upset.csv', fuzzer_names, combos)
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = Renderer(misc_dict['render_jobs'])
+    upset_filename = out_dir + misc_dict['project'] + '_upset' + misc_dict['file_postfix']
+    filenames = [upset_filename + '.pdf', upset_filename + '.png']
+    renderer.submit(render_upset, fuzzer_names, combos[:misc_dict['upset_combinations']], report['edges'], misc_dict,
+                    filenames)
+    if own_renderer:
+        renderer.close()
+
+
+# UpSet plot: the edges of every combination of fuzzers (bars) with the fuzzers of the combination (dots below),
+# and the edges of every fuzzer (bars on the left)
+def render_upset(fuzzer_names, combos, edges, misc_dict, filenames):
+    n_fuzzers = len(fuzzer_names)
+    fig = plt.figure(figsize=(max(6, 0.4 * len(combos) + 3), 4 + 0.3 * n_fuzzers))
+    grid = fig.add_gridspec(2, 2, width_ratios=[1, 4], height_ratios=[3, max(1, 0.3 * n_fuzzers)],
+                            wspace=0.3, hspace=0.05)
+    bars = fig.add_subplot(grid[0, 1])
+    dots = fig.add_subplot(grid[1, 1], sharex=bars)
+    sizes = fig.add_subplot(grid[1, 0])
+
+    xs = np.arange(len(combos))
+    bars.bar(xs, [count for (_, count) in combos], color='k', width=0.6)
+    bars.set_ylabel('edges')
+    bars.tick_params(axis='x', which='both', bottom=False, labelbottom=False)
+    for spine in ['top', 'right']:
+        bars.spines[spine].set_visible(False)
+
+    for (x, (members, _)) in enumerate(combos):
+        dots.scatter([x] * n_fuzzers, range(n_fuzzers), c='lightgrey', s=40)
+        dots.scatter([x] * len(members), members, c='k', s=40)
+        if len(members) > 1:
+            dots.plot([x, x], [min(members), max(members)], c='k', linewidth=2)
+    dots.set_yticks(range(n_fuzzers))
+    dots.set_yticklabels(fuzzer_names)
+    dots.tick_params(axis='y', which='both', left=False)
+    dots.set_xticks([])
+    dots.set_ylim(n_fuzzers - 0.5, -0.5)
+    for spine in dots.spines.values():
+        spine.set_visible(False)
+
+    sizes.barh(range(n_fuzzers), [edges[name] for name in fuzzer_names], color='grey', height=0.6)
+    sizes.invert_xaxis()
+    sizes.set_ylim(n_fuzzers - 0.5, -0.5)
+    sizes.set_yticks([])
+    sizes.set_xlabel('edges')
+    for spine in ['top', 'left', 'right']:
+        sizes.spines[spine].set_visible(False)
+
+    if 'plot_title' in misc_dict:
+        bars.set(title=misc_dict['plot_title'])
+
+    for filename in filenames:
+        fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
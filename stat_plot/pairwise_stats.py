@@ -0,0 +1,186 @@
+import csv
+import itertools
+import json
+
+import numpy as np
+
+from effect_size import calculate_a12
+from options import PAIRWISE_TESTS, P_VALUE_TESTS, P_ADJUST_METHODS
+
+
+# every unordered pair of names, once, in the order of the names
+def fuzzer_pairs(names):
+    return list(itertools.combinations(names, 2))
+
+
+# correct the p-values of one test for the number of pairs compared; nan (a failed test) is not counted
+def adjust_p_values(p_values, method):
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(len(p_values), np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    m = len(valid)
+    if m == 0:
+        return adjusted
+
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p_values[valid] * m, 1.0)
+    elif method == 'holm':
+        order = valid[np.argsort(p_values[valid], kind='stable')]
+        scaled = p_values[order] * (m - np.arange(m))
+        adjusted[order] = np.minimum(np.maximum.accumulate(scaled), 1.0)
+    else:
+        adjusted[valid] = p_values[valid]
+    return adjusted
+
+
+# run all the tests on every pair of samples in one pass
+# samples: name -> values (e.g. the final values of the runs of a fuzzer)
+# returns one record per pair; the p-values of a failed test are nan and its error is kept
+# reuse: (name1, name2) -> the record of an earlier call, for the pairs whose samples did not change
+def pairwise_tests(samples, tests=None, p_adjust='none', reuse=None):
+    # imported here: importing stest (e.g. by main.py) does not load scipy until the tests run
+    import scipy.stats
+
+    if tests is None:
+        tests = PAIRWISE_TESTS
+    arrays = {name: np.asarray(samples[name], dtype=np.float64) for name in samples}
+
+    records = []
+    for (name1, name2) in fuzzer_pairs(list(arrays)):
+        if reuse is not None and (name1, name2) in reuse:
+            records.append(reuse[(name1, name2)])
+            continue
+        f1s = arrays[name1]
+        f2s = arrays[name2]
+        record = {'fuzzer1': name1, 'fuzzer2': name2}
+
+        if 't_test' in tests:
+            record['t_test_p'] = float(scipy.stats.ttest_ind(f1s, f2s)[1])
+
+        if 'mwu' in tests:
+            try:
+                record['mwu_p'] = float(scipy.stats.mannwhitneyu(f1s, f2s)[1])
+            except ValueError as e:
+                record['mwu_p'] = float('nan')
+                record['mwu_error'] = str(e)
+
+        if 'a12' in tests:
+            record['a12'] = calculate_a12(f1s, f2s)
+            record['a12_reverse'] = calculate_a12(f2s, f1s)
+
+        records.append(record)
+
+    if p_adjust != 'none':
+        for test in P_VALUE_TESTS:
+            if test not in tests:
+                continue
+            adjusted = adjust_p_values([record[test + '_p'] for record in records], p_adjust)
+            for (record, p_value) in zip(records, adjusted):
+                record[test + '_p_adj'] = float(p_value)
+
+    return records
+
+
+def format_p_value(record, test, p_adjust):
+    line = "{}".format(record[test + '_p'])
+    if p_adjust != 'none':
+        line += " ({}: {})".format(p_adjust, record[test + '_p_adj'])
+    return line
+
+
+# the text report written by the older versions, with the corrected p-values if any
+def write_text_report(filename, open_mode, records, tests, p_adjust='none'):
+    with open(filename, open_mode) as gsf:
+        if 't_test' in tests:
+            gsf.write("### Student's t test ###\n")
+            for record in records:
+                gsf.write("pvalue: {} --- {} : {}\n".format(
+                    record['fuzzer1'], record['fuzzer2'], format_p_value(record, 't_test', p_adjust)))
+                gsf.write("------------------\n")
+            gsf.write("\n")
+
+        if 'mwu' in tests:
+            gsf.write("### Mann Whitney u test ###\n")
+            for record in records:
+                if 'mwu_error' in record:
+                    gsf.write("ERROR: {} --- {} : {}\n".format(
+                        record['fuzzer1'], record['fuzzer2'], record['mwu_error']))
+                else:
+                    gsf.write("pvalue: {} --- {} : {}\n".format(
+                        record['fuzzer1'], record['fuzzer2'], format_p_value(record, 'mwu', p_adjust)))
+                gsf.write("------------------\n")
+            gsf.write("\n")
+
+        if 'a12' in tests:
+            gsf.write("### A12 values ###\n")
+            for record in records:
+                gsf.write("A12: {} <= {} : {}\n".format(record['fuzzer1'], record['fuzzer2'], record['a12']))
+                gsf.write("A12: {} >= {} : {}\n".format(record['fuzzer1'], record['fuzzer2'], (1.0 - record['a12'])))
+                gsf.write("------------------\n")
+            gsf.write("\n")
+
+
+# nan is not valid json
+def json_value(value):
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def write_json_report(filename, records, tests, p_adjust, samples):
+    report = {
+        'tests': list(tests),
+        'p_adjust': p_adjust,
+        'fuzzers': {name: {'runs': len(samples[name]),
+                           'mean': json_value(float(np.mean(samples[name]))) if len(samples[name]) > 0 else None}
+                    for name in samples},
+        'pairs': [{key: json_value(record[key]) for key in record} for record in records]
+    }
+    with open(filename, 'w') as handle:
+        json.dump(report, handle, indent=2)
+
+
+def csv_columns(tests, p_adjust):
+    columns = ['fuzzer1', 'fuzzer2']
+    for test in P_VALUE_TESTS:
+        if test in tests:
+            columns.append(test + '_p')
+            if p_adjust != 'none':
+                columns.append(test + '_p_adj')
+    if 'a12' in tests:
+        columns += ['a12', 'a12_reverse']
+    return columns
+
+
+def write_csv_report(filename, records, tests, p_adjust):
+    columns = csv_columns(tests, p_adjust)
+    with open(filename, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow(['' if json_value(record[column]) is None else record[column] for column in columns])
+
+
+# the pairwise report of a config: the text report, plus the same results as .json and .csv
+# base_filename: the path of the report without the extension
+def write_pairwise_reports(base_filename, fuzzers_dict, misc_dict):
+    tests = misc_dict['stat_tests']
+    p_adjust = misc_dict['p_adjust']
+    samples = {name: fuzzers_dict[name]['final_vals'] for name in fuzzers_dict}
+
+    # the pairs of fuzzers whose runs did not change since they were tested in this process are not tested again;
+    # fuzzer_dict['pairwise'] has the records of the pairs it is the first fuzzer of
+    reuse = {}
+    for (name1, name2) in fuzzer_pairs(list(samples)):
+        done = fuzzers_dict[name1].get('pairwise', {})
+        if name2 in done and fuzzers_dict[name1].get('unchanged') and fuzzers_dict[name2].get('unchanged'):
+            reuse[(name1, name2)] = done[name2]
+
+    records = pairwise_tests(samples, tests, p_adjust, reuse)
+    for record in records:
+        fuzzers_dict[record['fuzzer1']].setdefault('pairwise', {})[record['fuzzer2']] = record
+
+    write_text_report(base_filename + '.txt', 'w', records, tests, p_adjust)
+    write_json_report(base_filename + '.json', records, tests, p_adjust, samples)
+    write_csv_report(base_filename + '.csv', records, tests, p_adjust)
+    return records
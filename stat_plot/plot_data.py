@@ -0,0 +1,114 @@
+# bulk parser for the plot_data files written by AFL / AFL++ in their output dirs, e.g.
+#   # unix_time, cycles_done, cur_path, paths_total, pending_total, pending_favs, map_size, unique_crashes, ...
+#   1600000000, 0, 0, 1, 1, 1, 0.52%, 0, 0, 1, 123.45
+# the rows are turned into the same (slots, vals) change points as a showmaps file, so that they are aligned the
+# same way; the slots are the seconds since the first row (unix_time) or the relative_time of AFL++ >= 4
+
+import os
+
+import numpy as np
+
+from options import PLOT_DATA_ALIASES
+
+NEWLINE = ord('\n')
+COMMA = ord(',')
+HASH = ord('#')
+TIME_COLUMNS = ['unix_time', 'relative_time']
+
+
+# the canonical name of a column (the AFL++ names are mapped to the AFL ones)
+def canonical_column(name):
+    name = name.strip()
+    return PLOT_DATA_ALIASES.get(name, name)
+
+
+# the column names of the header line, or None if the line is not a header
+def header_columns(line):
+    line = line.strip()
+    if not line.startswith('#'):
+        return None
+    return [canonical_column(name) for name in line[1:].split(',')]
+
+
+# the rows x columns values of the data lines with exactly n_columns values; the other lines (the header, the
+# comments and a partly written last line) are skipped; the percentages (map_size) lose their '%'
+def parse_rows(data, n_columns):
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if len(buf) == 0:
+        return np.zeros((0, n_columns))
+
+    line_ends = np.flatnonzero(buf == NEWLINE)
+    if len(line_ends) == 0 or line_ends[-1] != len(buf) - 1:
+        line_ends = np.append(line_ends, len(buf))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    comma_counts = np.bincount(np.searchsorted(line_ends, np.flatnonzero(buf == COMMA)), minlength=len(line_ends))
+    first_bytes = buf[np.minimum(line_starts, len(buf) - 1)]
+    valid = (comma_counts == n_columns - 1) & (first_bytes != HASH) & (line_ends > line_starts)
+
+    n_rows = int(valid.sum())
+    if n_rows == 0:
+        return np.zeros((0, n_columns))
+    if not valid.all():
+        line_lens = np.minimum(line_ends + 1, len(buf)) - line_starts
+        data = buf[np.repeat(valid, line_lens)].tobytes()
+    else:
+        data = bytes(data)
+
+    text = data.replace(b'%', b'').replace(b',', b' ').decode()
+    values = np.fromstring(text, dtype=np.float64, sep=' ')
+    if len(values) != n_rows * n_columns:
+        raise ValueError("invalid row in plot_data")
+    return values.reshape(n_rows, n_columns)
+
+
+# the time and value column indexes of column in the header columns
+def column_indexes(columns, column):
+    column = canonical_column(column)
+    time_columns = [name for name in TIME_COLUMNS if name in columns]
+    if len(time_columns) == 0:
+        raise ValueError("plot_data has no time column (one of {})".format(', '.join(TIME_COLUMNS)))
+    if column not in columns:
+        raise ValueError("plot_data has no column {} (columns: {})".format(column, ', '.join(columns)))
+    return columns.index(time_columns[0]), columns.index(column), time_columns[0] == 'unix_time'
+
+
+# the (slots, vals) change points of one column of the rows
+# t0: the unix_time of the first row of the file, the slots of unix_time rows are relative to it
+def rows_to_points(rows, time_index, value_index, t0=None):
+    times = rows[:, time_index].astype(np.int64)
+    if t0 is not None:
+        times = times - t0
+    return np.maximum(times, 0), np.rint(rows[:, value_index]).astype(np.int64)
+
+
+# parse the content of a plot_data file into two int64 arrays (slots, vals) for column
+def parse_plot_data(data, column):
+    first_line = data[:data.find(b'\n')] if b'\n' in data else data
+    columns = header_columns(first_line.decode(errors='replace'))
+    if columns is None:
+        raise ValueError("plot_data has no header line")
+    time_index, value_index, absolute = column_indexes(columns, column)
+
+    rows = parse_rows(data, len(columns))
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    t0 = int(rows[0, time_index]) if absolute else None
+    return rows_to_points(rows, time_index, value_index, t0)
+
+
+# read a plot_data file as a whole; a missing file has no data
+def read_plot_data_file(data_file, column):
+    if not os.path.exists(data_file):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    with open(data_file, 'rb') as handle:
+        return parse_plot_data(handle.read(), column)
+
+
+# the last value of column in every plot_data file (e.g. the final coverage of every run, for stest and boxplot)
+def final_values(data_files, column):
+    values = []
+    for data_file in data_files:
+        _, vals = read_plot_data_file(data_file, column)
+        if len(vals) > 0:
+            values.append(float(vals[-1]))
+    return values
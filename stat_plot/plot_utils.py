@@ -0,0 +1,46 @@
+import os
+
+
+# helpers shared by the plots of every stat_type, kept free of the heavy imports (see main.py)
+
+def convert_linestyle(linestyle):
+    if linestyle == 'loosely dotted':
+        return (0, (1, 5))
+    elif linestyle == 'densely dotted':
+        return (0, (1, 1))
+    elif linestyle == 'loosely dashed':
+        return (0, (5, 8))
+    elif linestyle == 'densely dashed':
+        return (0, (5, 1))
+    elif linestyle == 'loosely dashdot':
+        return (0, (3, 8, 1, 8))
+    elif linestyle == 'densely dashdot':
+        return (0, (3, 1, 1, 1))
+    elif linestyle == 'dashdotdot':
+        return (0, (3, 5, 1, 5, 1, 5))
+    elif linestyle == 'loosely dashdotdot':
+        return (0, (3, 8, 1, 8, 1, 8))
+    elif linestyle == 'densely dashdotdot':
+        return (0, (3, 1, 1, 1, 1, 1))
+    elif linestyle in ['solid', 'dotted', 'dashed', 'dashdot']:
+        return linestyle
+    # invalid linestyle
+    else:
+        return 'invalid'
+
+
+def mkdirs(path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+def display_bucket(bucket):
+    if bucket[0] == 's':
+        return 'sec'
+    elif bucket[0] == 'm':
+        return 'min'
+    elif bucket[0] == 'h':
+        return 'hour'
+    else:
+        # wrong bucket encoding
+        return 'invalid_value'
@@ -0,0 +1,164 @@
+import contextlib
+import cProfile
+import json
+import os
+import resource
+import time
+
+# per-stage instrumentation of the pipeline, enabled with --profile
+# every stage records its wall time, its CPU time (including the worker processes that ended during
+# the stage), the bytes read and written by this process and the peak RSS so far
+# the stages are aggregated by (stage, fuzzer); a stage can run inside another one (e.g. drawing a
+# figure inside 'detailed'), self_wall, self_cpu and the bytes leave out the inner stages
+
+_active = None
+
+
+def read_io_counters():
+    # rchar / wchar count all the bytes passed to read / write, cached or not
+    try:
+        with open('/proc/self/io') as handle:
+            counters = dict(line.split(':') for line in handle if ':' in line)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def cpu_time():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (self_usage.ru_utime + self_usage.ru_stime +
+            children_usage.ru_utime + children_usage.ru_stime)
+
+
+# peak RSS in MB of this process and of the largest finished worker process
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024.0)
+
+
+class StageProfiler:
+
+    # report_path: where the JSON report is written
+    # cprofile_stage: the stage whose calls are profiled with cProfile, dumped next to the report
+    def __init__(self, report_path, cprofile_stage=None):
+        self.report_path = report_path
+        self.cprofile_stage = cprofile_stage
+        self.cprofile = cProfile.Profile() if cprofile_stage is not None else None
+        self.stages = {}
+        self.order = []
+        # wall time, cpu time, bytes read and written of the inner stages of every running stage
+        self.running = []
+        self.start_wall = time.perf_counter()
+        self.start_cpu = cpu_time()
+
+    @contextlib.contextmanager
+    def stage(self, name, fuzzer=None):
+        read_before, written_before = read_io_counters()
+        wall_before = time.perf_counter()
+        cpu_before = cpu_time()
+        profiling = self.cprofile is not None and name == self.cprofile_stage
+        if profiling:
+            self.cprofile.enable()
+        self.running.append([0.0, 0.0, 0, 0])
+        try:
+            yield
+        finally:
+            if profiling:
+                self.cprofile.disable()
+            wall = time.perf_counter() - wall_before
+            cpu = cpu_time() - cpu_before
+            read_after, written_after = read_io_counters()
+            read = 0
+            written = 0
+            if read_before is not None and read_after is not None:
+                read = read_after - read_before
+                written = written_after - written_before
+            inner_wall, inner_cpu, inner_read, inner_written = self.running.pop()
+            if len(self.running) > 0:
+                outer = self.running[-1]
+                outer[0] += wall
+                outer[1] += cpu
+                outer[2] += read
+                outer[3] += written
+            rss, children_rss = peak_rss_mb()
+
+            key = (name, fuzzer)
+            if key not in self.stages:
+                self.order.append(key)
+                self.stages[key] = {'stage': name, 'fuzzer': fuzzer, 'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                    'self_wall': 0.0, 'self_cpu': 0.0, 'read_bytes': 0, 'written_bytes': 0}
+            record = self.stages[key]
+            record['calls'] += 1
+            record['wall'] += wall
+            record['cpu'] += cpu
+            record['self_wall'] += wall - inner_wall
+            record['self_cpu'] += cpu - inner_cpu
+            record['read_bytes'] += read - inner_read
+            record['written_bytes'] += written - inner_written
+            record['peak_rss_mb'] = rss
+            record['peak_children_rss_mb'] = children_rss
+
+    def report(self):
+        rss, children_rss = peak_rss_mb()
+        return {
+            'total': {
+                'wall': time.perf_counter() - self.start_wall,
+                'cpu': cpu_time() - self.start_cpu,
+                'peak_rss_mb': rss,
+                'peak_children_rss_mb': children_rss
+            },
+            'stages': [self.stages[key] for key in self.order]
+        }
+
+    def write_report(self):
+        report = self.report()
+        report_dir = os.path.dirname(self.report_path)
+        if report_dir and not os.path.exists(report_dir):
+            os.makedirs(report_dir)
+        with open(self.report_path, 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+        print("[*] profile: {:.2f}s wall, {:.2f}s cpu, peak rss {:.1f} MB (workers {:.1f} MB)".format(
+            report['total']['wall'], report['total']['cpu'], report['total']['peak_rss_mb'],
+            report['total']['peak_children_rss_mb']))
+        # the stages summed over the fuzzers, slowest first
+        totals = {}
+        for record in report['stages']:
+            total = totals.setdefault(record['stage'], {'wall': 0.0, 'cpu': 0.0, 'io': 0})
+            total['wall'] += record['self_wall']
+            total['cpu'] += record['self_cpu']
+            total['io'] += record['read_bytes'] + record['written_bytes']
+        for name in sorted(totals, key=lambda n: -totals[n]['wall']):
+            print("[*]   {:<12} {:8.2f}s wall {:8.2f}s cpu {:10.1f} MB io".format(
+                name, totals[name]['wall'], totals[name]['cpu'], totals[name]['io'] / 1e6))
+        print("[*] profile report: {}".format(self.report_path))
+
+        if self.cprofile is not None:
+            prof_path = os.path.splitext(self.report_path)[0] + '-' + self.cprofile_stage + '.prof'
+            self.cprofile.dump_stats(prof_path)
+            print("[*] cProfile of stage {}: {}".format(self.cprofile_stage, prof_path))
+
+
+def enable(report_path, cprofile_stage=None):
+    global _active
+    _active = StageProfiler(report_path, cprofile_stage)
+    return _active
+
+
+def finish():
+    global _active
+    if _active is not None:
+        _active.write_report()
+        _active = None
+
+
+# wrap a stage of the pipeline; does nothing unless the profiler is enabled
+@contextlib.contextmanager
+def stage(name, fuzzer=None):
+    if _active is None:
+        yield
+    else:
+        with _active.stage(name, fuzzer):
+            yield
@@ -0,0 +1,56 @@
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from profiler import stage
+
+
+# the render workers are started fresh (spawn) and always draw with the headless Agg backend
+def init_render_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+# runs the functions that draw and save independent figures
+# with jobs > 1, they run in a pool of render workers; otherwise right away in this process
+class Renderer:
+
+    def __init__(self, jobs):
+        self.executor = None
+        self.futures = []
+        if jobs > 1:
+            self.executor = ProcessPoolExecutor(max_workers=jobs,
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=init_render_worker)
+
+    # func and its arguments must be picklable when render workers are used
+    def submit(self, func, *args):
+        if self.executor is None:
+            with stage('render'):
+                func(*args)
+        else:
+            self.futures.append(self.executor.submit(func, *args))
+
+    # hand over the figures submitted so far, to be waited for with wait_futures
+    def detach(self):
+        futures = self.futures
+        self.futures = []
+        return futures
+
+    # wait for all the submitted figures; re-raises the first error of a render worker
+    def wait(self):
+        with stage('render'):
+            wait_futures(self.detach())
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+def wait_futures(futures):
+    for future in futures:
+        future.result()
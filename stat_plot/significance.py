@@ -0,0 +1,77 @@
+import numpy as np
+import scipy.special
+import scipy.stats
+
+from align import sample_runs, union_starts
+
+# the p-value under which two fuzzers are told apart
+SIGNIFICANCE_ALPHA = 0.05
+# the columns ranked at once, bounds the memory used for long campaigns
+CHUNK_COLUMNS = 1 << 16
+
+
+# the sum of t^3 - t over the groups of ties of every column of the sorted matrix
+def tie_terms(sorted_cols):
+    n_rows, n_cols = sorted_cols.shape
+    new_group = np.ones(sorted_cols.shape, dtype=bool)
+    new_group[1:] = sorted_cols[1:] != sorted_cols[:-1]
+    # number the groups of ties over all the columns, column by column
+    group_ids = np.cumsum(new_group.T.ravel()) - 1
+    sizes = np.bincount(group_ids).astype(np.float64)
+    group_cols = np.repeat(np.arange(n_cols), new_group.sum(axis=0))
+    return np.bincount(group_cols, weights=sizes ** 3 - sizes, minlength=n_cols)
+
+
+# Mann-Whitney U p-value (two-sided) and A12 for every column of xs (m x T) against ys (n x T)
+# the columns are ranked all at once; the p-values use the normal approximation with the tie and
+# continuity corrections, the same as scipy.stats.mannwhitneyu(method='asymptotic')
+# A12 is the chance of xs < ys (ties count as 0.5), the same as effect_size.calculate_a12
+def mwu_a12_columns(xs, ys):
+    m = xs.shape[0]
+    n = ys.shape[0]
+    both = np.concatenate((xs, ys)).astype(np.float64)
+    ranks = scipy.stats.rankdata(both, axis=0)
+
+    u1 = ranks[:m].sum(axis=0) - m * (m + 1) / 2.0
+    a12 = 1.0 - u1 / (m * n)
+
+    n_all = m + n
+    ties = tie_terms(np.sort(both, axis=0))
+    sigma = np.sqrt(m * n / 12.0 * ((n_all + 1) - ties / (n_all * (n_all - 1))))
+    u = np.maximum(u1, m * n - u1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (u - m * n / 2.0 - 0.5) / sigma
+    p = np.minimum(2.0 * scipy.special.ndtr(-z), 1.0)
+    # all the values are equal: nothing to tell apart
+    p[sigma == 0] = 1.0
+    return p, a12
+
+
+# the MWU p-values and the A12 of the runs of two fuzzers at each of the slots
+# the tests only run once for every distinct state of the runs, i.e. between two change points of
+# any of the runs all the slots share the same result
+def significance_over_time(series_list1, series_list2, slots):
+    grid = union_starts(list(series_list1) + list(series_list2))
+    states = np.searchsorted(grid, slots, side='right') - 1
+    distinct_states, state_idx = np.unique(states, return_inverse=True)
+    state_slots = grid[distinct_states]
+
+    p_values = np.empty(len(state_slots))
+    a12s = np.empty(len(state_slots))
+    for begin in range(0, len(state_slots), CHUNK_COLUMNS):
+        chunk_slots = state_slots[begin:begin + CHUNK_COLUMNS]
+        p, a12 = mwu_a12_columns(sample_runs(series_list1, chunk_slots), sample_runs(series_list2, chunk_slots))
+        p_values[begin:begin + len(chunk_slots)] = p
+        a12s[begin:begin + len(chunk_slots)] = a12
+
+    return p_values[state_idx], a12s[state_idx]
+
+
+# the first index from which the p-values stay below alpha until the end, or None
+def significant_from(p_values, alpha):
+    not_significant = np.flatnonzero(~(p_values < alpha))
+    if len(not_significant) == 0:
+        return 0
+    if not_significant[-1] == len(p_values) - 1:
+        return None
+    return int(not_significant[-1] + 1)
@@ -3,61 +3,79 @@ import numpy as np
 import scipy.stats
 import os
 
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
 from matplotlib.patches import Polygon
 
+from align import run_lengths, StepSeries, run_sums, sample_runs, time_windows, union_starts
+import align_cache
+from aligned_store import write_aligned_store, load_aligned_store, reusable_run_refs
+from bootstrap import bootstrap_intervals, CHUNK_COLUMNS as BOOTSTRAP_CHUNK
+from data_parser import read_slot_file
+from plot_data import read_plot_data_file
+from downsample import downsample_indices
+from pairwise_stats import fuzzer_pairs, write_pairwise_reports
+from plot_utils import convert_linestyle, display_bucket, mkdirs
+from profiler import stage
+from render import Renderer
+from significance import significance_over_time, significant_from, SIGNIFICANCE_ALPHA
+
+# memory_limit in [misc] is in MB
+MB = 1 << 20
+
+
+# the mean and the Student's t confidence interval of every slot of a list of StepSeries, without densifying them
+# returns the change points of the result and the mean and bounds from every change point on
+# sums: run_sums(series_list), if it is already known (e.g. kept up to date by watch.py)
+def series_confidence_intervals(series_list, confidence, sums=None):
+    n = len(series_list)
+    grid, sums, sum_squares = run_sums(series_list) if sums is None else sums
+    m = sums.astype(np.float64) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # the sample variance from the exact sums: (n * sum(x^2) - sum(x)^2) / (n * (n - 1)), only converted to
+        # float after the subtraction
+        var = (n * sum_squares - sums * sums).astype(np.float64) / float(n * (n - 1))
+        se = np.sqrt(np.maximum(var, 0) / n)
+    h = se * scipy.stats.t.ppf((1+confidence)/2., n-1)
+    return grid, m, m-h, m+h
 
-def convert_linestyle(linestyle):
-    if linestyle == 'loosely dotted':
-        return (0, (1, 5))
-    elif linestyle == 'densely dotted':
-        return (0, (1, 1))
-    elif linestyle == 'loosely dashed':
-        return (0, (5, 8))
-    elif linestyle == 'densely dashed':
-        return (0, (5, 1))
-    elif linestyle == 'loosely dashdot':
-        return (0, (3, 8, 1, 8))
-    elif linestyle == 'densely dashdot':
-        return (0, (3, 1, 1, 1))
-    elif linestyle == 'dashdotdot':
-        return (0, (3, 5, 1, 5, 1, 5))
-    elif linestyle == 'loosely dashdotdot':
-        return (0, (3, 8, 1, 8, 1, 8))
-    elif linestyle == 'densely dashdotdot':
-        return (0, (3, 1, 1, 1, 1, 1))
-    elif linestyle in ['solid', 'dotted', 'dashed', 'dashdot']:
-        return linestyle
-    # invalid linestyle
-    else:
-        return 'invalid'
 
-def mean_confidence_interval(data, confidence):
-    a = 1.0 * np.array(data)
-    n = len(a)
-    m, se = np.mean(a), scipy.stats.sem(a)
-    h = se * scipy.stats.t.ppf((1+confidence)/2., n-1)
-    return m, m-h, m+h
+# the seed of the bootstrap resamples of a fuzzer: all its chunks and time windows use the same resamples of the runs
+def bootstrap_seed(misc_dict):
+    if misc_dict['bootstrap_seed'] is None:
+        return np.random.SeedSequence().entropy
+    return misc_dict['bootstrap_seed']
 
 
-def row_to_col(rows):
-    return [*zip(*rows)]
+# bootstrap confidence intervals (see bootstrap.bootstrap_intervals) of a list of StepSeries,
+# on the change points of the runs like series_confidence_intervals; computed by chunks of change points
+# small enough for the memory_limit
+def series_bootstrap_intervals(series_list, misc_dict, seed):
+    grid = union_starts(series_list)
+    # the resampled statistics and their sorted copy dominate: resamples x chunk
+    memory_limit = misc_dict['memory_limit'] * MB
+    chunk_columns = int(min(BOOTSTRAP_CHUNK, max(1, memory_limit // (32 * misc_dict['bootstrap_resamples']))))
 
+    m = np.empty(len(grid))
+    lo = np.empty(len(grid))
+    hi = np.empty(len(grid))
+    for begin in range(0, len(grid), chunk_columns):
+        chunk = slice(begin, begin + chunk_columns)
+        m[chunk], lo[chunk], hi[chunk] = bootstrap_intervals(
+            sample_runs(series_list, grid[chunk]), misc_dict['confidence_lvl'], misc_dict['ci_statistic'],
+            misc_dict['bootstrap_method'], misc_dict['bootstrap_resamples'], seed)
+    return grid, m, lo, hi
 
-def mkdirs(path):
-    if not os.path.exists(path):
-        os.makedirs(path)
 
+# df: the open text file, written one time window after the other
+def write_mean_confi(df, means, mins, maxs):
+    df.writelines("{},{},{}\n".format(mean, min_, max_)
+                  for (mean, min_, max_) in zip(means.tolist(), mins.tolist(), maxs.tolist()))
 
-def display_bucket(bucket):
-    if bucket[0] == 's':
-        return 'sec'
-    elif bucket[0] == 'm':
-        return 'min'
-    elif bucket[0] == 'h':
-        return 'hour'
-    else:
-        # wrong bucket encoding
-        return 'invalid_value'
+
+def write_significance(filename, p_values, a12s):
+    with open(filename, "w") as df:
+        df.writelines("{},{}\n".format(p_value, a12) for (p_value, a12) in zip(p_values.tolist(), a12s.tolist()))
 
 
 def get_step(misc_dict):
@@ -70,300 +88,335 @@ def get_step(misc_dict):
     return step
 
 
+# parse and align one data file; runs in the worker processes when jobs > 1
+# column: the column of a plot_data file (None for showmaps files)
+def encode_data_file(data_file, max_slot, column=None):
+    if column is None:
+        slots, vals = read_slot_file(data_file)
+    else:
+        slots, vals = read_plot_data_file(data_file, column)
+    return run_lengths(slots, vals, max_slot)
+
+
+# the plot_data column of the data files of a fuzzer, None if they are showmaps files
+def data_column(fuzzer_dict):
+    if fuzzer_dict.get('data_format', 'showmaps') == 'plot_data':
+        return fuzzer_dict['plot_data_column']
+    return None
+
+
+def get_max_slot(misc_dict):
+    return int(misc_dict['max_time'] * 3600)
+
+
 # align data files
-def align_data(fuzzer_dict, misc_dict):
+# encoded_runs is the output of encode_data_file for every data file, if it is already computed
+# signature identifies the inputs (see align_cache.fuzzer_signature); an aligned store written
+# with the same signature is reused as it is
+def align_data(fuzzer_dict, misc_dict, encoded_runs=None, signature=None):
 
     fuzzer_name = fuzzer_dict['name']
     data_files = fuzzer_dict['data_files']
     out_dir = misc_dict['out_dir']
     aligned_dir = out_dir + "/aligned/" + fuzzer_name + '/'
-    max_slot = int(misc_dict['max_time'] * 3600)
-
-    mkdirs(aligned_dir)
-
-    new_data_files = []
-    last_vals = []
-
-    print("[*] aligning data for {}".format(fuzzer_name))
-
-    for (j, data_file) in enumerate(data_files):
-        slots = []
-        vals = []
-        first = True
-
-        if os.path.exists(data_file):
-            with open(data_file) as df:
-                lines = df.readlines()
-
-                for line in lines:
-                    tokens = line.split(":")
-                    # skip illegal line
-                    if len(tokens) != 2:
-                        continue
-                    slot = int(tokens[0])
-                    val = int(tokens[1])
-
-                    if first:
-                        if slot != 0:
-                            slots.append(0)
-                            vals.append(0)
-                        first = False
-
-                    if slot > max_slot:
-                        break
-                    slots.append(slot)
-                    vals.append(val)
-
-        # handle the case when the txt file is empty
-        if len(slots) == 0:
-            slots.append(0)
-            vals.append(0)
-            slots.append(1)
-            vals.append(0)
-        elif len(slots) == 1:
-            slots.append(1)
-            vals.append(vals[0])
-
-        slot_idx = 1
-        new_vals = []
-        val_idx = 0
-
-        for i in range(0, max_slot):
-            if i > slots[slot_idx]:
-                val_idx = min(len(vals)-1, val_idx + 1)
-                slot_idx = min(len(slots)-1, slot_idx + 1)
-            new_vals.append(vals[val_idx])
-
-        new_data_file = aligned_dir + str(j) + ".txt"
-        last_vals.append(new_vals[-1])
-        with open(new_data_file, "w") as out_file:
-            for val in new_vals:
-                out_file.write(str(val)+'\n')
-
-        new_data_files.append(new_data_file)
+    max_slot = get_max_slot(misc_dict)
+    column = data_column(fuzzer_dict)
+
+    new_data_files = reusable_run_refs(aligned_dir, signature)
+    fuzzer_dict['unchanged'] = new_data_files is not None
+
+    if fuzzer_dict['unchanged']:
+        print("[*] reusing aligned data for {}".format(fuzzer_name))
+    else:
+        print("[*] aligning data for {}".format(fuzzer_name))
+
+        if encoded_runs is None:
+            encoded_runs = [encode_data_file(data_file, max_slot, column) for data_file in data_files]
+
+        series_list = [StepSeries.from_run_lengths(vals, lens, max_slot) for (vals, lens) in encoded_runs]
+
+        new_data_files = write_aligned_store(aligned_dir, series_list, data_files, max_slot,
+                                             text_export=misc_dict['aligned_text'], signature=signature)
 
     fuzzer_dict['old_data_files'] = data_files
     fuzzer_dict['data_files'] = new_data_files
-    fuzzer_dict['last_vals'] = last_vals
+    fuzzer_dict['series'] = load_aligned_store(aligned_dir)
+    fuzzer_dict['last_vals'] = [int(series.final_value()) for series in fuzzer_dict['series']]
 
 
-# plot for every data file of the fuzzer; n is the id for the figure
-def detailed_plot(fuzzer_dict, misc_dict, n):
-    fig = plt.figure(n)
-    ax = fig.add_subplot(111)
+# find out which data files of the fuzzers have to be parsed
+# with align_cache, the parsed data files and the aligned stores of unchanged inputs are reused
+# returns the plan consumed by finish_alignment; plan['tasks'] lists the data files to parse as
+# (fuzzer_name, j, data_file, column, key) tuples
+def plan_alignment(fuzzers_dict, misc_dict):
+    max_slot = get_max_slot(misc_dict)
+    out_dir = misc_dict['out_dir']
+    use_cache = misc_dict['align_cache']
 
-    data_files = fuzzer_dict['data_files']
+    plan = {
+        'hits': 0,
+        'signatures': {},
+        'encoded': {},
+        'tasks': [],
+        'manifest': None
+    }
+
+    if use_cache:
+        mkdirs(align_cache.cache_dir(out_dir))
+        plan['manifest'] = align_cache.load_cache_manifest(out_dir)
+
+    for fuzzer_name in fuzzers_dict:
+        fuzzer_dict = fuzzers_dict[fuzzer_name]
+        data_files = fuzzer_dict['data_files']
+        column = data_column(fuzzer_dict)
+        plan['signatures'][fuzzer_name] = None
+        plan['encoded'][fuzzer_name] = [None] * len(data_files)
+
+        if not use_cache:
+            plan['tasks'] += [(fuzzer_name, j, data_file, column, None) for (j, data_file) in enumerate(data_files)]
+            continue
+
+        keys = [align_cache.input_key(data_file, misc_dict['cache_hash'], column) for data_file in data_files]
+        signature = align_cache.fuzzer_signature(keys, misc_dict, max_slot)
+        plan['signatures'][fuzzer_name] = signature
+
+        aligned_dir = out_dir + "/aligned/" + fuzzer_name + '/'
+        if reusable_run_refs(aligned_dir, signature) is not None:
+            plan['hits'] += len(data_files)
+            continue
+
+        for (j, data_file) in enumerate(data_files):
+            encoded_run = align_cache.lookup(plan['manifest'], out_dir, data_file, keys[j], max_slot)
+            if encoded_run is None:
+                plan['tasks'].append((fuzzer_name, j, data_file, column, keys[j]))
+            else:
+                plan['encoded'][fuzzer_name][j] = encoded_run
+                plan['hits'] += 1
+
+    if use_cache:
+        print("[*] alignment cache: {} hits, {} misses".format(plan['hits'], len(plan['tasks'])))
+
+    return plan
+
+
+# parse and align the data files; with jobs > 1, every data file is handled in a process pool
+# the results are in the order of data_files, so the output does not depend on jobs
+# columns: the plot_data column of every data file (None for showmaps files), all showmaps files if not given
+def encode_data_files(data_files, max_slot, jobs, columns=None):
+    if columns is None:
+        columns = [None] * len(data_files)
+    with stage('parse'):
+        if jobs > 1 and len(data_files) > 1:
+            print("[*] parsing {} data files with {} jobs".format(len(data_files), jobs))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                return list(executor.map(encode_data_file, data_files, [max_slot] * len(data_files), columns,
+                                         chunksize=max(1, len(data_files) // (jobs * 4))))
+        return [encode_data_file(data_file, max_slot, column) for (data_file, column) in zip(data_files, columns)]
+
+
+# merge the parsed data files (results, in the order of plan['tasks']) back in the config order
+# and write the aligned stores
+def finish_alignment(fuzzers_dict, misc_dict, plan, results):
+    max_slot = get_max_slot(misc_dict)
+    out_dir = misc_dict['out_dir']
+    use_cache = misc_dict['align_cache']
+    encoded = plan['encoded']
+
+    with stage('cache'):
+        for ((fuzzer_name, j, data_file, _, key), encoded_run) in zip(plan['tasks'], results):
+            encoded[fuzzer_name][j] = encoded_run
+            if use_cache:
+                align_cache.store(plan['manifest'], out_dir, data_file, key, max_slot, encoded_run)
+
+        if use_cache and len(plan['tasks']) > 0:
+            align_cache.save_cache_manifest(out_dir, plan['manifest'])
+
+    for fuzzer_name in fuzzers_dict:
+        encoded_runs = encoded[fuzzer_name]
+        if any(encoded_run is None for encoded_run in encoded_runs):
+            # the aligned store is reused, nothing was parsed
+            encoded_runs = None
+        with stage('align', fuzzer_name):
+            align_data(fuzzers_dict[fuzzer_name], misc_dict, encoded_runs, plan['signatures'][fuzzer_name])
+
+
+# align the data files of all the fuzzers
+def align_all_data(fuzzers_dict, misc_dict):
+    with stage('plan'):
+        plan = plan_alignment(fuzzers_dict, misc_dict)
+    task_files = [data_file for (_, _, data_file, _, _) in plan['tasks']]
+    task_columns = [column for (_, _, _, column, _) in plan['tasks']]
+    results = encode_data_files(task_files, get_max_slot(misc_dict), misc_dict['jobs'], task_columns)
+    finish_alignment(fuzzers_dict, misc_dict, plan, results)
+
+
+# plot for every data file of the fuzzer; the figure is drawn by the renderer
+def detailed_plot(fuzzer_dict, misc_dict, renderer):
+    series_list = fuzzer_dict['series']
     fuzzer_name = fuzzer_dict['name']
+
+    out_dir = misc_dict['out_dir'] + '/detailed/' + fuzzer_name + '/'
+    base_filename = out_dir + \
+        misc_dict["project"] + "_detailed" + misc_dict["file_postfix"]
+    filename_pdf = base_filename + '.pdf'
+    filename_png = base_filename + '.png'
+
+    # the detailed plot only depends on the aligned data
+    if fuzzer_dict.get('unchanged') and os.path.exists(filename_pdf) and os.path.exists(filename_png):
+        print('[*] detailed plots for {} are up to date'.format(fuzzer_name))
+        return
+
     print('[*] generating detailed plots for {}'.format(fuzzer_name))
 
+    mkdirs(out_dir)
+
     step = get_step(misc_dict)
 
-    for (i, data_file) in enumerate(data_files):
-        with open(data_file) as df:
-            lines = df.readlines()
-            ys = [int(x) for x in lines]
-            ys = ys[0::step]
-            bins = range(0, len(ys))
-            ax.plot(bins, ys, label=fuzzer_name + str(i))
-
-            out_dir = misc_dict['out_dir'] + '/detailed/' + fuzzer_name + '/'
-            mkdirs(out_dir)
-            base_filename = out_dir + \
-                misc_dict["project"] + "_detailed" + misc_dict["file_postfix"]
-            filename_pdf = base_filename + '.pdf'
-            filename_png = base_filename + '.png'
-
-            ax.set(xlabel='time ({})'.format(display_bucket(
-                misc_dict['bucket'])), ylabel=misc_dict['ylabel'])
-            ax.legend()
-            fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
-            fig.savefig(filename_png, bbox_inches='tight', dpi=100)
+    lines = [(series.resample(step), fuzzer_name + str(i)) for (i, series) in enumerate(series_list)]
 
+    renderer.submit(render_detailed, lines, misc_dict, [filename_pdf, filename_png])
 
-# add plots to ax; write the computed data out
-def plot_files(fuzzer_dict, misc_dict, ax, ax_s):
-    entire_data_rows = []
 
-    data_files = fuzzer_dict['data_files']
-    fuzzer_name = fuzzer_dict['name']
+# draw all the lines of a detailed plot and save the figure once
+def render_detailed(lines, misc_dict, filenames):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
 
-    print('[*] generating overall plots for {}'.format(fuzzer_name))
+    for (ys, label) in lines:
+        bins = range(0, len(ys))
+        ax.plot(bins, ys, label=label)
 
-    for data_file in data_files:
-        data_row = []
-        with open(data_file) as df:
-            lines = df.readlines()
-            for line in lines:
-                data_row.append(int(line))
-        entire_data_rows.append(data_row)
+    ax.set(xlabel='time ({})'.format(display_bucket(
+        misc_dict['bucket'])), ylabel=misc_dict['ylabel'])
+    ax.legend()
+    for filename in filenames:
+        fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
 
-    entire_data_col = row_to_col(entire_data_rows)
 
-    fuzzer_dict['final_vals'] = entire_data_col[-1]
+# write the computed data out; returns what render_overall needs to plot the fuzzer
+# write_text: also write the per-slot -mean-confi.txt (skipped by the refreshes of watch.py until it stops)
+def plot_files(fuzzer_dict, misc_dict, write_text=True):
+    fuzzer_name = fuzzer_dict['name']
 
-    means = []
-    mins = []
-    maxs = []
-    bins = []
+    print('[*] generating overall plots for {}'.format(fuzzer_name))
 
-    for col in entire_data_col:
-        mean, min_, max_ = mean_confidence_interval(
-            col, misc_dict['confidence_lvl'])
-        means.append(mean)
-        mins.append(max(min_, 0))
-        maxs.append(max_)
+    series_list = fuzzer_dict['series']
+
+    fuzzer_dict['final_vals'] = [series.final_value().item() for series in series_list]
+
+    max_slot = series_list[0].length
+    step = get_step(misc_dict)
+    plot_slots = np.arange(0, max_slot, step)
+    means = np.empty(len(plot_slots))
+    mins = np.empty(len(plot_slots))
+    maxs = np.empty(len(plot_slots))
 
     data_dir = misc_dict['out_dir'] + '/' + 'stat_data/'
     mkdirs(data_dir)
 
-    with open(data_dir + fuzzer_name + "-mean-confi.txt", "w") as df:
-        for (idx, mean) in enumerate(means):
-            df.write("{},{},{}\n".format(mean, mins[idx], maxs[idx]))
-            bins.append(idx)
-
+    # the statistics are computed on the change points of the runs only, one time window after the other
+    # when computing them at once would take more than memory_limit
+    windows = time_windows(series_list, misc_dict['memory_limit'] * MB)
+    if len(windows) > 1:
+        print('[*] computing the statistics of {} in {} time windows'.format(fuzzer_name, len(windows)))
+    if misc_dict['ci_method'] == 'bootstrap':
+        seed = bootstrap_seed(misc_dict)
+
+    mean_confi_name = data_dir + fuzzer_name + "-mean-confi.txt"
+    with open(mean_confi_name, "w") if write_text else nullcontext() as mean_confi_file:
+        for (begin, end) in windows:
+            window = [series.window(begin, end) for series in series_list]
+            if misc_dict['ci_method'] == 'bootstrap':
+                grid, window_means, window_mins, window_maxs = series_bootstrap_intervals(window, misc_dict, seed)
+            else:
+                grid, window_means, window_mins, window_maxs = series_confidence_intervals(
+                    window, misc_dict['confidence_lvl'], fuzzer_dict.get('run_sums') if len(windows) == 1 else None)
+            window_mins = np.maximum(window_mins, 0)
+
+            # the text file has one line per slot
+            if write_text:
+                grid_lens = np.diff(np.append(grid, end))
+                write_mean_confi(mean_confi_file, np.repeat(window_means, grid_lens),
+                                 np.repeat(window_mins, grid_lens), np.repeat(window_maxs, grid_lens))
+
+            # sample the step functions at the plotted slots
+            plotted = slice(*np.searchsorted(plot_slots, [begin, end]))
+            plot_idx = np.searchsorted(grid, plot_slots[plotted], side='right') - 1
+            means[plotted] = window_means[plot_idx]
+            mins[plotted] = window_mins[plot_idx]
+            maxs[plotted] = window_maxs[plot_idx]
+    bins = np.arange(0, len(plot_slots))
+
+    # only hand matplotlib the points that are visible at the plot resolution
+    if misc_dict['plot_points'] > 0:
+        keep = downsample_indices(bins, [means, mins, maxs], misc_dict['plot_points'], misc_dict['downsample'])
+        bins = bins[keep]
+        means = means[keep]
+        mins = mins[keep]
+        maxs = maxs[keep]
+
+    return {
+        'name': fuzzer_name,
+        'bins': bins,
+        'means': means,
+        'mins': mins,
+        'maxs': maxs,
+        'line_kwargs': line_kwargs(fuzzer_dict),
+        'fill_kwargs': fill_kwargs(fuzzer_dict)
+    }
+
+
+# the style of the mean line of a fuzzer
+def line_kwargs(fuzzer_dict):
     set_line_color = 'line_color' in fuzzer_dict
     set_line_style = 'line_style' in fuzzer_dict
     set_marker = 'marker' in fuzzer_dict
 
-    step = get_step(misc_dict)
-
-    bins = [int(x/step) for x in bins[0::step]]
-
     if set_line_color and set_line_style and set_marker:
-        ax.plot(bins[0:], means[0::step], label=fuzzer_name, linestyle=convert_linestyle(fuzzer_dict['line_style'])
-                , color=fuzzer_dict['line_color'], marker=fuzzer_dict['marker'], ms=6)
-        ax_s.plot(bins[0:], means[0::step], label=fuzzer_name, linestyle=convert_linestyle(fuzzer_dict['line_style'])
-                  , color=fuzzer_dict['line_color'], marker=fuzzer_dict['marker'], ms=6)
-        ax.fill_between(bins[0:], mins[0::step], maxs[0::step], facecolor=fuzzer_dict['line_color'], alpha=0.2)
+        return {'linestyle': convert_linestyle(fuzzer_dict['line_style']), 'color': fuzzer_dict['line_color'],
+                'marker': fuzzer_dict['marker'], 'ms': 6}
     elif set_line_color and set_line_style:
-        ax.plot(bins[0:], means[0::step], label=fuzzer_name,
-                linestyle=convert_linestyle(fuzzer_dict['line_style']), color=fuzzer_dict['line_color'])
-        ax_s.plot(bins[0:], means[0::step], label=fuzzer_name,
-                  linestyle=convert_linestyle(fuzzer_dict['line_style']), color=fuzzer_dict['line_color'])
-        ax.fill_between(bins[0:], mins[0::step], maxs[0::step],
-                        facecolor=fuzzer_dict['line_color'], alpha=0.2)
+        return {'linestyle': convert_linestyle(fuzzer_dict['line_style']), 'color': fuzzer_dict['line_color']}
     elif set_line_color:
-        ax.plot(bins[0:], means[0::step], label=fuzzer_name,
-                color=fuzzer_dict['line_color'])
-        ax_s.plot(bins[0:], means[0::step], label=fuzzer_name,
-                  color=fuzzer_dict['line_color'])
-        ax.fill_between(bins[0:], mins[0::step], maxs[0::step],
-                        facecolor=fuzzer_dict['line_color'], alpha=0.2)
+        return {'color': fuzzer_dict['line_color']}
     elif set_line_style:
-        ax.plot(bins[0:], means[0::step], label=fuzzer_name,
-                linestyle=convert_linestyle(fuzzer_dict['line_style']))
-        ax_s.plot(bins[0:], means[0::step], label=fuzzer_name,
-                  linestyle=convert_linestyle(fuzzer_dict['line_style']))
-        ax.fill_between(bins[0:], mins[0::step], maxs[0::step], alpha=0.2)
+        return {'linestyle': convert_linestyle(fuzzer_dict['line_style'])}
     else:
-        ax.plot(bins[0:], means[0::step], label=fuzzer_name)
-        ax_s.plot(bins[0:], means[0::step], label=fuzzer_name)
-        ax.fill_between(bins[0:], mins[0::step], maxs[0::step], alpha=0.2)
-
-
-def student_t_test(filename, open_mode, fuzzers_dict):
-    with open(filename, open_mode) as gsf:
-        checked = []
-        gsf.write("### Student's t test ###\n")
-        for fuzzer_name1 in fuzzers_dict:
-            for fuzzer_name2 in fuzzers_dict:
-                if not fuzzer_name1 == fuzzer_name2 and not (fuzzer_name1, fuzzer_name2) in checked:
-                    f1 = fuzzers_dict[fuzzer_name1]
-                    f2 = fuzzers_dict[fuzzer_name2]
-                    checked.append((fuzzer_name1, fuzzer_name2))
-                    checked.append((fuzzer_name2, fuzzer_name1))
-
-                    p_value = scipy.stats.ttest_ind(
-                        f1['final_vals'], f2['final_vals'])[1]
-
-                    gsf.write(
-                        "pvalue: {} --- {} : {}\n".format(fuzzer_name1, fuzzer_name2, p_value))
-                    gsf.write("------------------\n")
-        gsf.write("\n")
-
-
-def mw_u_test(filename, open_mode, fuzzers_dict):
-    with open(filename, open_mode) as gsf:
-        checked = []
-        gsf.write("### Mann Whitney u test ###\n")
-        for fuzzer_name1 in fuzzers_dict:
-            for fuzzer_name2 in fuzzers_dict:
-                if not fuzzer_name1 == fuzzer_name2 and not (fuzzer_name1, fuzzer_name2) in checked:
-                    f1 = fuzzers_dict[fuzzer_name1]
-                    f2 = fuzzers_dict[fuzzer_name2]
-                    checked.append((fuzzer_name1, fuzzer_name2))
-                    checked.append((fuzzer_name2, fuzzer_name1))
-                    try:
-                        p_value = scipy.stats.mannwhitneyu(
-                            f1['final_vals'], f2['final_vals'])[1]
-                        gsf.write(
-                            "pvalue: {} --- {} : {}\n".format(fuzzer_name1, fuzzer_name2, p_value))
-                    except ValueError as e:
-                        gsf.write(
-                            "ERROR: {} --- {} : {}\n".format(fuzzer_name1, fuzzer_name2, e))
-                    gsf.write("------------------\n")
-        gsf.write("\n")
-
-
-# calculate the chance of f1s < f2s
-def calculate_a12(max_pop, f1s, f2s):
-    numerator = 0
-    denominator = float(max_pop * max_pop)
-    for first_val in f1s:
-        for second_val in f2s:
-            if first_val < second_val:
-                numerator += 1
-            elif first_val == second_val:
-                numerator += 0.5
-    a12 = numerator / denominator
-    return a12
-
-
-def calculate_a12s(filename, open_mode, fuzzers_dict):
-    with open(filename, open_mode) as gsf:
-        checked = []
-        gsf.write("### A12 values ###\n")
-        for fuzzer_name1 in fuzzers_dict:
-            for fuzzer_name2 in fuzzers_dict:
-                if not fuzzer_name1 == fuzzer_name2 and not (fuzzer_name1, fuzzer_name2) in checked:
-                    f1 = fuzzers_dict[fuzzer_name1]
-                    f2 = fuzzers_dict[fuzzer_name2]
-                    checked.append((fuzzer_name1, fuzzer_name2))
-                    checked.append((fuzzer_name2, fuzzer_name1))
-
-                    # assume f1 and f2 have the same len
-                    a12 = calculate_a12(
-                        len(f1['final_vals']), f1['final_vals'], f2['final_vals'])
-
-                    gsf.write("A12: {} <= {} : {}\n".format(
-                        fuzzer_name1, fuzzer_name2, a12))
-                    gsf.write("A12: {} >= {} : {}\n".format(
-                        fuzzer_name1, fuzzer_name2, (1.0-a12)))
-                    gsf.write("------------------\n")
-        gsf.write("\n")
-
-
-def generate_plots(fuzzers_dict, misc_dict):
-    fig = plt.figure(len(fuzzers_dict))
-    ax = fig.add_subplot(111)
+        return {}
 
-    # fig_s does not plot the confidence interval
-    fig_s = plt.figure(len(fuzzers_dict) + 1)
-    ax_s = fig_s.add_subplot(111)
 
-    if misc_dict['x_log_scale']:
-        ax.set_xscale('log')
-        ax_s.set_xscale('log')
+# the style of the confidence interval band of a fuzzer
+def fill_kwargs(fuzzer_dict):
+    if 'line_color' in fuzzer_dict:
+        return {'facecolor': fuzzer_dict['line_color'], 'alpha': 0.2}
+    else:
+        return {'alpha': 0.2}
 
-    if misc_dict['y_log_scale']:
-        ax.set_yscale('log')
-        ax_s.set_yscale('log')
 
-    for (n, fuzzer_name) in enumerate(fuzzers_dict):
+# aligned: the data of the fuzzers is already aligned (see align_all_data)
+# renderer: draws the figures (see render.Renderer); a new one is used if not given
+# write_text: see plot_files
+def generate_plots(fuzzers_dict, misc_dict, aligned=False, renderer=None, write_text=True):
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = Renderer(misc_dict['render_jobs'])
+
+    if not aligned:
+        align_all_data(fuzzers_dict, misc_dict)
+
+    plot_specs = []
+    for fuzzer_name in fuzzers_dict:
         fuzzer_dict = fuzzers_dict[fuzzer_name]
-        align_data(fuzzer_dict, misc_dict)
-        detailed_plot(fuzzer_dict, misc_dict, n)
-        plot_files(fuzzer_dict, misc_dict, ax, ax_s)
+        with stage('detailed', fuzzer_name):
+            detailed_plot(fuzzer_dict, misc_dict, renderer)
+        # the statistics of a fuzzer whose runs did not change since they were computed in this process are kept
+        if fuzzer_dict.get('unchanged') and 'plot_spec' in fuzzer_dict:
+            print('[*] overall plots for {} are up to date'.format(fuzzer_name))
+        else:
+            with stage('ci', fuzzer_name):
+                fuzzer_dict['plot_spec'] = plot_files(fuzzer_dict, misc_dict, write_text)
+        plot_specs.append(fuzzer_dict['plot_spec'])
 
     out_dir = misc_dict['out_dir'] + '/'
     base_filename = out_dir + \
@@ -372,15 +425,18 @@ def generate_plots(fuzzers_dict, misc_dict):
     filename_png = base_filename + '.png'
     filename_pdf_s = base_filename + '_simple.pdf'
     filename_png_s = base_filename + '_simple.png'
-    general_stats_file = out_dir + \
+    general_stats_base = out_dir + \
         misc_dict["project"] + "_overall_stats" + \
-        misc_dict["file_postfix"] + ".txt"
+        misc_dict["file_postfix"]
+    general_stats_file = general_stats_base + ".txt"
 
-    student_t_test(general_stats_file, 'w', fuzzers_dict)
+    # the overall figure and the simple one (without the confidence interval)
+    renderer.submit(render_overall, plot_specs, misc_dict, [filename_pdf, filename_png], True)
+    renderer.submit(render_overall, plot_specs, misc_dict, [filename_pdf_s, filename_png_s], False)
 
-    mw_u_test(general_stats_file, 'a', fuzzers_dict)
-
-    calculate_a12s(general_stats_file, 'a', fuzzers_dict)
+    # all the pairwise tests, also written as .json and .csv next to the text report
+    with stage('stats'):
+        write_pairwise_reports(general_stats_base, fuzzers_dict, misc_dict)
 
     with open(general_stats_file, 'a') as file_handle:
         for fuzzer_name in fuzzers_dict:
@@ -390,18 +446,129 @@ def generate_plots(fuzzers_dict, misc_dict):
             last_vals = fuzzer_dict['last_vals']
 
             for (i, old_data_file) in enumerate(old_data_files):
-                file_handle.write('fuzzer:{} orig_file:{} aligned_file:{} last_val:{} \n'
-                                  .format(fuzzer_name, data_files[i], old_data_file, last_vals[i]))
+                file_handle.write('fuzzer:{} orig_file:{} aligned_file:{} run:{} last_val:{} \n'
+                                  .format(fuzzer_name, old_data_file, data_files[i], i, last_vals[i]))
 
             file_handle.write('\n')
 
+    if misc_dict['stats_over_time']:
+        with stage('significance'):
+            significance_plots(fuzzers_dict, misc_dict, renderer)
+
+    if own_renderer:
+        renderer.close()
+
+
+# MWU p-values and A12 of every pair of fuzzers at every bucket, plotted as one timeline per pair
+def significance_plots(fuzzers_dict, misc_dict, renderer):
+    step = get_step(misc_dict)
+    names = list(fuzzers_dict)
+    max_slot = fuzzers_dict[names[0]]['series'][0].length
+    slots = np.arange(0, max_slot, step)
+
+    data_dir = misc_dict['out_dir'] + '/' + 'stat_data/'
+    plot_dir = misc_dict['out_dir'] + '/' + 'significance/'
+    mkdirs(data_dir)
+    mkdirs(plot_dir)
+
+    for (fuzzer_name1, fuzzer_name2) in fuzzer_pairs(names):
+        pair_name = fuzzer_name1 + '_vs_' + fuzzer_name2
+        # fuzzer_dict['significance'] has the other fuzzers of the pairs already done in this process
+        done = fuzzers_dict[fuzzer_name1].setdefault('significance', set())
+        if fuzzer_name2 in done and fuzzers_dict[fuzzer_name1].get('unchanged') and \
+                fuzzers_dict[fuzzer_name2].get('unchanged'):
+            print('[*] significance over time for {} --- {} is up to date'.format(fuzzer_name1, fuzzer_name2))
+            continue
+        done.add(fuzzer_name2)
+        print('[*] generating significance over time for {} --- {}'.format(fuzzer_name1, fuzzer_name2))
+
+        # the union grid of the two fuzzers is split into time windows like in plot_files
+        series_list1 = fuzzers_dict[fuzzer_name1]['series']
+        series_list2 = fuzzers_dict[fuzzer_name2]['series']
+        p_values = np.empty(len(slots))
+        a12s = np.empty(len(slots))
+        for (begin, end) in time_windows(list(series_list1) + list(series_list2), misc_dict['memory_limit'] * MB):
+            in_window = slice(*np.searchsorted(slots, [begin, end]))
+            if in_window.start == in_window.stop:
+                continue
+            p_values[in_window], a12s[in_window] = significance_over_time(
+                [series.window(begin, end) for series in series_list1],
+                [series.window(begin, end) for series in series_list2], slots[in_window])
+        write_significance(data_dir + pair_name + "-significance.txt", p_values, a12s)
+
+        start = significant_from(p_values, SIGNIFICANCE_ALPHA)
+        if start is None:
+            print('[*] {} --- {}: not significant (p < {}) at the end'.format(
+                fuzzer_name1, fuzzer_name2, SIGNIFICANCE_ALPHA))
+        else:
+            print('[*] {} --- {}: significant (p < {}) from {} {} on'.format(
+                fuzzer_name1, fuzzer_name2, SIGNIFICANCE_ALPHA, start, display_bucket(misc_dict['bucket'])))
+
+        bins = np.arange(0, len(slots))
+        if misc_dict['plot_points'] > 0:
+            keep = downsample_indices(bins, [p_values, a12s], misc_dict['plot_points'], misc_dict['downsample'])
+            bins = bins[keep]
+            p_values = p_values[keep]
+            a12s = a12s[keep]
+
+        spec = {
+            'name1': fuzzer_name1,
+            'name2': fuzzer_name2,
+            'bins': bins,
+            'p_values': p_values,
+            'a12s': a12s,
+            'start': start
+        }
+        base_filename = plot_dir + misc_dict["project"] + "_" + pair_name + misc_dict["file_postfix"]
+        renderer.submit(render_significance, spec, misc_dict, [base_filename + '.pdf', base_filename + '.png'])
+
+
+def render_significance(spec, misc_dict, filenames):
+    fig, (ax_p, ax_a12) = plt.subplots(2, 1, sharex=True)
+
+    ax_p.plot(spec['bins'], spec['p_values'], color='black')
+    ax_p.axhline(SIGNIFICANCE_ALPHA, color='red', linestyle='dashed', linewidth=1)
+    ax_p.set_yscale('log')
+    ax_p.set(ylabel='MWU p-value')
+    ax_p.set_title('{} vs {}'.format(spec['name1'], spec['name2']))
+
+    ax_a12.plot(spec['bins'], spec['a12s'], color='black')
+    ax_a12.axhline(0.5, color='grey', linestyle='dashed', linewidth=1)
+    ax_a12.set_ylim(0, 1)
+    ax_a12.set(xlabel='time ({})'.format(display_bucket(misc_dict['bucket'])),
+               ylabel='A12 ({} < {})'.format(spec['name1'], spec['name2']))
+
+    if spec['start'] is not None:
+        for ax in (ax_p, ax_a12):
+            ax.axvline(spec['start'], color='red', linestyle='dotted', linewidth=1)
+
+    for filename in filenames:
+        fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+
+
+# draw the mean lines of all the fuzzers; with_ci also draws the confidence intervals and the title
+def render_overall(plot_specs, misc_dict, filenames, with_ci):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    if misc_dict['x_log_scale']:
+        ax.set_xscale('log')
+
+    if misc_dict['y_log_scale']:
+        ax.set_yscale('log')
+
+    for spec in plot_specs:
+        ax.plot(spec['bins'][0:], spec['means'], label=spec['name'], **spec['line_kwargs'])
+        if with_ci:
+            ax.fill_between(spec['bins'][0:], spec['mins'], spec['maxs'], **spec['fill_kwargs'])
+
     if 'y_start_0' in misc_dict and misc_dict['y_start_0']:
         ax.set_ylim(ymin=0)
-        ax_s.set_ylim(ymin=0)
 
     ax.set(xlabel='time ({})'.format(display_bucket(
         misc_dict['bucket'])), ylabel=misc_dict['ylabel'])
-    if 'plot_title' in misc_dict:
+    if with_ci and 'plot_title' in misc_dict:
         ax.set(title=misc_dict['plot_title'])
         ax.set_title(misc_dict['plot_title'], fontsize=18, color='black')
     if 'no_legend' in misc_dict and misc_dict['no_legend']:
@@ -422,305 +589,6 @@ def generate_plots(fuzzers_dict, misc_dict):
         for tick in ax.get_xticklabels():
             tick.set_rotation(45)
 
-    fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
-    fig.savefig(filename_png, bbox_inches='tight', dpi=100)
-
-    ax_s.set(xlabel='time ({})'.format(display_bucket(
-        misc_dict['bucket'])), ylabel=misc_dict['ylabel'])
-    if 'no_legend' in misc_dict and misc_dict['no_legend']:
-        pass
-    else:
-        if 'large_font' in misc_dict and misc_dict['large_font']:
-            ax_s.legend(fontsize=20)
-        else:
-            ax_s.legend()
-    if 'large_font' in misc_dict and misc_dict['large_font']:
-        for item in ([ax_s.title, ax_s.xaxis.label, ax_s.yaxis.label] +
-                     ax_s.get_xticklabels()):
-            item.set_fontsize(20)
-
-        for tick in ax_s.get_xticklabels():
-            tick.set_rotation(45)
-
-        for item in (ax_s.get_yticklabels()):
-            item.set_fontsize(20)
-
-    fig_s.savefig(filename_pdf_s, bbox_inches='tight', dpi=100)
-    fig_s.savefig(filename_png_s, bbox_inches='tight', dpi=100)
-
-
-def generate_stat_data(fuzzers_dict, misc_dict):
-
-    # fill in the raw data
-    for fuzzer_name in fuzzers_dict:
-        fuzzer = fuzzers_dict[fuzzer_name]
-        # use only the first data file
-        data_file = fuzzer['data_files'][0]
-        with open(data_file) as df:
-            lines = df.readlines()
-            fuzzer['final_vals'] = [float(x.strip()) for x in lines]
-
-    out_dir = misc_dict['out_dir'] + '/'
-    mkdirs(out_dir)
-    general_stats_file = out_dir + \
-        misc_dict["project"] + "_overall_stats" + \
-        misc_dict["file_postfix"] + ".txt"
-
-    student_t_test(general_stats_file, 'w', fuzzers_dict)
-
-    mw_u_test(general_stats_file, 'a', fuzzers_dict)
-
-    calculate_a12s(general_stats_file, 'a', fuzzers_dict)
-
-    with open(general_stats_file, 'a') as file_handle:
-        for fuzzer_name in fuzzers_dict:
-            fuzzer_dict = fuzzers_dict[fuzzer_name]
-            old_data_files = fuzzer_dict['old_data_files']
-            data_files = fuzzer_dict['data_files']
-            last_vals = fuzzer_dict['last_vals']
-
-            for (i, old_data_file) in enumerate(old_data_files):
-                file_handle.write('fuzzer:{} orig_file:{} aligned_file:{} last_val:{} \n'
-                                  .format(fuzzer_name, data_files[i], old_data_file, last_vals[i]))
-
-            file_handle.write('\n')
-
-
-
-def generate_box_plots(fuzzers_dict, misc_dict):
-    fig = plt.figure(len(fuzzers_dict))
-    ax = fig.add_subplot(111)
-
-    # fill in the raw data
-    # the data for the box plot
-    box_data = []
-    box_colors = []
-    line_styles = []
-    # marker = []
-    fuzzer_names = list(fuzzers_dict.keys())
-    fuzzer_names.sort()
-    for fuzzer_name in fuzzer_names:
-        fuzzer = fuzzers_dict[fuzzer_name]
-        # use only the first data file
-        data_file = fuzzer['data_files'][0]
-
-        box_colors.append(fuzzer['box_color'])
-
-        line_styles.append(fuzzer['line_style'])
-
-        # marker.append(fuzzer['marker'])
-
-        if not os.path.exists(data_file):
-            fuzzer['final_vals'] = []
-            box_data.append(fuzzer['final_vals'])
-            continue
-
-        with open(data_file) as df:
-            lines = df.readlines()
-            fuzzer['final_vals'] = [float(x) for x in lines]
-            box_data.append(fuzzer['final_vals'])
-
-    out_dir = misc_dict['out_dir'] + '/'
-    mkdirs(out_dir)
-    base_filename = out_dir + misc_dict["project"] + misc_dict["file_postfix"]
-    filename_pdf = base_filename + '.pdf'
-    filename_png = base_filename + '.png'
-
-    # notch may look weird
-    # https://stackoverflow.com/questions/26291082/weird-behavior-of-matplotlibs-boxplot-when-using-the-notch-shape
-    bp = ax.boxplot(box_data, labels=fuzzer_names, sym='k+',
-                    notch=misc_dict['notch'], patch_artist=False, widths=0.5, showfliers=False)
-
-    # this might be buggy as the order of bp['boxes'] may not follow the specified order
-    # this is to set the color for the boxes
-    # for box, color, line_style in zip(bp['boxes'], box_colors, line_styles):
-    #     box.set(facecolor=color)
-    # box.set(linestyle=line_style)
-
-    # this is buggy
-    # ['whiskers', 'fliers', 'means', 'medians', 'caps']
-    # for whisker, median, cap, line_style in zip(bp['whiskers'], bp['medians'], bp['caps'], line_styles):
-    #     whisker.set(linestyle=line_style)
-    #     median.set(linestyle=line_style)
-    #     cap.set(linestyle=line_style)
-    #     print("haha")
-    #     print(cap.get_linestyle())
-
-    # this works, but it's for all boxes
-    # for element in ['whiskers', 'means', 'medians', 'caps']:
-    #     plt.setp(bp[element], color='red', linestyle="dashed")
-
-    for median in bp['medians']:
-        median.set(color='k', linewidth=1.5)
-        x, y = median.get_data()
-        xn = (x-(x.sum()/2.))*0.5 + (x.sum()/2.)
-        ax.plot(xn, y, color="k", linewidth=5, solid_capstyle="butt", zorder=4)
-
-    # plot the dots (scatter)
-    for (i, fuzzer_name) in enumerate(fuzzer_names):
-        fuzzer = fuzzers_dict[fuzzer_name]
-        y = fuzzer['final_vals']
-        x = np.random.normal(1+i, 0.1, size=len(y))
-        ax.scatter(x, y, c=fuzzer['box_color'], alpha=0.8, s=100)
-
-    if 'ylim' in misc_dict:
-        ax.set_ylim(misc_dict['ylim'])
-
-    # ax.grid(which='major', axis='both', linestyle='--')
-    ax.grid(False)
-    if 'plot_title' in misc_dict:
-        ax.set(title=misc_dict['plot_title'])
-
-    for item in ([ax.title, ax.xaxis.label] +
-                 ax.get_xticklabels()):
-        item.set_fontsize(30)
-
-    for item in (ax.get_yticklabels()):
-        item.set_fontsize(20)
-
-    fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
-    fig.savefig(filename_png, bbox_inches='tight', dpi=100)
-
-
-def generate_scatter_plots(fuzzers_dict, misc_dict):
-    fig = plt.figure(len(fuzzers_dict))
-    ax = fig.add_subplot(111)
-
-    fuzzer_names = list(fuzzers_dict.keys())
-    fuzzer_names.sort()
-    for fuzzer_name in fuzzer_names:
-        fuzzer = fuzzers_dict[fuzzer_name]
-
-        # use only the first data file
-        data_file = fuzzer['data_files'][0]
-        with open(data_file) as df:
-            lines = df.readlines()
-            xs = []
-            ys = []
-            for line in lines:
-                tokens = line.split(':')
-                # skip invalid line
-                if len(tokens) != 2:
-                    continue
-                xs.append(int(tokens[0]))
-                ys.append(int(tokens[1]))
-
-            fuzzer['final_xs'] = xs
-            fuzzer['final_ys'] = ys
-
-            set_line_color = 'line_color' in fuzzer
-
-            if set_line_color:
-                ax.scatter(xs, ys, c=fuzzer['line_color'],
-                           alpha=1, s=20, label=fuzzer_name)
-            else:
-                ax.scatter(xs, ys, alpha=1, s=20, label=fuzzer_name)
-
-    # ax.set_xscale('log')
-    ax.set_yscale('log')
-    if 'plot_title' in misc_dict:
-        ax.set(title=misc_dict['plot_title'])
-    ax.set(xlabel=misc_dict['xlabel'], ylabel=misc_dict['ylabel'])
-
-    large_font = misc_dict['large_font']
-
-    if large_font:
-        ax.legend(fontsize=15)
-    else:
-        ax.legend()
-
-    if large_font:
-        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label] + ax.get_xticklabels()):
-            item.set_fontsize(15)
-
-        for tick in ax.get_xticklabels():
-            tick.set_rotation(45)
-
-        for item in (ax.get_yticklabels()):
-            item.set_fontsize(15)
-
-    out_dir = misc_dict['out_dir'] + '/'
-    mkdirs(out_dir)
-    base_filename = out_dir + misc_dict["project"] + misc_dict["file_postfix"]
-    filename_pdf = base_filename + '.pdf'
-    filename_png = base_filename + '.png'
-
-    fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
-    fig.savefig(filename_png, bbox_inches='tight', dpi=100)
-
-
-def draw_histograms(histtype, figure_no, xss, colors, fuzzer_names, misc_dict):
-    fig = plt.figure(figure_no)
-    ax = fig.add_subplot(111)
-    n_bins = misc_dict['n_bins']
-    ax.hist(x=xss, bins=n_bins, histtype=histtype,
-            color=colors, label=fuzzer_names)
-
-    # ax.set_xscale('log')
-    ax.set_yscale('log')
-    if 'plot_title' in misc_dict:
-        ax.set(title=misc_dict['plot_title'])
-    ax.set(xlabel=misc_dict['xlabel'], ylabel=misc_dict['ylabel'])
-    # scientific notation for x axis labels
-    # ax.ticklabel_format(style='sci', axis='x', scilimits=(1, 4))
-
-    large_font = misc_dict['large_font']
-
-    if large_font:
-        ax.legend(fontsize=15)
-    else:
-        ax.legend()
-
-    if large_font:
-        for item in ([ax.title, ax.xaxis.label, ax.yaxis.label] + ax.get_xticklabels()):
-            item.set_fontsize(15)
-
-        for tick in ax.get_xticklabels():
-            tick.set_rotation(45)
-
-        for item in (ax.get_yticklabels()):
-            item.set_fontsize(15)
-
-    out_dir = misc_dict['out_dir'] + '/'
-    mkdirs(out_dir)
-    base_filename = out_dir + \
-        misc_dict["project"] + misc_dict["file_postfix"] + '-' + histtype
-    filename_pdf = base_filename + '.pdf'
-    filename_png = base_filename + '.png'
-
-    fig.savefig(filename_pdf, bbox_inches='tight', dpi=100)
-    fig.savefig(filename_png, bbox_inches='tight', dpi=100)
-
-
-def generate_histograms(fuzzers_dict, misc_dict):
-
-    fuzzer_names = list(fuzzers_dict.keys())
-    fuzzer_names.sort()
-    xss = []
-    colors = []
-    for fuzzer_name in fuzzer_names:
-        fuzzer = fuzzers_dict[fuzzer_name]
-
-        # use only the first data file
-        data_file = fuzzer['data_files'][0]
-        with open(data_file) as df:
-            lines = df.readlines()
-            xs = []
-            for line in lines:
-                if len(line.strip()) > 0:
-                    xs.append(int(line))
-
-            fuzzer['final_xs'] = xs
-            xss.append(xs)
-
-        set_line_color = 'line_color' in fuzzer
-
-        if set_line_color:
-            colors.append(fuzzer['line_color'])
-        else:
-            colors.append('xkcd:slate grey')
-
-    draw_histograms('bar', 1, xss, colors, fuzzer_names, misc_dict)
-    draw_histograms('barstacked', 2, xss, colors, fuzzer_names, misc_dict)
-    draw_histograms('step', 3, xss, colors, fuzzer_names, misc_dict)
-    draw_histograms('stepfilled', 4, xss, colors, fuzzer_names, misc_dict)
+    for filename in filenames:
+        fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
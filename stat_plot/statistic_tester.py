@@ -2,18 +2,19 @@
 # the test/statistics.csv is generated by: https://onlinemathtools.com/generate-random-matrix
 
 import argparse
-import scipy.stats
 import numpy as np
 import json
 
+from pairwise_stats import pairwise_tests, P_ADJUST_METHODS
+
 
 # currently support student t test, mann whitney u test and a12 results
-def statistic_tests(data_array):
+# p_adjust: the significance of the p-values is decided on the corrected ones (see pairwise_stats)
+def statistic_tests(data_array, p_adjust='none'):
     # TODO: later make these options
     p_value_sig_bar = 0.05
     a12_sig_bar = 0.71
 
-    checked = []
     data_names = data_array.dtype.names
     student_t_results = {}
     student_t_sig_results = {}
@@ -22,38 +23,35 @@ def statistic_tests(data_array):
     a12_results = {}
     a12_sig_results = {}
     average_values = {}
-    for dname1 in data_names:
-        for dname2 in data_names:
-            if not dname1 == dname2 and not (dname1, dname2) in checked:
-                checked.append((dname1, dname2))
-                checked.append((dname2, dname1))
-
-                s_test_key = '{}-{}'.format(dname1, dname2)
-
-                student_t_p_value = scipy.stats.ttest_ind(data_array[dname1], data_array[dname2])[1]
-                mw_u_p_value = scipy.stats.mannwhitneyu(data_array[dname1], data_array[dname2])[1]
-
-                student_t_results[s_test_key] = student_t_p_value
-                mw_u_results[s_test_key] = mw_u_p_value
-                if mw_u_p_value < p_value_sig_bar:
-                    mw_u_sig_results[s_test_key] = mw_u_p_value
-                if student_t_p_value < p_value_sig_bar:
-                    student_t_sig_results[s_test_key] = student_t_p_value
-
-                a12_key1 = '{}<{}'.format(dname1, dname2)
-                a12_val1 = calculate_a12(data_array[dname1], data_array[dname2])
-                a12_key2 = '{}<{}'.format(dname2, dname1)
-                a12_val2 = calculate_a12(data_array[dname2], data_array[dname1])
-                a12_results[a12_key1] = a12_val1
-                a12_results[a12_key2] = a12_val2
-
-                if a12_val1 > a12_sig_bar:
-                    a12_sig_results[a12_key1] = a12_val1
-                if a12_val2 > a12_sig_bar:
-                    a12_sig_results[a12_key2] = a12_val2
-
-        # do things that do not need comparison with another set of data
-        average_values[dname1] = np.average(data_array[dname1])
+
+    records = pairwise_tests({dname: data_array[dname] for dname in data_names}, p_adjust=p_adjust)
+    p_suffix = '_p' if p_adjust == 'none' else '_p_adj'
+    for record in records:
+        dname1 = record['fuzzer1']
+        dname2 = record['fuzzer2']
+
+        s_test_key = '{}-{}'.format(dname1, dname2)
+
+        student_t_results[s_test_key] = record['t_test' + p_suffix]
+        mw_u_results[s_test_key] = record['mwu' + p_suffix]
+        if record['mwu' + p_suffix] < p_value_sig_bar:
+            mw_u_sig_results[s_test_key] = record['mwu' + p_suffix]
+        if record['t_test' + p_suffix] < p_value_sig_bar:
+            student_t_sig_results[s_test_key] = record['t_test' + p_suffix]
+
+        a12_key1 = '{}<{}'.format(dname1, dname2)
+        a12_key2 = '{}<{}'.format(dname2, dname1)
+        a12_results[a12_key1] = record['a12']
+        a12_results[a12_key2] = record['a12_reverse']
+
+        if record['a12'] > a12_sig_bar:
+            a12_sig_results[a12_key1] = record['a12']
+        if record['a12_reverse'] > a12_sig_bar:
+            a12_sig_results[a12_key2] = record['a12_reverse']
+
+    # do things that do not need comparison with another set of data
+    for dname in data_names:
+        average_values[dname] = np.average(data_array[dname])
 
     statistic_test_results = {
         "student_t_test": student_t_results,
@@ -73,30 +71,18 @@ def statistic_tests(data_array):
     return results
 
 
-# calculate the chance of f1s < f2s
-def calculate_a12(f1s, f2s):
-    numerator = 0
-    denominator = float(len(f1s) * len(f2s))
-    for first_val in f1s:
-        for second_val in f2s:
-            if first_val < second_val:
-                numerator += 1
-            elif first_val == second_val:
-                numerator += 0.5
-    a12 = numerator / denominator
-    return a12
-
-
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", "-i", required=True, type=str, help="path to the input csv file")
     parser.add_argument("--output", "-o", required=True, type=str, help="path to the output file, in json format")
+    parser.add_argument("--p-adjust", required=False, type=str, default='none', choices=P_ADJUST_METHODS,
+                        help="correction of the p-values for the number of pairs compared")
 
     args = parser.parse_args()
 
     data_array = np.genfromtxt(args.input, delimiter=',', names=True)
 
-    results = statistic_tests(data_array)
+    results = statistic_tests(data_array, args.p_adjust)
 
     with open(args.output, 'w') as output_file:
         json.dump(results, indent=2, sort_keys=True, fp=output_file)
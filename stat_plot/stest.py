@@ -0,0 +1,40 @@
+from pairwise_stats import write_pairwise_reports
+from plot_data import final_values
+from plot_utils import mkdirs
+from profiler import stage
+
+
+# the 'stest' stat_type: the pairwise tests of one value per run (e.g. the final coverage)
+def generate_stat_data(fuzzers_dict, misc_dict):
+    # fill in the raw data
+    for fuzzer_name in fuzzers_dict:
+        fuzzer = fuzzers_dict[fuzzer_name]
+        if fuzzer['data_format'] == 'plot_data':
+            # the last row of the plot_data of every run
+            with stage('parse', fuzzer_name):
+                fuzzer['final_vals'] = final_values(fuzzer['data_files'], fuzzer['plot_data_column'])
+            continue
+        # use only the first data file
+        data_file = fuzzer['data_files'][0]
+        with stage('parse', fuzzer_name), open(data_file) as df:
+            lines = df.readlines()
+            fuzzer['final_vals'] = [float(x.strip()) for x in lines]
+
+    out_dir = misc_dict['out_dir'] + '/'
+    mkdirs(out_dir)
+    general_stats_base = out_dir + \
+        misc_dict["project"] + "_overall_stats" + \
+        misc_dict["file_postfix"]
+    general_stats_file = general_stats_base + ".txt"
+
+    # all the pairwise tests, also written as .json and .csv next to the text report
+    with stage('stats'):
+        write_pairwise_reports(general_stats_base, fuzzers_dict, misc_dict)
+
+    with open(general_stats_file, 'a') as file_handle:
+        for fuzzer_name in fuzzers_dict:
+            # the stest data files are not aligned, only the first one of every fuzzer is read
+            # (for plot_data, the last row of every data file)
+            file_handle.write('fuzzer:{} data_file:{} n_vals:{} \n\n'
+                              .format(fuzzer_name, fuzzers_dict[fuzzer_name]['data_files'][0],
+                                      len(fuzzers_dict[fuzzer_name]['final_vals'])))
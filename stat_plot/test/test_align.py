@@ -0,0 +1,117 @@
+# the vectorized alignment (align.py) against the original per-slot loop of align_data
+# run from the stat_plot folder: python -m pytest test
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from align import StepSeries, run_lengths, write_aligned_file
+from data_parser import parse_slot_values
+
+
+# the aligner before align.py, kept as the reference: the values of the slots [0, max_slot) of one showmaps file
+def reference_align(lines, max_slot):
+    slots = []
+    vals = []
+    first = True
+
+    for line in lines:
+        tokens = line.split(":")
+        # skip illegal line
+        if len(tokens) != 2:
+            continue
+        slot = int(tokens[0])
+        val = int(tokens[1])
+
+        if first:
+            if slot != 0:
+                slots.append(0)
+                vals.append(0)
+            first = False
+
+        if slot > max_slot:
+            break
+        slots.append(slot)
+        vals.append(val)
+
+    # handle the case when the txt file is empty
+    if len(slots) == 0:
+        slots.append(0)
+        vals.append(0)
+        slots.append(1)
+        vals.append(0)
+    elif len(slots) == 1:
+        slots.append(1)
+        vals.append(vals[0])
+
+    slot_idx = 1
+    new_vals = []
+    val_idx = 0
+
+    for i in range(0, max_slot):
+        if i > slots[slot_idx]:
+            val_idx = min(len(vals)-1, val_idx + 1)
+            slot_idx = min(len(slots)-1, slot_idx + 1)
+        new_vals.append(vals[val_idx])
+
+    return new_vals
+
+
+def reference_file(lines, max_slot):
+    return ''.join(str(val) + '\n' for val in reference_align(lines, max_slot))
+
+
+def aligned_file(data, max_slot, tmp_path):
+    slots, vals = parse_slot_values(data)
+    series = StepSeries.from_run_lengths(*run_lengths(slots, vals, max_slot), max_slot)
+    path = str(tmp_path / 'aligned.txt')
+    write_aligned_file(path, series.to_dense())
+    with open(path) as handle:
+        return handle.read()
+
+
+def random_lines(rng, max_slot):
+    kind = rng.integers(0, 6)
+    if kind == 0:
+        return []
+    n_points = 1 if kind == 1 else int(rng.integers(2, 60))
+    # unsorted, repeated, beyond max_slot (truncated) and starting at 0 or later
+    high = max_slot * 2 if kind == 2 else max_slot + 1
+    slots = rng.integers(0, high, size=n_points)
+    if kind == 3:
+        slots = np.sort(slots)
+    if kind == 4:
+        slots[0] = 0
+    vals = rng.integers(0, 1000, size=n_points)
+    lines = ['{:>10}:{}\n'.format(slot, val) for (slot, val) in zip(slots.tolist(), vals.tolist())]
+    # a few illegal lines, skipped by both
+    for _ in range(int(rng.integers(0, 3))):
+        lines.insert(int(rng.integers(0, len(lines) + 1)), rng.choice(['\n', 'no colon\n', '1:2:3\n']))
+    return lines
+
+
+def test_random_inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        max_slot = int(rng.integers(1, 300))
+        lines = random_lines(rng, max_slot)
+        data = ''.join(lines).encode()
+        assert aligned_file(data, max_slot, tmp_path) == reference_file(lines, max_slot), lines
+
+
+def test_edge_cases(tmp_path):
+    cases = [
+        [],
+        ['         0:5\n'],
+        ['        10:5\n'],
+        ['       500:7\n'],
+        ['         0:1\n', '         0:2\n', '         0:3\n'],
+        ['        50:3\n', '        20:4\n', '        90:1\n'],
+        ['         3:1\n', '       999:2\n', '         5:3\n'],
+    ]
+    for lines in cases:
+        for max_slot in [1, 2, 10, 100]:
+            data = ''.join(lines).encode()
+            assert aligned_file(data, max_slot, tmp_path) == reference_file(lines, max_slot), (lines, max_slot)
@@ -0,0 +1,66 @@
+# the confidence intervals computed on the change points against a per-slot numpy reference
+# run from the stat_plot folder: python -m pytest test
+import os
+import sys
+
+import numpy as np
+import scipy.stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from align import StepSeries, run_sums, update_run_sums
+from stat_plot import series_confidence_intervals
+
+
+# the mean and the t-interval of every slot of the dense runs, in float64
+def reference_intervals(series_list, confidence):
+    dense = np.stack([series.to_dense() for series in series_list]).astype(np.float64)
+    n = len(series_list)
+    m = dense.mean(axis=0)
+    h = dense.std(axis=0, ddof=1) / np.sqrt(n) * scipy.stats.t.ppf((1 + confidence) / 2., n - 1)
+    return m, m - h, m + h
+
+
+def dense_intervals(grid, intervals, length):
+    return [StepSeries(grid, values, length).to_dense() for values in intervals]
+
+
+def random_series(rng, length, low, high):
+    starts = np.unique(np.concatenate(([0], rng.integers(0, length, size=int(rng.integers(0, 30))))))
+    return StepSeries(starts, np.sort(rng.integers(low, high, size=len(starts))), length)
+
+
+def assert_close(intervals, reference):
+    for (values, expected) in zip(intervals, reference):
+        assert np.allclose(values, expected, rtol=1e-9, atol=1e-6)
+
+
+def test_small_values():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        length = int(rng.integers(2, 500))
+        series_list = [random_series(rng, length, 0, 10000) for _ in range(int(rng.integers(2, 12)))]
+        grid, m, lo, hi = series_confidence_intervals(series_list, 0.95)
+        assert_close(dense_intervals(grid, [m, lo, hi], length), reference_intervals(series_list, 0.95))
+
+
+# e.g. the total_execs of long runs: n * sum(x^2) does not fit in int64
+def test_large_values():
+    series_list = [StepSeries(np.array([0, 5]), np.array([0, v]), 10) for v in [10 ** 9, 10 ** 10, 2 * 10 ** 10]]
+    grid, m, lo, hi = series_confidence_intervals(series_list, 0.95)
+    assert_close(dense_intervals(grid, [m, lo, hi], 10), reference_intervals(series_list, 0.95))
+    assert lo[-1] < -1.3e10 and hi[-1] > 3.3e10
+
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        length = int(rng.integers(2, 500))
+        series_list = [random_series(rng, length, 10 ** 9, 10 ** 11) for _ in range(int(rng.integers(2, 12)))]
+        grid, m, lo, hi = series_confidence_intervals(series_list, 0.95)
+        assert_close(dense_intervals(grid, [m, lo, hi], length), reference_intervals(series_list, 0.95))
+
+        # the same from sums updated from a slot on (watch.py)
+        begin = int(rng.integers(0, length))
+        previous = run_sums([series.window(0, length) for series in series_list])
+        grid, m, lo, hi = series_confidence_intervals(series_list, 0.95,
+                                                      update_run_sums(previous, series_list, begin))
+        assert_close(dense_intervals(grid, [m, lo, hi], length), reference_intervals(series_list, 0.95))
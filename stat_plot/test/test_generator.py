@@ -1,42 +1,29 @@
 # run this script under the "test" folder
-import random
+# generates data/<fuzzer>/out-<i>.txt for test_config.toml, see datagen.py for the other kinds of data
+import argparse
 import os
+import sys
 
+import numpy as np
 
-def main():
-    fuzzer_list = ['cerebro', 'afl', 'aflfast']
-
-    for (f, fuzzer) in enumerate(fuzzer_list):
-        if not os.path.exists("data/"+fuzzer):
-            os.makedirs("data/"+fuzzer)
-        # generate 10 data files for each fuzzer
-        for i in range(0, 10):
-            file_name = "data/" + fuzzer + "/out-" + str(i) + ".txt"
-
-            # randomly generate 900 - 1000 "seeds"
-            seeds_no = random.randrange(900, 1001)
-
-            # generate time slots (sec) for the seeds within 24 hours (86400s)
-            slots = random.sample(range(0, 86400), seeds_no)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-            if 0 not in slots:
-                slots[0] = 0
+from datagen import generate_overall
 
-            slots.sort()
 
-            # generate the data no for the seeds
-            data_nos = random.sample(range(5, 3000 - f * 100), seeds_no)
-
-            if 5 not in data_nos:
-                data_nos[0] = 5
-
-            data_nos.sort()
-
-            # write the slots and data_nos to file
-            with open(file_name, 'w') as out_file:
-                for (j, slot) in enumerate(slots):
-                    out_file.write('{slot:{fill}{align}{width}}:{data}\n'.format(slot=slot, fill=' ', align=">"
-                                                                                 , width=10, data=data_nos[j]))
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fuzzers", required=False, type=int, default=3)
+    parser.add_argument("--runs", required=False, type=int, default=10)
+    parser.add_argument("--hours", required=False, type=float, default=24)
+    # about 960 "seeds" per run in 24 hours
+    parser.add_argument("--density", required=False, type=float, default=40,
+                        help="average number of change points per hour of a run")
+    parser.add_argument("--seed", required=False, type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    generate_overall("data", args.fuzzers, args.runs, args.hours, args.density, rng)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+# the modules every mode imports stay light: matplotlib and scipy are only imported by the stat_types that need them
+# run from the stat_plot folder: python -m pytest test
+import os
+import subprocess
+import sys
+
+STAT_PLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+# the heavy modules loaded by importing modules in a fresh interpreter
+def heavy_modules_after(modules):
+    code = ('import sys; import {}; '
+            'print(",".join(m for m in ["matplotlib", "scipy"] if m in sys.modules))').format(', '.join(modules))
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=STAT_PLOT_DIR)
+    return [m for m in output.decode().strip().split(',') if m]
+
+
+def test_conf_and_stest_are_light():
+    assert heavy_modules_after(['conf', 'stest']) == []
@@ -0,0 +1,47 @@
+# the plot_data files of AFL / AFL++ through the overall statistics, with a column as large as total_execs
+# run from the stat_plot folder: python -m pytest test
+import os
+import sys
+
+import numpy as np
+import scipy.stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from align import StepSeries
+from datagen import PLOT_DATA_HEADER
+from stat_plot import encode_data_file, series_confidence_intervals
+
+T0 = 1600000000
+
+
+# a plot_data file whose total_execs grow by execs_per_sec every second (a row takes effect one slot after its time)
+def write_execs_plot_data(file_name, times, execs_per_sec):
+    with open(file_name, 'w') as handle:
+        handle.write(PLOT_DATA_HEADER)
+        for time in times.tolist():
+            handle.write('{}, 0, 1, 2, 1, 0, 1.00%, 0, 0, 1, {}, {}, 100\n'.format(
+                T0 + time, execs_per_sec, time * execs_per_sec))
+
+
+def test_total_execs(tmp_path):
+    rng = np.random.default_rng(0)
+    max_slot = 24 * 3600
+    series_list = []
+    finals = []
+    for (j, execs_per_sec) in enumerate([100000, 400000, 1000000]):
+        times = np.unique(np.concatenate(([0], rng.integers(1, max_slot - 2, size=200), [max_slot - 2])))
+        file_name = str(tmp_path / 'plot_data-{}'.format(j))
+        write_execs_plot_data(file_name, times, execs_per_sec)
+        vals, lens = encode_data_file(file_name, max_slot, 'total_execs')
+        series_list.append(StepSeries.from_run_lengths(vals, lens, max_slot))
+        finals.append((max_slot - 2) * execs_per_sec)
+
+    # up to 8.6e10 execs: the values are kept exactly
+    assert [int(series.final_value()) for series in series_list] == finals
+
+    grid, m, lo, hi = series_confidence_intervals(series_list, 0.95)
+    dense = np.stack([series.to_dense() for series in series_list]).astype(np.float64)
+    h = dense.std(axis=0, ddof=1) / np.sqrt(3) * scipy.stats.t.ppf(0.975, 2)
+    for (values, expected) in [(m, dense.mean(axis=0)), (lo, dense.mean(axis=0) - h), (hi, dense.mean(axis=0) + h)]:
+        assert np.allclose(StepSeries(grid, values, max_slot).to_dense(), expected, rtol=1e-9)
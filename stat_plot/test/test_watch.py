@@ -0,0 +1,100 @@
+# the incremental alignment of watch.py against aligning the whole file in one go
+# run from the stat_plot folder: python -m pytest test
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from align import StepSeries, run_lengths, run_sums, update_run_sums
+from data_parser import parse_slot_values
+from watch import FollowedFile
+
+
+def aligned_whole(path, max_slot):
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    slots, vals = parse_slot_values(data[:data.rfind(b'\n') + 1])
+    return StepSeries.from_run_lengths(*run_lengths(slots, vals, max_slot), max_slot)
+
+
+def random_content(rng, max_slot):
+    n_points = int(rng.integers(0, 80))
+    slots = rng.integers(0, max_slot + max_slot // 4 + 2, size=n_points)
+    if rng.integers(0, 2) == 0:
+        slots = np.sort(slots)
+    vals = rng.integers(0, 20, size=n_points)
+    return ''.join('{:>10}:{}\n'.format(slot, val) for (slot, val) in zip(slots.tolist(), vals.tolist())).encode()
+
+
+def sums_dense(sums, length):
+    grid, total, total_squares = sums
+    return StepSeries(grid, total, length).to_dense(), StepSeries(grid, total_squares, length).to_dense()
+
+
+def test_appended_chunks(tmp_path):
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'out.txt')
+    for _ in range(300):
+        max_slot = int(rng.integers(1, 200))
+        content = random_content(rng, max_slot)
+        open(path, 'wb').close()
+        followed = FollowedFile(path, max_slot)
+        # cut anywhere, also in the middle of a line
+        cuts = np.sort(rng.integers(0, len(content) + 1, size=int(rng.integers(1, 6)))).tolist() + [len(content)]
+        for cut in cuts:
+            with open(path, 'wb') as handle:
+                handle.write(content[:cut])
+            followed.update()
+            expected = aligned_whole(path, max_slot)
+            assert np.array_equal(followed.aligned().to_dense(), expected.to_dense())
+            assert np.array_equal(followed.aligned().starts, expected.starts)
+
+
+def test_replaced_file(tmp_path):
+    rng = np.random.default_rng(1)
+    path = str(tmp_path / 'out.txt')
+    max_slot = 100
+    first = b'         0:1\n        10:2\n'
+    with open(path, 'wb') as handle:
+        handle.write(first)
+    followed = FollowedFile(path, max_slot)
+    followed.update()
+    # rewritten in place, longer than before
+    second = random_content(rng, max_slot) + b'         0:9\n        50:3\n        60:4\n'
+    with open(path, 'wb') as handle:
+        handle.write(second)
+    followed.update()
+    assert np.array_equal(followed.aligned().to_dense(), aligned_whole(path, max_slot).to_dense())
+    # replaced by another file
+    os.remove(path)
+    with open(path, 'wb') as handle:
+        handle.write(first + b'        70:5\n')
+    followed.update()
+    assert np.array_equal(followed.aligned().to_dense(), aligned_whole(path, max_slot).to_dense())
+
+
+def test_update_run_sums():
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        length = int(rng.integers(2, 300))
+        series_list = []
+        for _ in range(int(rng.integers(1, 6))):
+            starts = np.unique(np.concatenate(([0], rng.integers(0, length, size=int(rng.integers(0, 20))))))
+            series_list.append(StepSeries(starts, rng.integers(0, 50, size=len(starts)), length))
+        begin = int(rng.integers(0, length))
+        # the series grow from begin on
+        grown = []
+        for series in series_list:
+            head = series.starts < begin
+            starts = np.unique(np.concatenate((series.starts[head], [begin],
+                                               rng.integers(begin, length, size=int(rng.integers(0, 10))))))
+            if begin == 0:
+                vals = rng.integers(0, 50, size=len(starts))
+            else:
+                vals = np.concatenate((series.vals[head], rng.integers(0, 50, size=len(starts) - head.sum())))
+            grown.append(StepSeries(starts, vals, length))
+        updated = update_run_sums(run_sums(series_list), grown, begin)
+        for (a, b) in zip(sums_dense(updated, length), sums_dense(run_sums(grown), length)):
+            assert np.array_equal(a, b)
@@ -0,0 +1,286 @@
+###################
+# the per-seed trace files of showmaps (run without -s) packed into bitsets, one 65,536-bit map per seed, with the
+# cumulative and union edge coverage of any subset of the seeds or runs
+###################
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from plot_utils import mkdirs
+
+# layout of a showmaps output dir, and the bitsets written next to it:
+#   <out>/traces/<seed>.txt       "%06u:%u" lines: the edges hit by the seed and their hit counts, or with showmaps -b
+#                                 the MAP_SIZE bytes of the classified map (0: edge not hit)
+#   <out>/trace_slots.txt         "slot:trace file" lines, in the order the seeds were run
+#   <cache>/trace_bits.npy        n_seeds x MAP_WORDS uint64, bit e of a row is set if the seed hit edge e
+#   <cache>/trace_bits.json       the trace files and slots of the rows, and the key of trace_slots.txt
+# the cache dir is the showmaps output dir for the trace_bits.py command, and under $out_dir/cache/ for 'overlap'
+MAP_SIZE = 1 << 16
+MAP_WORDS = MAP_SIZE // 64
+TRACES_DIRNAME = 'traces'
+TRACE_SLOTS_FILENAME = 'trace_slots.txt'
+BITS_FILENAME = 'trace_bits.npy'
+BITS_MANIFEST_FILENAME = 'trace_bits.json'
+BITS_VERSION = 1
+# the number of trace files parsed (or seeds OR-ed) at once, to bound the memory
+CHUNK_SEEDS = 4096
+
+NEWLINE = ord('\n')
+COLON = ord(':')
+ZERO = ord('0')
+EDGE_DIGITS = 6
+# the bytes of the text traces
+TEXT_BYTES = b'0123456789:\n'
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# the number of set bits of every row of bits (the last axis are the MAP_WORDS words of a map)
+def popcount(bits):
+    bits = np.ascontiguousarray(bits)
+    return POPCOUNT[bits.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+# a trace written by showmaps -b: the map itself, with bytes that never occur in the text traces (at least its 0s)
+def is_binary_trace(data):
+    return len(data) == MAP_SIZE and len(data.translate(None, TEXT_BYTES)) > 0
+
+
+# pack the contents of trace files (text or binary) into a len(datas) x MAP_WORDS bitset; only the edge ids are
+# kept (the virgin map of showmaps only records that an edge was hit, not how often)
+def pack_traces(datas):
+    bits = np.zeros((len(datas), MAP_WORDS), dtype=np.uint64)
+    binary = [is_binary_trace(data) for data in datas]
+    for (i, data) in enumerate(datas):
+        if binary[i]:
+            hit = np.frombuffer(data, dtype=np.uint8) != 0
+            bits[i].view(np.uint8)[:] = np.packbits(hit, bitorder='little')
+
+    datas = [b'' if binary[i] else data for (i, data) in enumerate(datas)]
+    datas = [data if len(data) == 0 or data.endswith(b'\n') else data + b'\n' for data in datas]
+    line_counts = np.array([data.count(b'\n') for data in datas], dtype=np.int64)
+    if line_counts.sum() == 0:
+        return bits
+
+    buf = np.frombuffer(b''.join(datas), dtype=np.uint8)
+    line_starts = np.concatenate(([0], np.flatnonzero(buf == NEWLINE)[:-1] + 1))
+    if np.any(buf[np.minimum(line_starts + EDGE_DIGITS, len(buf) - 1)] != COLON):
+        raise ValueError("invalid edge:count line in trace file")
+    edges = np.zeros(len(line_starts), dtype=np.int32)
+    for d in range(EDGE_DIGITS):
+        digit = buf[line_starts + d] - np.uint8(ZERO)
+        if np.any(digit > 9):
+            raise ValueError("invalid edge id in trace file")
+        edges = edges * 10 + digit
+    if np.any(edges >= MAP_SIZE):
+        raise ValueError("invalid edge id in trace file")
+
+    # the bit of every line in the bytes of the bitset; showmaps writes the edges in order, so the lines that
+    # set bits of the same byte are next to each other
+    positions = np.repeat(np.arange(len(datas), dtype=np.int64) * MAP_SIZE, line_counts) + edges
+    if np.any(np.diff(positions) <= 0):
+        positions = np.unique(positions)
+    byte_index = positions >> 3
+    byte_bits = (1 << (positions & 7)).astype(np.uint8)
+    first = np.concatenate(([0], np.flatnonzero(np.diff(byte_index)) + 1))
+    bits.view(np.uint8).reshape(-1)[byte_index[first]] = np.bitwise_or.reduceat(byte_bits, first)
+    return bits
+
+
+def read_trace_slots(slots_file):
+    names = []
+    slots = []
+    with open(slots_file) as handle:
+        for line in handle:
+            slot, sep, name = line.strip().partition(':')
+            if sep:
+                slots.append(int(slot))
+                names.append(name)
+    return names, np.array(slots, dtype=np.int64)
+
+
+# the slots of trace files written by showmaps versions without trace_slots.txt: the mtime of every seed in the
+# queue dir minus the oldest one (like showmaps without -S and -T)
+def queue_trace_slots(traces_dir, queue_dir):
+    names = sorted(os.listdir(traces_dir))
+    seeds = [name[:-len('.txt')] for name in names]
+    mtimes = np.array([int(os.stat(os.path.join(queue_dir, seed)).st_mtime) for seed in seeds], dtype=np.int64)
+    min_mtime = min(int(os.stat(os.path.join(queue_dir, seed)).st_mtime) for seed in os.listdir(queue_dir)
+                    if os.path.isfile(os.path.join(queue_dir, seed)))
+    order = np.argsort(mtimes, kind='stable')
+    return [names[i] for i in order], mtimes[order] - min_mtime
+
+
+def slots_key(slots_file):
+    stat = os.stat(slots_file)
+    return 'stat:{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+
+
+# the seeds of one showmaps output dir; bits may be a memory-mapped array
+class SeedTraces:
+
+    def __init__(self, names, slots, bits):
+        self.names = names
+        self.slots = slots
+        self.bits = bits
+
+    def __len__(self):
+        return len(self.names)
+
+    # the seeds at the given indexes (or boolean mask)
+    def select(self, indexes):
+        indexes = np.arange(len(self))[indexes]
+        return SeedTraces([self.names[i] for i in indexes], self.slots[indexes], self.bits[indexes])
+
+    # the seeds found at or before max_slot
+    def until(self, max_slot):
+        return self.select(self.slots <= max_slot)
+
+    # pack the trace files of a showmaps output dir
+    # cache_dir: where the bitsets are written (trace_bits.npy, e.g. the showmaps output dir itself), to be reused
+    # while trace_slots.txt is unchanged; nothing is written if None
+    # queue_dir: the queue of the seeds, for the slots of trace dirs without trace_slots.txt
+    @classmethod
+    def load(cls, out_dir, queue_dir=None, cache_dir=None):
+        traces_dir = os.path.join(out_dir, TRACES_DIRNAME)
+        slots_file = os.path.join(out_dir, TRACE_SLOTS_FILENAME)
+        cache = cache_dir is not None
+        if cache:
+            bits_file = os.path.join(cache_dir, BITS_FILENAME)
+            manifest_file = os.path.join(cache_dir, BITS_MANIFEST_FILENAME)
+
+        if os.path.exists(slots_file):
+            # the cache dir may be reused for other output dirs
+            key = '{}:{}'.format(os.path.abspath(out_dir), slots_key(slots_file))
+            if cache and os.path.exists(bits_file) and os.path.exists(manifest_file):
+                with open(manifest_file) as handle:
+                    manifest = json.load(handle)
+                if manifest.get('version') == BITS_VERSION and manifest.get('key') == key:
+                    return cls(manifest['names'], np.array(manifest['slots'], dtype=np.int64),
+                               np.load(bits_file, mmap_mode='r'))
+            names, slots = read_trace_slots(slots_file)
+        elif queue_dir is not None:
+            key = None
+            names, slots = queue_trace_slots(traces_dir, queue_dir)
+        else:
+            raise ValueError("{} has no {}, the queue dir is needed for the slots of the seeds".format(
+                out_dir, TRACE_SLOTS_FILENAME))
+
+        # the seeds with a negative slot (older than the -T time of showmaps) are not in its curves either
+        keep = slots >= 0
+        names = [name for (name, k) in zip(names, keep) if k]
+        slots = slots[keep]
+
+        if cache and key is not None:
+            mkdirs(cache_dir)
+            bits = np.lib.format.open_memmap(bits_file + '.tmp', mode='w+', dtype=np.uint64,
+                                             shape=(len(names), MAP_WORDS))
+        else:
+            bits = np.zeros((len(names), MAP_WORDS), dtype=np.uint64)
+        for begin in range(0, len(names), CHUNK_SEEDS):
+            datas = []
+            for name in names[begin:begin + CHUNK_SEEDS]:
+                with open(os.path.join(traces_dir, name), 'rb') as handle:
+                    datas.append(handle.read())
+            bits[begin:begin + len(datas)] = pack_traces(datas)
+
+        if cache and key is not None:
+            bits.flush()
+            del bits
+            os.replace(bits_file + '.tmp', bits_file)
+            with open(manifest_file, 'w') as handle:
+                json.dump({'version': BITS_VERSION, 'key': key, 'names': names, 'slots': slots.tolist()}, handle)
+            bits = np.load(bits_file, mmap_mode='r')
+        return cls(names, slots, bits)
+
+
+# the union of the bitsets of all the seeds (a MAP_WORDS bitset)
+def union_bits(bits):
+    union = np.zeros(MAP_WORDS, dtype=np.uint64)
+    for begin in range(0, len(bits), CHUNK_SEEDS):
+        union |= np.bitwise_or.reduce(bits[begin:begin + CHUNK_SEEDS], axis=0)
+    return union
+
+
+# the number of edges hit by any seed of the given SeedTraces (e.g. all the runs of a fuzzer)
+def union_coverage(traces_list):
+    union = np.zeros(MAP_WORDS, dtype=np.uint64)
+    for traces in traces_list:
+        union |= union_bits(traces.bits)
+    return int(popcount(union))
+
+
+# the cumulative coverage of the seeds of the given SeedTraces merged by slot, as the (slots, values) change
+# points of a showmaps file: the number of edges hit by the seeds found at or before every slot
+# with a single run this is the same curve as the slot_edge.txt of showmaps; with several runs it is the
+# coverage of their union over time
+def cumulative_coverage(traces_list):
+    slots = np.concatenate([traces.slots for traces in traces_list] + [np.zeros(0, dtype=np.int64)])
+    order = np.argsort(slots, kind='stable')
+    offsets = np.cumsum([0] + [len(traces) for traces in traces_list])
+
+    values = np.zeros(len(order), dtype=np.int64)
+    carry = np.zeros(MAP_WORDS, dtype=np.uint64)
+    total = 0
+    for begin in range(0, len(order), CHUNK_SEEDS):
+        chunk = order[begin:begin + CHUNK_SEEDS]
+        run = np.searchsorted(offsets, chunk, side='right') - 1
+        chunk_bits = np.empty((len(chunk), MAP_WORDS), dtype=np.uint64)
+        for r in np.unique(run):
+            chunk_bits[run == r] = traces_list[r].bits[chunk[run == r] - offsets[r]]
+        chunk_bits[0] |= carry
+        np.bitwise_or.accumulate(chunk_bits, axis=0, out=chunk_bits)
+        # the running union only grows: count the bits of the words that changed since the previous seed
+        changed = np.diff(chunk_bits, axis=0, prepend=carry[None, :]) != 0
+        rows, words = np.nonzero(changed)
+        new_bits = popcount(chunk_bits[rows, words][:, None]) - popcount(
+            np.vstack((carry[None, :], chunk_bits[:-1]))[rows, words][:, None])
+        increments = np.bincount(rows, weights=new_bits, minlength=len(chunk)).astype(np.int64)
+        values[begin:begin + len(chunk)] = total + np.cumsum(increments)
+        total = int(values[begin + len(chunk) - 1])
+        carry = chunk_bits[-1].copy()
+
+    # the value of a slot is the one after its last seed
+    slots = slots[order]
+    last = np.flatnonzero(np.append(np.diff(slots) != 0, True))
+    return slots[last], values[last]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="the union coverage over time of showmaps output dirs")
+    parser.add_argument("dirs", nargs='+', type=str, help="showmaps output dirs (run without -s)")
+    parser.add_argument("--queue", "-q", nargs='*', type=str, default=[],
+                        help="the queue dir of every output dir without trace_slots.txt, in the same order")
+    parser.add_argument("--output", "-o", required=False, type=str,
+                        help="write the cumulative union coverage as a showmaps \"slot:value\" file")
+    parser.add_argument("--no-cache", required=False, action='store_true',
+                        help="do not write or reuse trace_bits.npy")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    queue_dirs = args.queue + [None] * (len(args.dirs) - len(args.queue))
+    try:
+        traces_list = [SeedTraces.load(out_dir, queue_dir, None if args.no_cache else out_dir)
+                       for (out_dir, queue_dir) in zip(args.dirs, queue_dirs)]
+    except ValueError as error:
+        print("[!] {}".format(error))
+        exit(1)
+    loaded = time.perf_counter()
+    for (out_dir, traces) in zip(args.dirs, traces_list):
+        print("[*] {}: {} seeds, {} edges".format(out_dir, len(traces), union_coverage([traces])))
+    slots, values = cumulative_coverage(traces_list)
+    print("[*] union: {} seeds, {} edges (load {:.2f}s, curve {:.2f}s)".format(
+        sum(len(traces) for traces in traces_list), union_coverage(traces_list), loaded - start,
+        time.perf_counter() - loaded))
+
+    if args.output is not None:
+        with open(args.output, 'w') as out_file:
+            out_file.write(''.join('{:>10}:{}\n'.format(slot, value)
+                                   for (slot, value) in zip(slots.tolist(), values.tolist())))
+
+
+if __name__ == "__main__":
+    main()
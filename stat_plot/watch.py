@@ -0,0 +1,290 @@
+###################
+# follow the showmaps (or plot_data) files of a running campaign and keep the overall plots and stats up to date
+###################
+
+import glob
+import os
+import time
+
+import numpy as np
+
+from align import run_sums, update_run_sums, StepSeries
+from aligned_store import write_aligned_store
+from data_parser import parse_slot_values
+from plot_data import column_indexes, header_columns, parse_rows, rows_to_points
+from render import Renderer
+from stat_plot import data_column, generate_plots, get_max_slot, plot_files
+
+GLOB_CHARS = '*?['
+# the bytes kept from the end of the parsed part of a file, to notice that it was rewritten
+TAIL_BYTES = 64
+
+
+# append values at buf[n:], in a buffer that grows by doubling; returns the buffer (a new one when it grew)
+def append_to(buf, n, values):
+    if n + len(values) > len(buf):
+        grown = np.empty(max(2 * len(buf), n + len(values)), dtype=buf.dtype)
+        grown[:n] = buf[:n]
+        buf = grown
+    buf[n:n + len(values)] = values
+    return buf
+
+
+# a showmaps file that is still being written: every update only parses the complete lines appended since the last
+# one, from the offset where it stopped, and appends their change points to the aligned run; a file that shrank or
+# was replaced (another inode, or other bytes before the offset) is read again from the start
+# column: follow this column of a plot_data file (None for showmaps files)
+class FollowedFile:
+
+    def __init__(self, path, max_slot, column=None):
+        self.path = path
+        self.max_slot = max_slot
+        self.column = column
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.mtime = None
+        # the last bytes parsed, they must still be right before the offset
+        self.tail = b''
+        # plot_data: the number of columns, the (time, value, absolute time) indexes and the time of the first row
+        self.n_columns = None
+        self.indexes = None
+        self.t0 = None
+        # the aligned run: the first n_steps entries of starts and vals (see align.StepSeries)
+        self.starts = np.zeros(16, dtype=np.int64)
+        self.vals = np.zeros(16, dtype=np.int64)
+        self.n_steps = 0
+        # the slot from which the last change point took effect (align.effective_slots), None before the first one
+        self.last_slot = None
+        # no more change points once they reach max_slot
+        self.full = False
+        # the first slot of the run that changed since the last call of take_changes (None: no change)
+        self.changed_from = 0
+
+    # returns the number of lines parsed; a line is only parsed once it ends with a newline
+    def update(self):
+        if not os.path.exists(self.path):
+            return 0
+        stat = os.stat(self.path)
+        if self.inode is not None and stat.st_ino != self.inode:
+            print("[!] {} was replaced, reading it again".format(self.path))
+            self.reset()
+        elif stat.st_size < self.offset:
+            print("[!] {} shrank, reading it again".format(self.path))
+            self.reset()
+        self.inode = stat.st_ino
+        if stat.st_size == self.offset and stat.st_mtime_ns == self.mtime:
+            return 0
+        self.mtime = stat.st_mtime_ns
+
+        with open(self.path, 'rb') as handle:
+            handle.seek(self.offset - len(self.tail))
+            data = handle.read(stat.st_size - self.offset + len(self.tail))
+        if not data.startswith(self.tail):
+            print("[!] {} was rewritten, reading it again".format(self.path))
+            self.reset()
+            return self.update()
+        data = data[len(self.tail):]
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return 0
+        self.offset += end
+        self.tail = data[max(0, end - TAIL_BYTES):end]
+
+        if self.column is None:
+            slots, vals = parse_slot_values(data[:end])
+        else:
+            slots, vals = self.parse_plot_data(data[:end])
+        self.append_points(slots, vals)
+        return len(slots)
+
+    # the complete plot_data lines of data; the header is in the first update
+    def parse_plot_data(self, data):
+        if self.indexes is None:
+            columns = header_columns(data[:data.find(b'\n')].decode(errors='replace'))
+            if columns is None:
+                raise ValueError("{} has no plot_data header line".format(self.path))
+            self.n_columns = len(columns)
+            self.indexes = column_indexes(columns, self.column)
+        (time_index, value_index, absolute) = self.indexes
+        rows = parse_rows(data, self.n_columns)
+        if absolute and self.t0 is None and len(rows) > 0:
+            self.t0 = int(rows[0, time_index])
+        return rows_to_points(rows, time_index, value_index, self.t0 if absolute else None)
+
+    # append the change points of new lines to the aligned run, the same as aligning all the lines parsed so far in
+    # one go (align.run_lengths and StepSeries.from_run_lengths), but without going over the earlier ones again
+    def append_points(self, slots, vals):
+        if self.full or len(slots) == 0:
+            return
+        # the implicit 0 at slot 0, and the truncation after the first slot beyond max_slot
+        if self.last_slot is None and slots[0] != 0:
+            slots = np.concatenate(([0], slots))
+            vals = np.concatenate(([0], vals))
+        over = np.flatnonzero(slots > self.max_slot)
+        if len(over) > 0:
+            slots = slots[:over[0]]
+            vals = vals[:over[0]]
+            self.full = True
+            if len(slots) == 0:
+                return
+
+        # align.effective_slots, continued from the last change point
+        ks = np.arange(len(slots), dtype=np.int64)
+        offsets = slots + 1 - ks
+        offsets[0] = 0 if self.last_slot is None else max(offsets[0], self.last_slot + 1)
+        starts = ks + np.maximum.accumulate(offsets)
+        self.last_slot = int(starts[-1])
+
+        # the change points from max_slot on last zero slots, and the steps with the value of the previous one merge
+        keep = starts < self.max_slot
+        if not keep.all():
+            self.full = True
+        starts = starts[keep]
+        vals = vals[keep]
+        if len(starts) == 0:
+            return
+        previous = np.empty(len(vals), dtype=np.int64)
+        previous[1:] = vals[:-1]
+        if self.n_steps > 0:
+            previous[0] = self.vals[self.n_steps - 1]
+        changed = vals != previous
+        if self.n_steps == 0:
+            changed[0] = True
+        if not changed.any():
+            return
+
+        starts = starts[changed]
+        self.starts = append_to(self.starts, self.n_steps, starts)
+        self.vals = append_to(self.vals, self.n_steps, vals[changed])
+        self.n_steps += len(starts)
+        if self.changed_from is None:
+            self.changed_from = int(starts[0])
+
+    # the aligned run (a view of the change points, valid until the next update)
+    def aligned(self):
+        if self.n_steps == 0:
+            return StepSeries(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), self.max_slot)
+        return StepSeries(self.starts[:self.n_steps], self.vals[:self.n_steps], self.max_slot)
+
+    # the first slot that changed since the last call (None: no change)
+    def take_changes(self):
+        changed_from = self.changed_from
+        self.changed_from = None
+        return changed_from
+
+
+# the data files of a fuzzer: the entries of data_files with glob characters are expanded again at every refresh,
+# so that new runs are picked up; the other ones are taken as they are (a missing file is an empty run)
+def expand_data_files(patterns):
+    data_files = []
+    for pattern in patterns:
+        if any(c in pattern for c in GLOB_CHARS):
+            data_files += sorted(glob.glob(pattern))
+        elif pattern not in data_files:
+            data_files.append(pattern)
+    return data_files
+
+
+class Watcher:
+
+    def __init__(self, fuzzers_dict, misc_dict):
+        self.fuzzers_dict = fuzzers_dict
+        self.misc_dict = misc_dict
+        self.max_slot = get_max_slot(misc_dict)
+        self.patterns = {fuzzer_name: list(fuzzers_dict[fuzzer_name]['data_files']) for fuzzer_name in fuzzers_dict}
+        # fuzzer -> path -> FollowedFile
+        self.files = {fuzzer_name: {} for fuzzer_name in fuzzers_dict}
+        # the fuzzers whose -mean-confi.txt is behind their runs (see write_text)
+        self.stale_text = set()
+
+    # parse what was appended to the data files (and the new data files); returns the fuzzers whose runs changed,
+    # with the first slot that changed in any of their runs, and the number of lines parsed
+    def poll(self):
+        changed = {}
+        n_lines = 0
+        for fuzzer_name in self.fuzzers_dict:
+            files = self.files[fuzzer_name]
+            for data_file in expand_data_files(self.patterns[fuzzer_name]):
+                if data_file not in files:
+                    print("[*] following {} for {}".format(data_file, fuzzer_name))
+                    files[data_file] = FollowedFile(data_file, self.max_slot,
+                                                    data_column(self.fuzzers_dict[fuzzer_name]))
+                n_lines += files[data_file].update()
+                changed_from = files[data_file].changed_from
+                if changed_from is not None:
+                    changed[fuzzer_name] = min(changed.get(fuzzer_name, changed_from), changed_from)
+        return changed, n_lines
+
+    # the changed runs are written to the aligned store of their fuzzer (the text export only for the changed runs),
+    # the run sums of the fuzzer are only summed again from the first changed slot on; the statistics of the
+    # unchanged fuzzers and pairs are kept (see generate_plots), the fuzzers with at least one run are plotted
+    # the per-slot -mean-confi.txt (O(max_slot) lines) is not written by the refreshes, see write_text
+    def refresh(self, changed, renderer):
+        out_dir = self.misc_dict['out_dir']
+        for fuzzer_name in self.fuzzers_dict:
+            fuzzer_dict = self.fuzzers_dict[fuzzer_name]
+            files = self.files[fuzzer_name]
+            fuzzer_dict['unchanged'] = fuzzer_name not in changed
+            if fuzzer_dict['unchanged'] or len(files) == 0:
+                continue
+
+            data_files = list(files)
+            changed_runs = [j for (j, data_file) in enumerate(data_files)
+                            if files[data_file].take_changes() is not None]
+            series_list = [files[data_file].aligned() for data_file in data_files]
+            aligned_dir = out_dir + "/aligned/" + fuzzer_name + '/'
+            fuzzer_dict['old_data_files'] = data_files
+            fuzzer_dict['data_files'] = write_aligned_store(aligned_dir, series_list, data_files, self.max_slot,
+                                                            text_export=self.misc_dict['aligned_text'],
+                                                            text_runs=changed_runs)
+            fuzzer_dict['series'] = series_list
+            fuzzer_dict['last_vals'] = [int(series.final_value()) for series in series_list]
+            if 'run_sums' in fuzzer_dict and len(series_list) == fuzzer_dict['n_runs']:
+                fuzzer_dict['run_sums'] = update_run_sums(fuzzer_dict['run_sums'], series_list, changed[fuzzer_name])
+            else:
+                fuzzer_dict['run_sums'] = run_sums(series_list)
+            fuzzer_dict['n_runs'] = len(series_list)
+            self.stale_text.add(fuzzer_name)
+
+        plotted = {fuzzer_name: self.fuzzers_dict[fuzzer_name] for fuzzer_name in self.fuzzers_dict
+                   if len(self.files[fuzzer_name]) > 0}
+        if len(plotted) == 0:
+            print("[*] no data file yet")
+            return
+        generate_plots(plotted, self.misc_dict, aligned=True, renderer=renderer, write_text=False)
+        renderer.wait()
+
+    # write the -mean-confi.txt of the fuzzers that changed since it was last written, once the watching stops
+    def write_text(self):
+        for fuzzer_name in sorted(self.stale_text):
+            print("[*] writing the per-slot statistics of {}".format(fuzzer_name))
+            plot_files(self.fuzzers_dict[fuzzer_name], self.misc_dict)
+        self.stale_text = set()
+
+
+# refresh the overall plots and stats every interval seconds while the data files grow
+# refreshes: stop after this many refreshes (None: until interrupted)
+def watch(fuzzers_dict, misc_dict, interval, refreshes=None):
+    watcher = Watcher(fuzzers_dict, misc_dict)
+    renderer = Renderer(misc_dict['render_jobs'])
+    n_refreshes = 0
+    try:
+        while refreshes is None or n_refreshes < refreshes:
+            start = time.perf_counter()
+            changed, n_lines = watcher.poll()
+            if len(changed) > 0:
+                watcher.refresh(changed, renderer)
+                n_refreshes += 1
+                print("[*] refresh {}: {} new lines of {}, {:.2f}s".format(
+                    n_refreshes, n_lines, ', '.join(changed), time.perf_counter() - start))
+            if refreshes is not None and n_refreshes >= refreshes:
+                break
+            time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    except KeyboardInterrupt:
+        print("[*] stopped watching")
+    finally:
+        renderer.close()
+    watcher.write_text()